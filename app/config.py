@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import (
     BaseSettings,
     SettingsConfigDict,
@@ -19,9 +21,141 @@ class Settings(BaseSettings):
 
     IS_DEBUG: bool
 
+    # "production" skips Swagger UI registration to shorten cold start
+    APP_PROFILE: Literal["development", "production"] = "development"
+
     PATH_TO_DOCS: str = "/docs/openapi.yaml"
     SWAGGER_API_URL: str = "/api/docs/"
+    OPENAPI_CACHE_MAX_AGE: int = 3600
+
+    # admission control, budgets per endpoint class
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_LIMITS: dict[str, int] = {
+        "reads": 32,
+        "writes": 8,
+        "stats": 4,
+    }
+    # latency in seconds above which the limit of class is decreased
+    ADMISSION_LATENCY_TARGETS: dict[str, float] = {
+        "reads": 0.05,
+        "writes": 0.2,
+        "stats": 0.5,
+    }
+    ADMISSION_MAX_QUEUE: int = 64
+    ADMISSION_QUEUE_TIMEOUT: float = 0.1
+
+    # deadlines of users API requests, enforced by database statements
+    DEADLINES_ENABLED: bool = False
+    # budgets per endpoint class, in seconds
+    DEADLINE_BUDGETS: dict[str, float] = {
+        "reads": 2.0,
+        "writes": 5.0,
+        "stats": 10.0,
+    }
+    # budgets by view function name, override budget of its class
+    DEADLINE_ROUTE_BUDGETS: dict[str, float] = {}
+
+    # coalescing of concurrent identical stats computations
+    SINGLE_FLIGHT_ENABLED: bool = True
+    SINGLE_FLIGHT_TIMEOUT: float = 10.0
+    # wait timeouts by service method name, override SINGLE_FLIGHT_TIMEOUT
+    SINGLE_FLIGHT_TIMEOUTS: dict[str, float] = {}
+    # directory for file locks, enables coalescing across worker processes
+    SINGLE_FLIGHT_LOCK_DIR: str | None = None
+    SINGLE_FLIGHT_RESULT_TTL: float = 1.0
+
+    # background refresh of stats snapshots
+    STATS_REFRESH_ENABLED: bool = False
+    STATS_REFRESH_INTERVAL: float = 30.0
+    # snapshots older than this are not served, stats computed synchronously
+    STATS_MAX_STALENESS: float = 120.0
+    STATS_TRACKED_DOMAINS: list[str] = []
+    STATS_MAX_RECENT_DOMAINS: int = 32
+
+    # Idempotency-Key support for write endpoints
+    IDEMPOTENCY_ENABLED: bool = True
+    # "database" is shared by all workers, "memory" is per process
+    IDEMPOTENCY_STORE: Literal["database", "memory"] = "database"
+    IDEMPOTENCY_TTL: float = 86400.0
+    IDEMPOTENCY_LOCK_TTL: float = 60.0
+    IDEMPOTENCY_WAIT_TIMEOUT: float = 10.0
+
+    # group commit of concurrent user writes
+    WRITE_BATCHING_ENABLED: bool = False
+    # seconds to wait for more writes after the first one in batch
+    WRITE_BATCH_WINDOW: float = 0.005
+    WRITE_BATCH_MAX_SIZE: int = 64
+
+    # cache of user lookups and stats results, invalidated by user writes
+    CACHE_ENABLED: bool = False
+    # "sqlite" is shared by all workers on node, "memory" is per process
+    CACHE_STORE: Literal["memory", "sqlite"] = "sqlite"
+    # path to file of "sqlite" cache, in instance folder by default
+    CACHE_PATH: str | None = None
+    CACHE_TTL: float = 30.0
+    CACHE_MAX_ENTRIES: int = 10000
+
+    # opt-in cProfile profiling of users API requests
+    PROFILING_ENABLED: bool = False
+    # secret of signed X-Profile header, see "profile-token" command
+    PROFILING_SECRET: str | None = None
+    # share of requests profiled without header, from 0.0 to 1.0
+    PROFILING_SAMPLE_RATE: float = 0.0
+    # directory of profile files, instance/profiles by default
+    PROFILING_DIR: str | None = None
+
+    # background export and report jobs
+    JOBS_ENABLED: bool = False
+    # jobs run at once by each worker process
+    JOBS_MAX_CONCURRENT: int = 2
+    # queued and running jobs of all workers, new jobs are rejected above it
+    JOBS_MAX_ACTIVE: int = 16
+    # directory of result files, instance/jobs by default
+    JOBS_DIR: str | None = None
+    JOBS_BATCH_SIZE: int = 1000
+    # running job without progress for this long is requeued, in seconds
+    JOBS_LEASE_TIMEOUT: float = 120.0
+    JOBS_MAX_ATTEMPTS: int = 3
+    # finished jobs and their files are deleted after this time, in seconds
+    JOBS_RESULT_TTL: float = 86400.0
+    # how often jobs queued by other workers are picked up, in seconds
+    JOBS_POLL_INTERVAL: float = 5.0
+
+    # in-process columnar snapshot of users for stats, requires numpy
+    ANALYTICS_ENABLED: bool = False
+    # snapshot above this size is dropped, stats are computed in SQL, bytes
+    ANALYTICS_MAX_BYTES: int = 64 * 1024 * 1024
+    # how often writes of other workers are applied, in seconds
+    ANALYTICS_SYNC_INTERVAL: float = 1.0
+
+    # in-memory Bloom filter of taken usernames and emails
+    EXISTENCE_FILTER_ENABLED: bool = False
+    # false positive rate, hits are confirmed by query
+    EXISTENCE_FILTER_ERROR_RATE: float = 0.01
+    # how often writes of other workers are applied, in seconds
+    EXISTENCE_FILTER_SYNC_INTERVAL: float = 1.0
+
+    # warm-up of each worker before it is ready, see /readyz
+    WARMUP_ENABLED: bool = False
+
+    # pre-fork server started with "serve" command
+    SERVER_WORKERS: int = 2
+    SERVER_THREADS: int = 8
+    # worker is replaced after this number of requests, 0 disables
+    SERVER_MAX_REQUESTS: int = 0
+    SERVER_MAX_REQUESTS_JITTER: int = 0
+    # seconds for in-flight requests to finish on restart or stop
+    SERVER_GRACEFUL_TIMEOUT: float = 30.0
+    SERVER_BACKLOG: int = 2048
 
     model_config = SettingsConfigDict(
         env_file=".env",
     )
+
+    @property
+    def is_production(self) -> bool:
+        """
+        Check if application runs with production profile.
+        :return: True if production profile is enabled
+        """
+        return self.APP_PROFILE == "production"
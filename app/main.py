@@ -7,8 +7,41 @@ from flask import Flask
 import logging
 
 from app.config import Settings
-from app.src.core import db
-from app.src.routers import users_router, setup_swagger
+from app.src.commands import (
+    compact_changes_command,
+    serve_command,
+    profile_report_command,
+    profile_token_command,
+)
+from app.src.core import (
+    db,
+    AdmissionController,
+    RequestDeadlines,
+    RequestProfiler,
+)
+from app.src.routers import (
+    users_router,
+    metrics_router,
+    health_router,
+    setup_openapi,
+    setup_swagger,
+)
+from app.src.repositories import (
+    CacheBackend,
+    MemoryCacheBackend,
+    SQLiteCacheBackend,
+    DatabaseIdempotencyStore,
+    MemoryIdempotencyStore,
+    UserWritePipeline,
+    UserExistenceFilter,
+)
+from app.src.services import (
+    StatsRefresher,
+    UserJobRunner,
+    UserAnalytics,
+    AppWarmup,
+)
+from app.src.utils import SingleFlight
 
 
 def init_logging(settings: Settings) -> None:
@@ -18,18 +51,147 @@ def init_logging(settings: Settings) -> None:
     )
 
 
-def create_app(settings: Settings) -> Flask:
+def create_app(settings: Settings | None = None) -> Flask:
+    # settings from environment if not provided, e.g. for "flask" CLI
+    settings = settings or Settings()
     app = Flask(__name__)
+    app.extensions["settings"] = settings
     app.config["SQLALCHEMY_DATABASE_URI"] = settings.DB_URL
     # init app to db
     db.init_app(app)
     # registration routers
     app.register_blueprint(users_router)
-    # init Swagger
-    setup_swagger(
+    app.register_blueprint(metrics_router)
+    app.register_blueprint(health_router)
+    # registration CLI commands
+    app.cli.add_command(compact_changes_command)
+    app.cli.add_command(serve_command)
+    app.cli.add_command(profile_report_command)
+    app.cli.add_command(profile_token_command)
+    # init deadlines before admission control, queueing counts against them
+    if settings.DEADLINES_ENABLED:
+        RequestDeadlines(
+            budgets=settings.DEADLINE_BUDGETS,
+            route_budgets=settings.DEADLINE_ROUTE_BUDGETS,
+            blueprint=users_router.name,
+        ).init_app(app)
+    # init admission control
+    if settings.ADMISSION_CONTROL_ENABLED:
+        AdmissionController(
+            limits=settings.ADMISSION_LIMITS,
+            latency_targets=settings.ADMISSION_LATENCY_TARGETS,
+            max_queue=settings.ADMISSION_MAX_QUEUE,
+            queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT,
+            blueprint=users_router.name,
+        ).init_app(app)
+    # init profiling of requests
+    if settings.PROFILING_ENABLED:
+        RequestProfiler(
+            directory=settings.PROFILING_DIR
+            or os.path.join(app.instance_path, "profiles"),
+            blueprint=users_router.name,
+            secret=settings.PROFILING_SECRET,
+            sample_rate=settings.PROFILING_SAMPLE_RATE,
+        ).init_app(app)
+    # init coalescing of stats computations
+    if settings.SINGLE_FLIGHT_ENABLED:
+        app.extensions["single_flight"] = SingleFlight(
+            default_timeout=settings.SINGLE_FLIGHT_TIMEOUT,
+            timeouts=settings.SINGLE_FLIGHT_TIMEOUTS,
+            lock_dir=settings.SINGLE_FLIGHT_LOCK_DIR,
+            result_ttl=settings.SINGLE_FLIGHT_RESULT_TTL,
+        )
+    # init background refresh of stats snapshots
+    if settings.STATS_REFRESH_ENABLED:
+        StatsRefresher(
+            interval=settings.STATS_REFRESH_INTERVAL,
+            max_staleness=settings.STATS_MAX_STALENESS,
+            tracked_domains=settings.STATS_TRACKED_DOMAINS,
+            max_recent_domains=settings.STATS_MAX_RECENT_DOMAINS,
+        ).init_app(app)
+    # init store of idempotency keys
+    if settings.IDEMPOTENCY_ENABLED:
+        if settings.IDEMPOTENCY_STORE == "database":
+            app.extensions["idempotency"] = DatabaseIdempotencyStore(
+                db=db,
+                ttl=settings.IDEMPOTENCY_TTL,
+                lock_ttl=settings.IDEMPOTENCY_LOCK_TTL,
+                wait_timeout=settings.IDEMPOTENCY_WAIT_TIMEOUT,
+            )
+        else:
+            app.extensions["idempotency"] = MemoryIdempotencyStore(
+                ttl=settings.IDEMPOTENCY_TTL,
+                lock_ttl=settings.IDEMPOTENCY_LOCK_TTL,
+                wait_timeout=settings.IDEMPOTENCY_WAIT_TIMEOUT,
+            )
+    # init cache of user lookups and stats results
+    cache: CacheBackend | None = None
+    if settings.CACHE_ENABLED:
+        if settings.CACHE_STORE == "sqlite":
+            cache = SQLiteCacheBackend(
+                path=settings.CACHE_PATH
+                or os.path.join(app.instance_path, "cache.sqlite3"),
+                ttl=settings.CACHE_TTL,
+                max_entries=settings.CACHE_MAX_ENTRIES,
+            )
+        else:
+            cache = MemoryCacheBackend(
+                ttl=settings.CACHE_TTL,
+                max_entries=settings.CACHE_MAX_ENTRIES,
+            )
+        cache.init_app(app)
+    # init in-process analytics of users stats
+    if settings.ANALYTICS_ENABLED:
+        UserAnalytics(
+            max_bytes=settings.ANALYTICS_MAX_BYTES,
+            sync_interval=settings.ANALYTICS_SYNC_INTERVAL,
+        ).init_app(app)
+    # init filter of taken usernames and emails
+    if settings.EXISTENCE_FILTER_ENABLED:
+        UserExistenceFilter(
+            db=db,
+            error_rate=settings.EXISTENCE_FILTER_ERROR_RATE,
+            sync_interval=settings.EXISTENCE_FILTER_SYNC_INTERVAL,
+        ).init_app(app)
+    # init group commit of user writes
+    if settings.WRITE_BATCHING_ENABLED:
+        UserWritePipeline(
+            db=db,
+            window=settings.WRITE_BATCH_WINDOW,
+            max_batch_size=settings.WRITE_BATCH_MAX_SIZE,
+            cache=cache,
+            analytics=app.extensions.get("analytics"),
+            existence_filter=app.extensions.get("existence_filter"),
+        ).init_app(app)
+    # init background export and report jobs
+    if settings.JOBS_ENABLED:
+        UserJobRunner(
+            directory=settings.JOBS_DIR
+            or os.path.join(app.instance_path, "jobs"),
+            max_concurrent=settings.JOBS_MAX_CONCURRENT,
+            max_active=settings.JOBS_MAX_ACTIVE,
+            batch_size=settings.JOBS_BATCH_SIZE,
+            lease_timeout=settings.JOBS_LEASE_TIMEOUT,
+            max_attempts=settings.JOBS_MAX_ATTEMPTS,
+            result_ttl=settings.JOBS_RESULT_TTL,
+            poll_interval=settings.JOBS_POLL_INTERVAL,
+        ).init_app(app)
+    # serve OpenAPI document
+    setup_openapi(
         app=app,
         settings=settings,
     )
+    # init Swagger UI, not needed in production
+    if not settings.is_production:
+        setup_swagger(
+            app=app,
+            settings=settings,
+        )
+    # warm up after all components are registered
+    if settings.WARMUP_ENABLED:
+        warmup = AppWarmup()
+        warmup.init_app(app)
+        warmup.run()
     return app
 
 
@@ -0,0 +1,11 @@
+from .changes import compact_changes_command
+from .serve import serve_command
+from .profiling import profile_report_command, profile_token_command
+
+
+__all__ = (
+    "compact_changes_command",
+    "serve_command",
+    "profile_report_command",
+    "profile_token_command",
+)
@@ -0,0 +1,28 @@
+from datetime import (
+    datetime as dt,
+    timedelta as td,
+)
+
+import click
+from flask.cli import with_appcontext
+
+from app.src.core import db
+from app.src.repositories import UserChangeRepository
+
+
+@click.command("compact-changes")
+@click.option(
+    "--keep-days",
+    type=click.IntRange(min=0),
+    default=30,
+    show_default=True,
+    help="Keep changes made within this number of days.",
+)
+@with_appcontext
+def compact_changes_command(keep_days: int) -> None:
+    """
+    Delete old entries of user change log.
+    """
+    repo = UserChangeRepository(db)
+    deleted = repo.compact(before=dt.now() - td(days=keep_days))
+    click.echo(f"Deleted {deleted} changes older than {keep_days} days")
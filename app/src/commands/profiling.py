@@ -0,0 +1,93 @@
+import glob
+import io
+import os
+import pstats
+import time
+from collections import defaultdict
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from app.src.core import sign_profile_token
+
+
+def _profiles_directory() -> str:
+    settings = current_app.extensions["settings"]
+    return settings.PROFILING_DIR or os.path.join(
+        current_app.instance_path, "profiles"
+    )
+
+
+@click.command("profile-report")
+@click.option(
+    "--top",
+    type=click.IntRange(min=1),
+    default=20,
+    show_default=True,
+    help="Number of functions in report.",
+)
+@click.option(
+    "--sort",
+    type=click.Choice(["cumulative", "tottime", "ncalls"]),
+    default="cumulative",
+    show_default=True,
+    help="Sort key of functions.",
+)
+@click.option(
+    "--endpoint",
+    help="Only profiles of endpoints containing this text.",
+)
+@with_appcontext
+def profile_report_command(top: int, sort: str, endpoint: str | None) -> None:
+    """
+    Aggregate request profiles into report of hotspots.
+    """
+    directory = _profiles_directory()
+    files = sorted(glob.glob(os.path.join(directory, "*.prof")))
+    # file name: <time>-<endpoint>-<duration>ms-<pid>-<sequence>.prof
+    durations: dict[str, list[float]] = defaultdict(list)
+    selected = []
+    for path in files:
+        parts = os.path.basename(path).split("-")
+        if len(parts) != 5:
+            continue
+        name, duration = parts[1], float(parts[2].removesuffix("ms"))
+        if endpoint is not None and endpoint not in name:
+            continue
+        durations[name].append(duration)
+        selected.append(path)
+    if not selected:
+        click.echo(f"No profiles found in {directory}")
+        return
+
+    click.echo(f"{'endpoint':<50} {'count':>6} {'avg ms':>10} {'max ms':>10}")
+    for name, values in sorted(durations.items()):
+        click.echo(
+            f"{name:<50} {len(values):>6} "
+            f"{sum(values) / len(values):>10.1f} {max(values):>10.1f}"
+        )
+    stream = io.StringIO()
+    stats = pstats.Stats(*selected, stream=stream)
+    stats.strip_dirs().sort_stats(sort).print_stats(top)
+    click.echo(stream.getvalue())
+
+
+@click.command("profile-token")
+@click.argument("path")
+@click.option(
+    "--ttl",
+    type=click.IntRange(min=1),
+    default=300,
+    show_default=True,
+    help="Seconds the token is valid for.",
+)
+@with_appcontext
+def profile_token_command(path: str, ttl: int) -> None:
+    """
+    Print value of X-Profile header enabling profiling of requests to PATH.
+    """
+    secret = current_app.extensions["settings"].PROFILING_SECRET
+    if not secret:
+        raise click.UsageError("PROFILING_SECRET is not set")
+    click.echo(sign_profile_token(secret, path, int(time.time()) + ttl))
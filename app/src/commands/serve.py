@@ -0,0 +1,64 @@
+import logging
+
+import click
+from flask.cli import ScriptInfo, with_appcontext
+
+from app.src.core import PreforkServer
+
+
+@click.command("serve")
+@click.option("--host", help="Host to bind, API_HOST by default.")
+@click.option(
+    "--port",
+    type=click.IntRange(min=0),
+    help="Port to bind, API_PORT by default.",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    help="Number of worker processes, SERVER_WORKERS by default.",
+)
+@click.option(
+    "--threads",
+    type=click.IntRange(min=1),
+    help="Number of threads per worker, SERVER_THREADS by default.",
+)
+@click.option(
+    "--max-requests",
+    type=click.IntRange(min=0),
+    help="Recycle worker after this number of requests, 0 disables.",
+)
+@with_appcontext
+def serve_command(
+    host: str | None,
+    port: int | None,
+    workers: int | None,
+    threads: int | None,
+    max_requests: int | None,
+) -> None:
+    """
+    Run application on pre-fork multi-worker server.
+    """
+    # application itself, not proxy of current_app, as threads of
+    # workers have no application context to resolve it
+    app = click.get_current_context().ensure_object(ScriptInfo).load_app()
+    settings = app.extensions["settings"]
+    logging.basicConfig(level=settings.LOG_LEVEL, format=settings.LOG_FORMAT)
+    server = PreforkServer(
+        app=app,
+        host=host or settings.API_HOST,
+        port=settings.API_PORT if port is None else port,
+        workers=workers or settings.SERVER_WORKERS,
+        threads=threads or settings.SERVER_THREADS,
+        max_requests=(
+            settings.SERVER_MAX_REQUESTS
+            if max_requests is None
+            else max_requests
+        ),
+        max_requests_jitter=settings.SERVER_MAX_REQUESTS_JITTER,
+        graceful_timeout=settings.SERVER_GRACEFUL_TIMEOUT,
+        backlog=settings.SERVER_BACKLOG,
+    )
+    server.bind()
+    click.echo(f"Serving on http://{server.host}:{server.port}")
+    server.run()
@@ -3,9 +3,41 @@ from .db import (
     Base,
     metadata,
 )
+from .metrics import (
+    register_metrics,
+    collect_metrics,
+)
+from .admission import (
+    AdaptiveConcurrencyLimiter,
+    AdmissionController,
+    classify_request,
+)
+from .deadlines import (
+    RequestDeadlines,
+    DEADLINE_HEADER,
+)
+from .profiler import (
+    RequestProfiler,
+    sign_profile_token,
+)
+from .server import (
+    PooledWSGIServer,
+    PreforkServer,
+)
 
 __all__ = (
     "db",
     "Base",
     "metadata",
+    "register_metrics",
+    "collect_metrics",
+    "AdaptiveConcurrencyLimiter",
+    "AdmissionController",
+    "classify_request",
+    "RequestDeadlines",
+    "DEADLINE_HEADER",
+    "RequestProfiler",
+    "sign_profile_token",
+    "PooledWSGIServer",
+    "PreforkServer",
 )
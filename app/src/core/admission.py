@@ -0,0 +1,216 @@
+import math
+import threading
+import time
+from typing import Any
+
+from flask import Flask, Response, g, jsonify, make_response, request
+
+from app.src.core.metrics import register_metrics
+
+WRITE_METHODS = frozenset(("POST", "PUT", "PATCH", "DELETE"))
+
+
+def classify_request(blueprint: str) -> str | None:
+    """
+    Get endpoint class of current request.
+    :param blueprint: name of blueprint of classified endpoints
+    :return: "reads", "writes" or "stats",
+    None if request is not to the blueprint
+    """
+    if request.blueprint != blueprint:
+        return None
+    if request.method in WRITE_METHODS:
+        return "writes"
+    if request.url_rule is not None and "/stats/" in request.url_rule.rule:
+        return "stats"
+    return "reads"
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Concurrency limiter with bounded queue and AIMD limit adaptation.
+
+    The limit grows additively while observed latency stays below target
+    and the limit is saturated, and shrinks multiplicatively when latency
+    exceeds the target.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        latency_target: float,
+        max_queue: int,
+        queue_timeout: float,
+        min_limit: int = 1,
+        max_limit: int | None = None,
+        backoff_ratio: float = 0.9,
+    ) -> None:
+        self._limit = float(initial_limit)
+        self._min_limit = min_limit
+        self._max_limit = max_limit or initial_limit * 4
+        self._latency_target = latency_target
+        self._max_queue = max_queue
+        self._queue_timeout = queue_timeout
+        self._backoff_ratio = backoff_ratio
+        self._cond = threading.Condition()
+
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted_total = 0
+        self.queued_total = 0
+        self.rejected_total = 0
+
+    @property
+    def limit(self) -> int:
+        """
+        Current concurrency limit.
+        :return: number of requests allowed to run concurrently
+        """
+        return max(self._min_limit, int(self._limit))
+
+    def _has_capacity(self) -> bool:
+        return self.in_flight < self.limit
+
+    def acquire(self) -> bool:
+        """
+        Acquire a slot, waiting in queue for at most queue timeout.
+        :return: True if slot acquired, False if request must be rejected
+        """
+        with self._cond:
+            if not self._has_capacity():
+                if self.queued >= self._max_queue:
+                    self.rejected_total += 1
+                    return False
+
+                self.queued += 1
+                self.queued_total += 1
+                try:
+                    acquired = self._cond.wait_for(
+                        self._has_capacity, timeout=self._queue_timeout
+                    )
+                finally:
+                    self.queued -= 1
+
+                if not acquired:
+                    self.rejected_total += 1
+                    return False
+
+            self.in_flight += 1
+            self.admitted_total += 1
+            return True
+
+    def release(self, latency: float) -> None:
+        """
+        Release slot and adapt limit from observed latency.
+        :param latency: request latency in seconds
+        """
+        with self._cond:
+            saturated = self.in_flight >= self.limit
+            self.in_flight -= 1
+
+            if latency > self._latency_target:
+                self._limit = max(
+                    float(self._min_limit), self._limit * self._backoff_ratio
+                )
+            elif saturated:
+                self._limit = min(
+                    float(self._max_limit), self._limit + 1 / self._limit
+                )
+
+            self._cond.notify()
+
+    def retry_after(self) -> int:
+        """
+        Suggested delay before retry for rejected requests.
+        :return: delay in whole seconds
+        """
+        return max(1, math.ceil(self._latency_target))
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Limiter counters snapshot.
+        :return: counters as dict
+        """
+        with self._cond:
+            return {
+                "limit": self.limit,
+                "in_flight": self.in_flight,
+                "queued": self.queued,
+                "admitted_total": self.admitted_total,
+                "queued_total": self.queued_total,
+                "rejected_total": self.rejected_total,
+            }
+
+
+class AdmissionController:
+    """
+    Admission control for users API with separate budgets
+    for point reads, writes and stats endpoints.
+    """
+
+    def __init__(
+        self,
+        limits: dict[str, int],
+        latency_targets: dict[str, float],
+        max_queue: int,
+        queue_timeout: float,
+        blueprint: str,
+    ) -> None:
+        self._blueprint = blueprint
+        self.limiters = {
+            name: AdaptiveConcurrencyLimiter(
+                initial_limit=limit,
+                latency_target=latency_targets[name],
+                max_queue=max_queue,
+                queue_timeout=queue_timeout,
+            )
+            for name, limit in limits.items()
+        }
+
+    def classify(self) -> str | None:
+        """
+        Get endpoint class of current request.
+        :return: endpoint class name or None if request is not limited
+        """
+        return classify_request(self._blueprint)
+
+    def _before_request(self) -> Response | None:
+        endpoint_class = self.classify()
+        limiter = self.limiters.get(endpoint_class or "")
+        if limiter is None:
+            return None
+
+        if not limiter.acquire():
+            response = make_response(
+                jsonify({"error": "Server is over capacity, retry later"}),
+                503,
+            )
+            response.headers["Retry-After"] = str(limiter.retry_after())
+            return response
+
+        g.admission_limiter = limiter
+        g.admission_started_at = time.monotonic()
+        return None
+
+    def _teardown_request(self, exc: BaseException | None) -> None:
+        limiter = g.pop("admission_limiter", None)
+        if limiter is not None:
+            latency = time.monotonic() - g.pop("admission_started_at")
+            limiter.release(latency)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Counters of all limiters.
+        :return: counters grouped by endpoint class
+        """
+        return {name: lim.stats() for name, lim in self.limiters.items()}
+
+    def init_app(self, app: Flask) -> None:
+        """
+        Register admission control hooks and metrics for application.
+        :param app: Flask application
+        """
+        app.before_request(self._before_request)
+        app.teardown_request(self._teardown_request)
+        app.extensions["admission"] = self
+        register_metrics(app, "admission", self.stats)
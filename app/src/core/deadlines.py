@@ -0,0 +1,232 @@
+import math
+import sqlite3
+import threading
+import time
+from typing import Any
+
+from flask import (
+    Flask,
+    Response,
+    g,
+    has_request_context,
+    jsonify,
+    make_response,
+    request,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, ExceptionContext
+
+from app.src.core.admission import classify_request
+from app.src.core.db import db
+from app.src.core.metrics import register_metrics
+from app.src.exceptions import DeadlineExceededException
+
+DEADLINE_HEADER = "X-Request-Deadline"
+
+# SQLite calls progress handler after this many virtual machine instructions
+_PROGRESS_INSTRUCTIONS = 1000
+# SQLSTATE of statement canceled by statement_timeout in PostgreSQL
+_QUERY_CANCELED = "57014"
+
+
+class RequestDeadlines:
+    """
+    Deadlines of users API requests enforced by database.
+
+    Each request gets a time budget of its endpoint: budget of view
+    function if configured, budget of its endpoint class otherwise.
+    X-Request-Deadline header in seconds can only shorten it. Time spent
+    in queue of admission control counts against the budget.
+
+    Every statement executed by request thread gets remaining time:
+    SQLite connection interrupts it from progress handler, PostgreSQL
+    connection has statement_timeout set for current transaction.
+    Interrupted statement raises DeadlineExceededException answered with
+    status 504, connection is returned to pool by teardown of request.
+    Statements of other dialects and of background threads, such as
+    write pipeline and jobs, are not limited.
+    """
+
+    def __init__(
+        self,
+        budgets: dict[str, float],
+        route_budgets: dict[str, float],
+        blueprint: str,
+    ) -> None:
+        """
+        :param budgets: budgets by endpoint class, in seconds
+        :param route_budgets: budgets by view function name,
+        override budget of its class
+        :param blueprint: name of blueprint of limited endpoints
+        """
+        self._budgets = budgets
+        self._route_budgets = route_budgets
+        self._blueprint = blueprint
+        self._lock = threading.Lock()
+
+        self.requests_total = 0
+        self.from_header_total = 0
+        self.invalid_header_total = 0
+        self.exceeded_total = 0
+        self.exceeded_by_endpoint: dict[str, int] = {}
+
+    def init_app(self, app: Flask) -> None:
+        """
+        Register request hooks, statement events of database engines,
+        error handler and metrics for application.
+        :param app: Flask application
+        """
+        app.before_request(self._before_request)
+        app.register_error_handler(
+            DeadlineExceededException, self._deadline_exceeded
+        )
+        with app.app_context():
+            engines = list(db.engines.values())
+        for engine in engines:
+            event.listen(
+                engine, "before_cursor_execute", self._before_cursor_execute
+            )
+            event.listen(engine, "handle_error", self._handle_error)
+            event.listen(engine, "checkin", self._checkin)
+        app.extensions["deadlines"] = self
+        register_metrics(app, "deadlines", self.stats)
+
+    def _budget(self) -> float | None:
+        endpoint_class = classify_request(self._blueprint)
+        if endpoint_class is None:
+            return None
+        view_name = (request.endpoint or "").rpartition(".")[2]
+        budget = self._route_budgets.get(view_name)
+        if budget is None:
+            budget = self._budgets.get(endpoint_class)
+        return budget
+
+    def _before_request(self) -> Response | None:
+        started_at = time.monotonic()
+        budget = self._budget()
+        if budget is None:
+            return None
+
+        header = request.headers.get(DEADLINE_HEADER)
+        if header is not None:
+            try:
+                requested = float(header)
+            except ValueError:
+                requested = math.nan
+            if not math.isfinite(requested):
+                with self._lock:
+                    self.invalid_header_total += 1
+                return make_response(
+                    jsonify(
+                        {
+                            "error": f"{DEADLINE_HEADER} must be "
+                            f"a number of seconds"
+                        }
+                    ),
+                    400,
+                )
+            with self._lock:
+                self.from_header_total += 1
+            budget = min(budget, requested)
+
+        with self._lock:
+            self.requests_total += 1
+        if budget <= 0:
+            raise DeadlineExceededException(budget)
+        g.deadline_budget = budget
+        g.deadline_at = started_at + budget
+        return None
+
+    @staticmethod
+    def _current() -> tuple[float, float] | None:
+        """
+        Deadline of request served by current thread.
+        :return: deadline on monotonic clock and budget,
+        None if there is no deadline
+        """
+        if not has_request_context() or "deadline_at" not in g:
+            return None
+        return g.deadline_at, g.deadline_budget
+
+    def _before_cursor_execute(
+        self,
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        current = self._current()
+        if current is None:
+            return
+        deadline_at = current[0]
+        remaining = deadline_at - time.monotonic()
+        dbapi_connection = conn.connection.dbapi_connection
+        if isinstance(dbapi_connection, sqlite3.Connection):
+            # statement started past deadline is interrupted at once
+            dbapi_connection.set_progress_handler(
+                lambda: time.monotonic() >= deadline_at,
+                _PROGRESS_INSTRUCTIONS if remaining > 0 else 1,
+            )
+        elif conn.dialect.name == "postgresql":
+            remaining_ms = remaining * 1000
+            # 0 disables the timeout, so at least 1 ms; reset at the
+            # end of transaction, before connection is reused
+            cursor.execute(
+                "SELECT set_config('statement_timeout', %s, true)",
+                (str(max(1, math.ceil(remaining_ms))),),
+            )
+        else:
+            return
+        conn.connection.info["deadline"] = True
+
+    def _handle_error(self, context: ExceptionContext) -> None:
+        current = self._current()
+        if current is None:
+            return
+        orig = context.original_exception
+        interrupted = (
+            isinstance(orig, sqlite3.OperationalError)
+            and str(orig) == "interrupted"
+            or getattr(orig, "pgcode", None) == _QUERY_CANCELED
+            or getattr(orig, "sqlstate", None) == _QUERY_CANCELED
+        )
+        if interrupted:
+            raise DeadlineExceededException(current[1]) from orig
+
+    @staticmethod
+    def _checkin(dbapi_connection: Any, connection_record: Any) -> None:
+        if connection_record.info.pop("deadline", False) and isinstance(
+            dbapi_connection, sqlite3.Connection
+        ):
+            dbapi_connection.set_progress_handler(None, 0)
+
+    def _deadline_exceeded(self, exc: DeadlineExceededException) -> Response:
+        view_name = (request.endpoint or "").rpartition(".")[2]
+        with self._lock:
+            self.exceeded_total += 1
+            self.exceeded_by_endpoint[view_name] = (
+                self.exceeded_by_endpoint.get(view_name, 0) + 1
+            )
+        return make_response(
+            jsonify(
+                {"error": f"Request deadline of {exc.budget:g}s exceeded"}
+            ),
+            504,
+        )
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Deadline counters.
+        :return: counters as dict
+        """
+        with self._lock:
+            return {
+                "budgets": {**self._budgets, **self._route_budgets},
+                "requests_total": self.requests_total,
+                "from_header_total": self.from_header_total,
+                "invalid_header_total": self.invalid_header_total,
+                "exceeded_total": self.exceeded_total,
+                "exceeded_by_endpoint": dict(self.exceeded_by_endpoint),
+            }
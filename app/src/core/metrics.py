@@ -0,0 +1,30 @@
+from typing import Any, Callable
+
+from flask import Flask
+
+"""
+Registry of metrics providers exposed by metrics endpoint.
+Each provider is a callable returning JSON-serializable dict.
+"""
+
+MetricsProvider = Callable[[], dict[str, Any]]
+
+
+def register_metrics(app: Flask, name: str, provider: MetricsProvider) -> None:
+    """
+    Register metrics provider for application.
+    :param app: Flask application
+    :param name: name of metrics section
+    :param provider: callable returning metrics as dict
+    """
+    app.extensions.setdefault("metrics", {})[name] = provider
+
+
+def collect_metrics(app: Flask) -> dict[str, dict[str, Any]]:
+    """
+    Collect metrics from all registered providers.
+    :param app: Flask application
+    :return: metrics grouped by section name
+    """
+    providers: dict[str, MetricsProvider] = app.extensions.get("metrics", {})
+    return {name: provider() for name, provider in providers.items()}
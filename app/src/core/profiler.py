@@ -0,0 +1,162 @@
+import cProfile
+import hashlib
+import hmac
+import itertools
+import os
+import random
+import threading
+import time
+from typing import Any
+
+from flask import Flask, Response, g, request
+
+from app.src.core.metrics import register_metrics
+
+
+def sign_profile_token(secret: str, path: str, expires_at: int) -> str:
+    """
+    Create value of profiling header for requests to path.
+    :param secret: shared secret of profiler
+    :param path: request path, e.g. "/api/users/"
+    :param expires_at: unix time after which token is rejected
+    :return: token "<expires_at>:<signature>"
+    """
+    signature = hmac.new(
+        secret.encode(),
+        f"{expires_at}:{path}".encode(),
+        hashlib.sha256,
+    ).hexdigest()
+    return f"{expires_at}:{signature}"
+
+
+class RequestProfiler:
+    """
+    Opt-in cProfile profiling of requests to users API.
+
+    Request is profiled if it carries valid signed header, see
+    sign_profile_token(), or if it is sampled at configured rate.
+    Profile of each request is written to its own file named after
+    time, endpoint, duration, process and sequence number, for
+    "profile-report" command.
+
+    Only one request is profiled at a time in process, cProfile can not
+    profile concurrent threads independently. Requests arriving while
+    another one is profiled are served as usual and counted as skipped.
+    """
+
+    HEADER = "X-Profile"
+    RESPONSE_HEADER = "X-Profile-File"
+
+    def __init__(
+        self,
+        directory: str,
+        blueprint: str,
+        secret: str | None = None,
+        sample_rate: float = 0.0,
+    ) -> None:
+        """
+        :param directory: directory for profile files, created if needed
+        :param blueprint: name of profiled blueprint
+        :param secret: secret of signed header, header is ignored if None
+        :param sample_rate: share of requests profiled without header
+        """
+        self._directory = directory
+        self._blueprint = blueprint
+        self._secret = secret
+        self._sample_rate = sample_rate
+        self._lock = threading.Lock()
+        # requests with equal duration can finish in the same second
+        self._sequence = itertools.count()
+        self.profiled_total = 0
+        self.skipped_total = 0
+        self.rejected_tokens_total = 0
+
+    def _token_is_valid(self, token: str) -> bool:
+        if self._secret is None:
+            return False
+        expires_at, _, _ = token.partition(":")
+        if not expires_at.isdigit() or int(expires_at) < time.time():
+            return False
+        expected = sign_profile_token(
+            self._secret, request.path, int(expires_at)
+        )
+        return hmac.compare_digest(token, expected)
+
+    def _should_profile(self) -> bool:
+        token = request.headers.get(self.HEADER)
+        if token is not None:
+            if self._token_is_valid(token):
+                return True
+            self.rejected_tokens_total += 1
+        return bool(self._sample_rate) and random.random() < self._sample_rate
+
+    def _before_request(self) -> None:
+        if request.blueprint != self._blueprint or not self._should_profile():
+            return
+        if not self._lock.acquire(blocking=False):
+            self.skipped_total += 1
+            return
+        profile = cProfile.Profile()
+        g.profiler_started_at = time.perf_counter()
+        g.profile = profile
+        profile.enable()
+
+    def _finish(self) -> str | None:
+        profile: cProfile.Profile | None = g.pop("profile", None)
+        if profile is None:
+            return None
+        try:
+            profile.disable()
+            elapsed_ms = (time.perf_counter() - g.profiler_started_at) * 1000
+            filename = "{}-{}-{:.1f}ms-{}-{}.prof".format(
+                time.strftime("%Y%m%dT%H%M%S"),
+                request.endpoint or "unknown",
+                elapsed_ms,
+                os.getpid(),
+                next(self._sequence),
+            )
+            os.makedirs(self._directory, exist_ok=True)
+            profile.dump_stats(os.path.join(self._directory, filename))
+            self.profiled_total += 1
+            return filename
+        finally:
+            self._lock.release()
+
+    def _after_request(self, response: Response) -> Response:
+        filename = self._finish()
+        if filename is not None:
+            response.headers[self.RESPONSE_HEADER] = filename
+        return response
+
+    def _teardown_request(self, exc: BaseException | None) -> None:
+        # request failed before after_request hooks
+        self._finish()
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Profiler counters.
+        :return: counters as dict
+        """
+        return {
+            "profiled_total": self.profiled_total,
+            "skipped_total": self.skipped_total,
+            "rejected_tokens_total": self.rejected_tokens_total,
+        }
+
+    def init_app(self, app: Flask) -> None:
+        """
+        Register profiling hooks and metrics for application.
+        :param app: Flask application
+        """
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        app.extensions["profiler"] = self
+        register_metrics(app, "profiler", self.stats)
+
+    @property
+    def directory(self) -> str:
+        """
+        Directory of profile files.
+        """
+        return self._directory
@@ -0,0 +1,294 @@
+import logging
+import os
+import random
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import FrameType
+from typing import Any
+
+from flask import Flask
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+from app.src.core.db import db
+
+
+logger = logging.getLogger(__name__)
+
+
+class _RequestHandler(WSGIRequestHandler):
+    # no keep-alive, idle connections must not hold threads of pool
+    protocol_version = "HTTP/1.0"
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """
+    WSGI server handling requests on fixed pool of threads.
+
+    When all threads are busy the accept loop waits, so pending
+    connections stay in the listen queue shared by all workers and are
+    taken by a less busy one.
+    """
+
+    multithread = True
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        app: Flask,
+        fd: int,
+        threads: int,
+        max_requests: int = 0,
+    ) -> None:
+        super().__init__(host, port, app, handler=_RequestHandler, fd=fd)
+        self.max_requests = max_requests
+        self.handled_requests = 0
+        self._slots = threading.BoundedSemaphore(threads)
+        self._executor = ThreadPoolExecutor(
+            max_workers=threads,
+            thread_name_prefix="wsgi-worker",
+        )
+        self._stopping = threading.Event()
+
+    def verify_request(self, request: Any, client_address: Any) -> bool:
+        # blocks accept loop until thread is free
+        self._slots.acquire()
+        return True
+
+    def process_request(self, request: Any, client_address: Any) -> None:
+        self.handled_requests += 1
+        self._executor.submit(self._handle, request, client_address)
+        if self.max_requests and self.handled_requests >= self.max_requests:
+            logger.info(
+                "Worker %s handled %s requests, recycling",
+                os.getpid(),
+                self.handled_requests,
+            )
+            self.stop()
+
+    def _handle(self, request: Any, client_address: Any) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        logger.exception("Error on handling request from %s", client_address)
+
+    def stop(self) -> None:
+        """
+        Stop accepting connections, can be called from any thread.
+        """
+        if not self._stopping.is_set():
+            self._stopping.set()
+            # shutdown() waits for serve_forever, it cannot run in its thread
+            threading.Thread(target=self.shutdown, daemon=True).start()
+
+    def serve_until_stopped(self) -> None:
+        """
+        Serve requests until stopped, then wait for in-flight requests.
+        """
+        try:
+            self.serve_forever(poll_interval=0.5)
+        finally:
+            self._executor.shutdown(wait=True)
+
+
+class PreforkServer:
+    """
+    Server binding listen socket once and pre-forking worker processes.
+
+    Every worker serves requests of the same application on a pool of
+    threads. Master process only supervises workers:
+
+    * a worker which exits (e.g. recycled after max requests) is replaced;
+    * SIGHUP gracefully restarts all workers, new worker is started before
+      the old one is asked to finish its in-flight requests;
+    * SIGTERM and SIGINT drain all workers and stop the server, workers
+      still running after graceful timeout are killed.
+    """
+
+    def __init__(
+        self,
+        app: Flask,
+        host: str,
+        port: int,
+        workers: int,
+        threads: int,
+        max_requests: int = 0,
+        max_requests_jitter: int = 0,
+        graceful_timeout: float = 30.0,
+        backlog: int = 2048,
+    ) -> None:
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.threads = threads
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.backlog = backlog
+        self.socket: socket.socket | None = None
+        self._children: dict[int, float | None] = {}  # pid -> stop deadline
+        self._stopping = False
+        self._restart_requested = False
+
+    def bind(self) -> socket.socket:
+        """
+        Create listen socket inherited by workers.
+        :return: bound socket
+        """
+        sock = socket.create_server(
+            (self.host, self.port),
+            family=(socket.AF_INET6 if ":" in self.host else socket.AF_INET),
+            backlog=self.backlog,
+            reuse_port=False,
+        )
+        sock.set_inheritable(True)
+        self.socket = sock
+        self.port = sock.getsockname()[1]
+        return sock
+
+    def run(self) -> None:
+        """
+        Start workers and supervise them until the server is stopped.
+        """
+        if not hasattr(os, "fork"):
+            raise RuntimeError("Pre-fork server requires os.fork()")
+        sock = self.socket if self.socket is not None else self.bind()
+        logger.info(
+            "Listening on %s:%s with %s workers, %s threads each",
+            self.host,
+            self.port,
+            self.workers,
+            self.threads,
+        )
+        # engine of master must not leak pooled connections to workers
+        self._dispose_engines(close=True)
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_restart)
+        try:
+            for _ in range(self.workers):
+                self._spawn()
+            self._supervise()
+        finally:
+            sock.close()
+
+    def _supervise(self) -> None:
+        while self._children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                if self._restart_requested:
+                    self._restart()
+                self._kill_overdue()
+                time.sleep(0.1)
+                continue
+            self._children.pop(pid, None)
+            if not self._stopping and len(self._alive()) < self.workers:
+                logger.info("Worker %s exited (%s), replacing", pid, status)
+                self._spawn()
+
+    def _alive(self) -> list[int]:
+        # workers not asked to stop
+        return [pid for pid, dl in self._children.items() if dl is None]
+
+    def _kill_overdue(self) -> None:
+        now = time.monotonic()
+        for pid, deadline in list(self._children.items()):
+            if deadline is not None and now > deadline:
+                logger.warning("Worker %s did not stop in time, killing", pid)
+                self._signal(pid, signal.SIGKILL)
+                self._children[pid] = float("inf")
+
+    def _retire(self, pid: int) -> None:
+        if self._children.get(pid) is None:
+            self._children[pid] = time.monotonic() + self.graceful_timeout
+            self._signal(pid, signal.SIGTERM)
+
+    @staticmethod
+    def _signal(pid: int, sig: signal.Signals) -> None:
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def _handle_stop(self, signum: int, frame: FrameType | None) -> None:
+        logger.info("Stopping, draining %s workers", len(self._children))
+        self._stopping = True
+        for pid in list(self._children):
+            self._retire(pid)
+
+    def _handle_restart(self, signum: int, frame: FrameType | None) -> None:
+        # workers are forked by supervising loop, not in signal handler
+        self._restart_requested = True
+
+    def _restart(self) -> None:
+        self._restart_requested = False
+        if self._stopping:
+            return
+        logger.info("Gracefully restarting workers")
+        for pid in self._alive():
+            self._spawn()
+            self._retire(pid)
+
+    def _spawn(self) -> int:
+        pid = os.fork()
+        if pid:
+            self._children[pid] = None
+            return pid
+        # worker process
+        code = 0
+        try:
+            self._run_worker()
+        except BaseException:
+            logger.exception("Worker %s failed", os.getpid())
+            code = 1
+        finally:
+            logging.shutdown()
+            os._exit(code)
+
+    def _run_worker(self) -> None:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        # connections of parent pool must not be used by this process
+        self._dispose_engines(close=False)
+        warmup = self.app.extensions.get("warmup")
+        if warmup is not None:
+            # pool of this process is opened before it accepts requests
+            warmup.run()
+        # socket is bound by master before workers are forked
+        assert self.socket is not None
+        max_requests = self.max_requests
+        if max_requests and self.max_requests_jitter:
+            # workers started together should not be recycled together
+            max_requests += random.randint(0, self.max_requests_jitter)
+        server = PooledWSGIServer(
+            host=self.host,
+            port=self.port,
+            app=self.app,
+            fd=self.socket.fileno(),
+            threads=self.threads,
+            max_requests=max_requests,
+        )
+        signal.signal(signal.SIGTERM, lambda signum, frame: server.stop())
+        logger.info("Worker %s started", os.getpid())
+        server.serve_until_stopped()
+        self._dispose_engines(close=True)
+        logger.info("Worker %s stopped", os.getpid())
+
+    def _dispose_engines(self, close: bool) -> None:
+        with self.app.app_context():
+            for engine in db.engines.values():
+                engine.dispose(close=close)
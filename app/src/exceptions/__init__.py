@@ -2,9 +2,23 @@ from .users_exc import (
     UserNotFoundException,
     UserAlreadyExistsException,
 )
+from .idempotency_exc import (
+    IdempotencyKeyReusedException,
+    IdempotencyKeyInProgressException,
+)
+from .jobs_exc import (
+    JobNotFoundException,
+    TooManyJobsException,
+)
+from .deadline_exc import DeadlineExceededException
 
 
 __all__ = (
     "UserNotFoundException",
     "UserAlreadyExistsException",
+    "IdempotencyKeyReusedException",
+    "IdempotencyKeyInProgressException",
+    "JobNotFoundException",
+    "TooManyJobsException",
+    "DeadlineExceededException",
 )
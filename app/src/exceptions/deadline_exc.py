@@ -0,0 +1,8 @@
+class DeadlineExceededException(Exception):
+    """
+    Exception for database statement interrupted at deadline of request.
+    """
+
+    def __init__(self, budget: float) -> None:
+        super().__init__()
+        self.budget = budget
@@ -0,0 +1,18 @@
+class IdempotencyKeyReusedException(Exception):
+    """
+    Exception for idempotency key reused with different request.
+    """
+
+    def __init__(self, key: str) -> None:
+        super().__init__()
+        self.key = key
+
+
+class IdempotencyKeyInProgressException(Exception):
+    """
+    Exception for request with idempotency key still in progress.
+    """
+
+    def __init__(self, key: str) -> None:
+        super().__init__()
+        self.key = key
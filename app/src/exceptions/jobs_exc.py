@@ -0,0 +1,18 @@
+class JobNotFoundException(Exception):
+    """
+    Exception for background job not found.
+    """
+
+    def __init__(self, job_id: str) -> None:
+        super().__init__()
+        self.job_id = job_id
+
+
+class TooManyJobsException(Exception):
+    """
+    Exception for job submitted while limit of unfinished jobs is reached.
+    """
+
+    def __init__(self, limit: int) -> None:
+        super().__init__()
+        self.limit = limit
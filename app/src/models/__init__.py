@@ -1,4 +1,14 @@
 from .user_model import User
+from .user_change_model import UserChange
+from .idempotency_key_model import IdempotencyKey
+from .user_job_model import UserJob
+from .expressions import EmailDomain
 
 
-__all__ = ("User",)
+__all__ = (
+    "User",
+    "UserChange",
+    "IdempotencyKey",
+    "UserJob",
+    "EmailDomain",
+)
@@ -0,0 +1,47 @@
+from typing import Any
+
+from sqlalchemy import String
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.compiler import SQLCompiler
+from sqlalchemy.sql.functions import FunctionElement
+
+
+class EmailDomain(FunctionElement[str]):
+    """
+    SQL expression of lower-cased domain part of email column.
+    Compiled to dialect specific string functions.
+    """
+
+    type = String()
+    name = "email_domain"
+    inherit_cache = True
+
+
+@compiles(EmailDomain)
+def _compile_email_domain(
+    element: EmailDomain,
+    compiler: SQLCompiler,
+    **kw: Any,
+) -> str:
+    email = compiler.process(element.clauses, **kw)
+    return f"lower(substr({email}, instr({email}, '@') + 1))"
+
+
+@compiles(EmailDomain, "postgresql")
+def _compile_email_domain_postgresql(
+    element: EmailDomain,
+    compiler: SQLCompiler,
+    **kw: Any,
+) -> str:
+    email = compiler.process(element.clauses, **kw)
+    return f"lower(split_part({email}, '@', 2))"
+
+
+@compiles(EmailDomain, "mysql")
+def _compile_email_domain_mysql(
+    element: EmailDomain,
+    compiler: SQLCompiler,
+    **kw: Any,
+) -> str:
+    email = compiler.process(element.clauses, **kw)
+    return f"lower(substring_index({email}, '@', -1))"
@@ -0,0 +1,55 @@
+from sqlalchemy import String, LargeBinary
+from sqlalchemy.orm import (
+    Mapped,
+    mapped_column,
+)
+import datetime as dt
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from sqlalchemy.orm import declarative_base
+
+    Base = declarative_base()
+else:
+    from app.src.core import Base
+
+
+class IdempotencyKey(Base):
+    """
+    Idempotency key ORM model. Stores fingerprint of request
+    and its final response for replay.
+
+    Fields:
+    key: value of Idempotency-Key header
+    fingerprint: hash of request method, path and body
+    status_code: response status code, None while request is in progress
+    content_type: response content type
+    response_body: response body
+    expires_at: time after which record is evicted
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    key: Mapped[str] = mapped_column(
+        String(255),
+        primary_key=True,
+    )
+    fingerprint: Mapped[str] = mapped_column(
+        String(64),
+        nullable=False,
+    )
+    status_code: Mapped[int | None] = mapped_column(
+        nullable=True,
+    )
+    content_type: Mapped[str | None] = mapped_column(
+        String(128),
+        nullable=True,
+    )
+    response_body: Mapped[bytes | None] = mapped_column(
+        LargeBinary,
+        nullable=True,
+    )
+    expires_at: Mapped[dt.datetime] = mapped_column(
+        nullable=False,
+        index=True,
+    )
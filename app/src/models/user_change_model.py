@@ -0,0 +1,50 @@
+from sqlalchemy import String
+from sqlalchemy.orm import (
+    Mapped,
+    mapped_column,
+)
+import datetime as dt
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from sqlalchemy.orm import declarative_base
+
+    Base = declarative_base()
+else:
+    from app.src.core import Base
+
+
+class UserChange(Base):
+    """
+    User change log ORM model. Row is written in the same transaction
+    as the change of user. Seq grows in order of inserts, which is order
+    of commits only with one writer at a time, as on SQLite.
+
+    Fields:
+    seq: sequence number of change
+    user_id: identification number of changed user
+    operation: "insert", "update" or "delete"
+    changed_at: time of change
+    """
+
+    __tablename__ = "user_changes"
+    # never reuse seq of deleted rows on SQLite
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    seq: Mapped[int] = mapped_column(
+        primary_key=True,
+        autoincrement=True,
+    )
+    user_id: Mapped[int] = mapped_column(
+        nullable=False,
+        index=True,
+    )
+    operation: Mapped[str] = mapped_column(
+        String(6),
+        nullable=False,
+    )
+    changed_at: Mapped[dt.datetime] = mapped_column(
+        nullable=False,
+        index=True,
+        default=dt.datetime.now,
+    )
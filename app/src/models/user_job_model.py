@@ -0,0 +1,95 @@
+from sqlalchemy import String, Text
+from sqlalchemy.orm import (
+    Mapped,
+    mapped_column,
+)
+import datetime as dt
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from sqlalchemy.orm import declarative_base
+
+    Base = declarative_base()
+else:
+    from app.src.core import Base
+
+
+class UserJob(Base):
+    """
+    Background job ORM model, export of users or stats report.
+    Row outlives worker processes, result file is kept in jobs directory.
+
+    Fields:
+    id: random identifier of job
+    kind: "export" or "report"
+    format: format of result file, "jsonl" or "csv" for exports,
+    "json" for reports
+    params: JSON of job parameters
+    status: "queued", "running", "succeeded" or "failed"
+    attempts: number of times job was started
+    rows_done: number of processed rows
+    rows_total: number of rows to process, None until known
+    result_file: name of result file in jobs directory
+    error: error message of failed job
+    created_at: time of job submission
+    started_at: time of last start
+    finished_at: time of success or failure
+    heartbeat_at: last time running job reported progress, job of
+    crashed worker is requeued when it gets too old
+    """
+
+    __tablename__ = "user_jobs"
+
+    id: Mapped[str] = mapped_column(
+        String(32),
+        primary_key=True,
+    )
+    kind: Mapped[str] = mapped_column(
+        String(6),
+        nullable=False,
+    )
+    format: Mapped[str] = mapped_column(
+        String(5),
+        nullable=False,
+    )
+    params: Mapped[str] = mapped_column(
+        Text,
+        nullable=False,
+    )
+    status: Mapped[str] = mapped_column(
+        String(9),
+        nullable=False,
+        index=True,
+    )
+    attempts: Mapped[int] = mapped_column(
+        nullable=False,
+        default=0,
+    )
+    rows_done: Mapped[int] = mapped_column(
+        nullable=False,
+        default=0,
+    )
+    rows_total: Mapped[int | None] = mapped_column(
+        nullable=True,
+    )
+    result_file: Mapped[str | None] = mapped_column(
+        String(64),
+        nullable=True,
+    )
+    error: Mapped[str | None] = mapped_column(
+        Text,
+        nullable=True,
+    )
+    created_at: Mapped[dt.datetime] = mapped_column(
+        nullable=False,
+    )
+    started_at: Mapped[dt.datetime | None] = mapped_column(
+        nullable=True,
+    )
+    finished_at: Mapped[dt.datetime | None] = mapped_column(
+        nullable=True,
+        index=True,
+    )
+    heartbeat_at: Mapped[dt.datetime | None] = mapped_column(
+        nullable=True,
+    )
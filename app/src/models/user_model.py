@@ -1,4 +1,4 @@
-from sqlalchemy import String
+from sqlalchemy import Index, String, func
 from sqlalchemy.orm import (
     Mapped,
     mapped_column,
@@ -6,6 +6,8 @@ from sqlalchemy.orm import (
 import datetime as dt
 from typing import TYPE_CHECKING
 
+from .expressions import EmailDomain
+
 if TYPE_CHECKING:
     from sqlalchemy.orm import declarative_base
 
@@ -46,3 +48,17 @@ class User(Base):
     registration_date: Mapped[dt.datetime] = mapped_column(
         default=dt.datetime.now(dt.UTC)
     )
+
+
+# usernames and emails are unique and looked up case-insensitively
+Index("ix_users_username_lower", func.lower(User.username), unique=True)
+Index("ix_users_email_lower", func.lower(User.email), unique=True)
+
+# filters and sorting of users list, id keeps order of equal dates stable
+Index("ix_users_registration_date_id", User.registration_date, User.id)
+Index(
+    "ix_users_email_domain_registration_date_id",
+    EmailDomain(User.email),
+    User.registration_date,
+    User.id,
+)
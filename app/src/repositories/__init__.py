@@ -1,4 +1,38 @@
-from .users_repository import UserRepository
+from .users_repository import (
+    UserRepository,
+    UsersStatsSummary,
+    UserRecord,
+)
+from .idempotency_repository import (
+    StoredResponse,
+    IdempotencyStore,
+    MemoryIdempotencyStore,
+    DatabaseIdempotencyStore,
+)
+from .changes_repository import UserChangeRepository
+from .write_pipeline import UserWritePipeline
+from .jobs_repository import UserJobRepository
+from .cache_backend import (
+    CacheBackend,
+    MemoryCacheBackend,
+    SQLiteCacheBackend,
+)
+from .existence_filter import UserExistenceFilter
 
 
-__all__ = ("UserRepository",)
+__all__ = (
+    "UserRepository",
+    "UsersStatsSummary",
+    "UserRecord",
+    "StoredResponse",
+    "IdempotencyStore",
+    "MemoryIdempotencyStore",
+    "DatabaseIdempotencyStore",
+    "UserChangeRepository",
+    "UserWritePipeline",
+    "UserJobRepository",
+    "CacheBackend",
+    "MemoryCacheBackend",
+    "SQLiteCacheBackend",
+    "UserExistenceFilter",
+)
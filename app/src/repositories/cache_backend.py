@@ -0,0 +1,281 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, TypeVar, cast
+
+from flask import Flask
+
+from app.src.core import register_metrics
+
+T = TypeVar("T")
+
+"""
+Caches of user lookups and stats results.
+
+Every entry is stored with generation of users data it was computed from.
+Writes of users bump the generation, so all entries computed before the
+write become misses at once, without tracking which keys a write affects.
+Generation is read before the value is computed: an entry computed from
+data older than a concurrent write is stored with the old generation and
+never served.
+"""
+
+
+class CacheBackend(ABC):
+    """
+    Cache of picklable values invalidated by generation counter.
+    """
+
+    def __init__(self, ttl: float, max_entries: int) -> None:
+        """
+        :param ttl: how long entry is kept, in seconds
+        :param max_entries: max number of kept entries
+        """
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self.hits_total = 0
+        self.misses_total = 0
+
+    @abstractmethod
+    def _lookup(self, key: str) -> tuple[int, bool, Any]:
+        """
+        Get current generation and entry of key made in this generation.
+        :param key: cache key
+        :return: generation, True if entry is found, value of entry
+        """
+
+    @abstractmethod
+    def _store(self, key: str, value: Any, generation: int) -> None:
+        """
+        Store entry computed in generation.
+        :param key: cache key
+        :param value: value
+        :param generation: generation read before value was computed
+        """
+
+    @abstractmethod
+    def generation(self) -> int:
+        """
+        Current generation of users data.
+        :return: generation
+        """
+
+    @abstractmethod
+    def bump_generation(self) -> int:
+        """
+        Invalidate all entries, called after users are changed.
+        :return: new generation
+        """
+
+    def init_app(self, app: Flask) -> None:
+        """
+        Register cache for application.
+        :param app: Flask application
+        """
+        app.extensions["cache"] = self
+        register_metrics(app, "cache", self.stats)
+
+    def get_or_set(self, key: str, compute: Callable[[], T]) -> T:
+        """
+        Get value of key from cache or compute and store it.
+        :param key: cache key
+        :param compute: function computing value on miss
+        :return: cached or computed value
+        """
+        generation, found, cached = self._lookup(key)
+        if found:
+            self.hits_total += 1
+            return cast(T, cached)
+        self.misses_total += 1
+        value = compute()
+        self._store(key, value, generation)
+        return value
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Cache counters.
+        :return: counters as dict
+        """
+        return {
+            "generation": self.generation(),
+            "hits_total": self.hits_total,
+            "misses_total": self.misses_total,
+        }
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    Cache kept in process memory, LRU evicted.
+    Generation is not shared, so it is only valid for one process.
+    """
+
+    def __init__(self, ttl: float, max_entries: int) -> None:
+        super().__init__(ttl, max_entries)
+        self._lock = threading.Lock()
+        self._generation = 0
+        # key -> (generation, expires_at, value)
+        self._entries: OrderedDict[str, tuple[int, float, Any]] = OrderedDict()
+
+    def _lookup(self, key: str) -> tuple[int, bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                generation, expires_at, value = entry
+                if (
+                    generation == self._generation
+                    and expires_at > time.monotonic()
+                ):
+                    self._entries.move_to_end(key)
+                    return self._generation, True, value
+                del self._entries[key]
+            return self._generation, False, None
+
+    def _store(self, key: str, value: Any, generation: int) -> None:
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = (
+                generation,
+                time.monotonic() + self._ttl,
+                value,
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def generation(self) -> int:
+        return self._generation
+
+    def bump_generation(self) -> int:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            return self._generation
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    Cache in local SQLite file shared by all worker processes of node.
+
+    Database runs in WAL mode with memory-mapped I/O, so lookups of workers
+    are served from shared page cache without blocking each other or
+    writers. Generation counter is a row of the same file, a bump made
+    by any worker is seen by the next lookup of every worker.
+    """
+
+    # expired and stale entries are deleted every N stores
+    EVICT_EVERY = 100
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float,
+        max_entries: int,
+        mmap_size: int = 64 * 1024 * 1024,
+    ) -> None:
+        """
+        :param path: path to cache file, created if not exists
+        :param ttl: how long entry is kept, in seconds
+        :param max_entries: max number of kept entries
+        :param mmap_size: size of memory-mapped part of file, in bytes
+        """
+        super().__init__(ttl, max_entries)
+        self._path = path
+        self._mmap_size = mmap_size
+        self._local = threading.local()
+        self._stores = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                "key TEXT PRIMARY KEY, generation INTEGER NOT NULL, "
+                "expires_at REAL NOT NULL, value BLOB NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_generation ("
+                "id INTEGER PRIMARY KEY CHECK (id = 1), "
+                "value INTEGER NOT NULL)"
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO cache_generation (id, value) "
+                "VALUES (1, 0)"
+            )
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._path, timeout=5.0, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA mmap_size={int(self._mmap_size)}")
+        return conn
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        # connection per thread, new one after fork
+        pid = os.getpid()
+        if getattr(self._local, "pid", None) != pid:
+            self._local.conn = self._connect()
+            self._local.pid = pid
+        return self._local.conn  # type: ignore[no-any-return]
+
+    def _lookup(self, key: str) -> tuple[int, bool, Any]:
+        generation, value = self._conn.execute(
+            "SELECT g.value, e.value FROM cache_generation AS g "
+            "LEFT OUTER JOIN cache_entries AS e ON e.key = ? "
+            "AND e.generation = g.value AND e.expires_at > ? "
+            "WHERE g.id = 1",
+            (key, time.time()),
+        ).fetchone()
+        if value is None:
+            return generation, False, None
+        return generation, True, pickle.loads(value)
+
+    def _store(self, key: str, value: Any, generation: int) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO cache_entries "
+            "(key, generation, expires_at, value) VALUES (?, ?, ?, ?)",
+            (
+                key,
+                generation,
+                time.time() + self._ttl,
+                pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+            ),
+        )
+        self._stores += 1
+        if self._stores % self.EVICT_EVERY == 0:
+            self._evict()
+
+    def _evict(self) -> None:
+        conn = self._conn
+        conn.execute(
+            "DELETE FROM cache_entries WHERE expires_at <= ? "
+            "OR generation < (SELECT value FROM cache_generation)",
+            (time.time(),),
+        )
+        conn.execute(
+            "DELETE FROM cache_entries WHERE key IN ("
+            "SELECT key FROM cache_entries ORDER BY expires_at DESC "
+            "LIMIT -1 OFFSET ?)",
+            (self._max_entries,),
+        )
+
+    def generation(self) -> int:
+        row = self._conn.execute(
+            "SELECT value FROM cache_generation WHERE id = 1"
+        ).fetchone()
+        return row[0]  # type: ignore[no-any-return]
+
+    def bump_generation(self) -> int:
+        row = self._conn.execute(
+            "UPDATE cache_generation SET value = value + 1 WHERE id = 1 "
+            "RETURNING value"
+        ).fetchone()
+        return row[0]  # type: ignore[no-any-return]
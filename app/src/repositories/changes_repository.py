@@ -0,0 +1,112 @@
+from sqlalchemy import select, func, delete, bindparam, Row
+from datetime import datetime as dt
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from flask_sqlalchemy import SQLAlchemy
+
+from app.src.models import User, UserChange
+
+_SELECT_CHANGES_SINCE = (
+    select(UserChange, User)
+    .outerjoin(User, User.id == UserChange.user_id)
+    .where(UserChange.seq > bindparam("since"))
+    .order_by(UserChange.seq)
+    .limit(bindparam("limit"))
+)
+
+_SELECT_FIRST_SEQ = select(func.min(UserChange.seq))
+_SELECT_LAST_SEQ = select(func.max(UserChange.seq))
+
+# Core rows of changes with current state of users, for replicas of users
+_SELECT_CHANGED_RECORDS_SINCE = (
+    select(
+        UserChange.seq,
+        UserChange.user_id,
+        User.username,
+        User.email,
+        User.registration_date,
+    )
+    .outerjoin(User, User.id == UserChange.user_id)
+    .where(UserChange.seq > bindparam("since"))
+    .order_by(UserChange.seq)
+    .limit(bindparam("limit"))
+)
+
+
+class UserChangeRepository:
+    """
+    Repository class for UserChange model.
+    """
+
+    def __init__(self, db: "SQLAlchemy") -> None:
+        self._db = db
+
+    def get_changes(
+        self,
+        since: int,
+        limit: int,
+    ) -> list[tuple[UserChange, User | None]]:
+        """
+        Get changes after provided sequence number in order,
+        with current state of changed users.
+        Seq is assigned at insert, not at commit: on a database with
+        concurrent writers, such as PostgreSQL, a transaction may commit
+        a lower seq after a higher one is already visible. Feed is gapless
+        only with one writer at a time, as on SQLite.
+        :param since: sequence number of last seen change
+        :param limit: max number of changes
+        :return: list of changes with users, user is None if deleted
+        """
+        rows = self._db.session.execute(
+            _SELECT_CHANGES_SINCE, {"since": since, "limit": limit}
+        ).all()
+        return [(change, user) for change, user in rows]
+
+    def get_first_seq(self) -> int | None:
+        """
+        Get sequence number of the oldest change kept in log.
+        :return: sequence number or None if log is empty
+        """
+        return self._db.session.scalar(_SELECT_FIRST_SEQ)
+
+    def get_last_seq(self) -> int:
+        """
+        Get sequence number of the newest change.
+        :return: sequence number or 0 if log is empty
+        """
+        return self._db.session.scalar(_SELECT_LAST_SEQ) or 0
+
+    def get_changed_records(
+        self,
+        since: int,
+        limit: int,
+    ) -> list[Row[Any]]:
+        """
+        Get changes after provided sequence number in order, with current
+        state of changed users as Core rows, bypassing ORM identity map.
+        :param since: sequence number of last seen change
+        :param limit: max number of changes
+        :return: rows of seq, user_id, username, email, registration_date;
+        user columns are None if user is deleted
+        """
+        return list(
+            self._db.session.connection()
+            .execute(
+                _SELECT_CHANGED_RECORDS_SINCE,
+                {"since": since, "limit": limit},
+            )
+            .all()
+        )
+
+    def compact(self, before: dt) -> int:
+        """
+        Delete changes made before provided time.
+        :param before: time of the oldest change to keep
+        :return: number of deleted changes
+        """
+        result = self._db.session.execute(
+            delete(UserChange).where(UserChange.changed_at < before)
+        )
+        self._db.session.commit()
+        return result.rowcount
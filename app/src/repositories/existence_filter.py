@@ -0,0 +1,218 @@
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Any
+
+from flask import Flask
+
+from app.src.core import register_metrics
+from app.src.repositories.users_repository import UserRepository
+from app.src.repositories.changes_repository import UserChangeRepository
+from app.src.utils import BloomFilter
+
+if TYPE_CHECKING:
+    from flask_sqlalchemy import SQLAlchemy
+
+logger = logging.getLogger(__name__)
+
+
+class UserExistenceFilter:
+    """
+    In-memory Bloom filter of taken usernames and emails.
+
+    Values are lowered, as uniqueness of users is case-insensitive.
+    Value not in filter is not taken by any user the filter knows of,
+    so conflict check of a write and availability check skip their
+    queries. Filter only tells a value may be taken, a hit is confirmed
+    by indexed query.
+
+    Filter is built on first use in each process by a streaming scan of
+    users, values written by this process are added at once, writes of
+    other workers are applied from the user changes log at most sync
+    interval later. Values of deleted and renamed users can not be
+    removed, they only add false positives until filter is rebuilt: when
+    number of values exceeds its capacity or after rebuild interval.
+    A value written by another worker and not applied yet is caught by
+    unique indexes of users table.
+    """
+
+    # filter is rebuilt from users table at least this often, in seconds
+    REBUILD_INTERVAL = 3600.0
+    # number of users or changes fetched per query on build and sync
+    BATCH_SIZE = 1000
+    # capacity of filter is this many times number of values on build
+    HEADROOM = 2
+    MIN_CAPACITY = 1024
+
+    def __init__(
+        self,
+        db: "SQLAlchemy",
+        error_rate: float,
+        sync_interval: float,
+    ) -> None:
+        """
+        :param db: SQLAlchemy instance
+        :param error_rate: false positive rate of filter at capacity
+        :param sync_interval: how often changes of other workers
+        are applied, in seconds
+        """
+        self._db = db
+        self._error_rate = error_rate
+        self._sync_interval = sync_interval
+        self._filter: BloomFilter | None = None
+        self._update_lock = threading.Lock()
+        self._synced_at = 0.0
+        self._built_at = 0.0
+        self._last_seq = 0
+
+        self.builds_total = 0
+        self.syncs_total = 0
+        self.negatives_total = 0
+        self.positives_total = 0
+        self.false_positives_total = 0
+
+    def init_app(self, app: Flask) -> None:
+        """
+        Register filter for application.
+        :param app: Flask application
+        """
+        app.extensions["existence_filter"] = self
+        register_metrics(app, "existence_filter", self.stats)
+
+    @staticmethod
+    def _key(field_name: str, value: str) -> str:
+        return f"{field_name}:{value.lower()}"
+
+    def might_exist(self, field_name: str, value: str) -> bool:
+        """
+        Check if value may be taken by a user.
+        :param field_name: "username" or "email"
+        :param value: value of field
+        :return: False if value is not taken, True if it may be taken
+        or filter is not available
+        """
+        bloom = self._ensure_current()
+        if bloom is None:
+            return True
+        if self._key(field_name, value) in bloom:
+            self.positives_total += 1
+            return True
+        self.negatives_total += 1
+        return False
+
+    def add(self, username: str | None, email: str | None) -> None:
+        """
+        Add values of written user.
+        :param username: username or None if not changed
+        :param email: email or None if not changed
+        """
+        bloom = self._filter
+        if bloom is None:
+            return
+        if username is not None:
+            bloom.add(self._key("username", username))
+        if email is not None:
+            bloom.add(self._key("email", email))
+
+    def report_false_positive(self) -> None:
+        """
+        Count hit not confirmed by query.
+        """
+        self.false_positives_total += 1
+
+    def _ensure_current(self) -> BloomFilter | None:
+        """
+        Build filter or apply changes of other workers if needed.
+        While another thread updates built filter, it is used as is.
+        :return: filter or None if it is not available
+        """
+        now = time.monotonic()
+        bloom = self._filter
+        if bloom is not None and now - self._synced_at < self._sync_interval:
+            return bloom
+        if not self._update_lock.acquire(blocking=bloom is None):
+            return bloom
+        try:
+            if self._filter is not None and (
+                time.monotonic() - self._synced_at < self._sync_interval
+            ):
+                return self._filter
+            self._synced_at = now
+            if (
+                self._filter is None
+                or now - self._built_at >= self.REBUILD_INTERVAL
+                or self._filter.count > self._filter.capacity
+            ):
+                self._build()
+            else:
+                self._sync(self._filter)
+        except Exception:
+            logger.exception("Update of users existence filter failed")
+        finally:
+            self._update_lock.release()
+        return self._filter
+
+    def _build(self) -> None:
+        self.builds_total += 1
+        self._built_at = time.monotonic()
+        changes = UserChangeRepository(self._db)
+        last_seq = changes.get_last_seq()
+        repo = UserRepository(self._db)
+        bloom = BloomFilter(
+            capacity=max(
+                2 * repo.get_all_count() * self.HEADROOM, self.MIN_CAPACITY
+            ),
+            error_rate=self._error_rate,
+        )
+        for record in repo.iter_records(self.BATCH_SIZE):
+            bloom.add(self._key("username", record.username))
+            bloom.add(self._key("email", record.email))
+        self._last_seq = last_seq
+        # changes committed during scan are added again
+        self._apply_changes(bloom, changes)
+        self._filter = bloom
+
+    def _sync(self, bloom: BloomFilter) -> None:
+        self.syncs_total += 1
+        changes = UserChangeRepository(self._db)
+        first_seq = changes.get_first_seq()
+        # filter built from empty log reads all changes made after it
+        if self._last_seq and (first_seq or 0) > self._last_seq + 1:
+            # changes were compacted before they were applied
+            self._build()
+            return
+        self._apply_changes(bloom, changes)
+
+    def _apply_changes(
+        self,
+        bloom: BloomFilter,
+        changes: UserChangeRepository,
+    ) -> None:
+        while True:
+            rows = changes.get_changed_records(self._last_seq, self.BATCH_SIZE)
+            for row in rows:
+                # deleted user, its values stay in filter
+                if row.username is not None:
+                    bloom.add(self._key("username", row.username))
+                    bloom.add(self._key("email", row.email))
+            if rows:
+                self._last_seq = rows[-1].seq
+            if len(rows) < self.BATCH_SIZE:
+                return
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Filter counters.
+        :return: counters as dict
+        """
+        bloom = self._filter
+        return {
+            "values": bloom.count if bloom is not None else 0,
+            "capacity": bloom.capacity if bloom is not None else 0,
+            "bytes": bloom.nbytes if bloom is not None else 0,
+            "builds_total": self.builds_total,
+            "syncs_total": self.syncs_total,
+            "negatives_total": self.negatives_total,
+            "positives_total": self.positives_total,
+            "false_positives_total": self.false_positives_total,
+        }
@@ -0,0 +1,251 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import (
+    datetime as dt,
+    timedelta as td,
+)
+from typing import TYPE_CHECKING, NamedTuple
+
+from sqlalchemy import select, insert, update, delete
+from sqlalchemy.exc import IntegrityError
+
+if TYPE_CHECKING:
+    from flask_sqlalchemy import SQLAlchemy
+
+from app.src.exceptions import (
+    IdempotencyKeyReusedException,
+    IdempotencyKeyInProgressException,
+)
+from app.src.models import IdempotencyKey
+
+
+class StoredResponse(NamedTuple):
+    """
+    Final response of request stored for replay.
+    """
+
+    status_code: int
+    content_type: str | None
+    body: bytes
+
+
+class IdempotencyStore(ABC):
+    """
+    Store of idempotency keys and responses of requests made with them.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        lock_ttl: float,
+        wait_timeout: float,
+    ) -> None:
+        """
+        :param ttl: how long completed response is kept, in seconds
+        :param lock_ttl: how long key of unfinished request is kept,
+        in seconds, so crashed request does not lock key for ttl
+        :param wait_timeout: max time to wait for request in progress
+        """
+        self._ttl = ttl
+        self._lock_ttl = lock_ttl
+        self._wait_timeout = wait_timeout
+
+    @abstractmethod
+    def begin(self, key: str, fingerprint: str) -> StoredResponse | None:
+        """
+        Start request with idempotency key. If another request with the key
+        is in progress, wait for it.
+        :param key: idempotency key
+        :param fingerprint: request fingerprint
+        :return: stored response to replay, or None if caller owns the key
+        and must execute request
+        """
+
+    @abstractmethod
+    def complete(self, key: str, response: StoredResponse) -> None:
+        """
+        Store final response of request.
+        :param key: idempotency key
+        :param response: response to store
+        """
+
+    @abstractmethod
+    def release(self, key: str) -> None:
+        """
+        Release key of request which failed, so it can be retried.
+        :param key: idempotency key
+        """
+
+
+class _MemoryEntry:
+    """
+    Idempotency key entry of in-memory store.
+    """
+
+    def __init__(self, fingerprint: str, expires_at: float) -> None:
+        self.fingerprint = fingerprint
+        self.expires_at = expires_at
+        self.response: StoredResponse | None = None
+        self.done = threading.Event()
+
+
+class MemoryIdempotencyStore(IdempotencyStore):
+    """
+    In-process idempotency store. Keys are not shared between processes.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        lock_ttl: float,
+        wait_timeout: float,
+    ) -> None:
+        super().__init__(ttl, lock_ttl, wait_timeout)
+        self._entries: dict[str, _MemoryEntry] = {}
+        self._lock = threading.Lock()
+        self._evicted_at = time.monotonic()
+
+    def _evict_expired(self, now: float) -> None:
+        if now - self._evicted_at < min(self._lock_ttl, self._ttl):
+            return
+        self._evicted_at = now
+        for key in [k for k, e in self._entries.items() if e.expires_at < now]:
+            del self._entries[key]
+
+    def begin(self, key: str, fingerprint: str) -> StoredResponse | None:
+        deadline = time.monotonic() + self._wait_timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._evict_expired(now)
+                entry = self._entries.get(key)
+                if entry is None or entry.expires_at < now:
+                    self._entries[key] = _MemoryEntry(
+                        fingerprint, now + self._lock_ttl
+                    )
+                    return None
+
+            if entry.fingerprint != fingerprint:
+                raise IdempotencyKeyReusedException(key=key)
+
+            timeout = deadline - time.monotonic()
+            if not entry.done.wait(max(timeout, 0)):
+                raise IdempotencyKeyInProgressException(key=key)
+            if entry.response is not None:
+                return entry.response
+            # request was released, try to own the key
+
+    def complete(self, key: str, response: StoredResponse) -> None:
+        with self._lock:
+            entry = self._entries.setdefault(key, _MemoryEntry("", 0))
+            entry.response = response
+            entry.expires_at = time.monotonic() + self._ttl
+        entry.done.set()
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is not None:
+            entry.done.set()
+
+
+class DatabaseIdempotencyStore(IdempotencyStore):
+    """
+    Idempotency store in database table, shared by all workers.
+    Row of key inserted by request acts as a lock, concurrent duplicates
+    poll it until response is stored.
+    """
+
+    def __init__(
+        self,
+        db: "SQLAlchemy",
+        ttl: float,
+        lock_ttl: float,
+        wait_timeout: float,
+        poll_interval: float = 0.05,
+    ) -> None:
+        super().__init__(ttl, lock_ttl, wait_timeout)
+        self._db = db
+        self._poll_interval = poll_interval
+        self._evicted_at = time.monotonic()
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        if now - self._evicted_at < min(self._lock_ttl, self._ttl):
+            return
+        self._evicted_at = now
+        with self._db.engine.begin() as conn:
+            conn.execute(
+                delete(IdempotencyKey).where(
+                    IdempotencyKey.expires_at < dt.now()
+                )
+            )
+
+    def _try_insert(self, key: str, fingerprint: str) -> bool:
+        try:
+            with self._db.engine.begin() as conn:
+                conn.execute(
+                    insert(IdempotencyKey).values(
+                        key=key,
+                        fingerprint=fingerprint,
+                        expires_at=dt.now() + td(seconds=self._lock_ttl),
+                    )
+                )
+        except IntegrityError:
+            return False
+        return True
+
+    def begin(self, key: str, fingerprint: str) -> StoredResponse | None:
+        self._evict_expired()
+        deadline = time.monotonic() + self._wait_timeout
+        while True:
+            if self._try_insert(key, fingerprint):
+                return None
+
+            with self._db.engine.connect() as conn:
+                row = conn.execute(
+                    select(IdempotencyKey).where(IdempotencyKey.key == key)
+                ).one_or_none()
+
+            if row is None:
+                continue
+            if row.expires_at < dt.now():
+                with self._db.engine.begin() as conn:
+                    conn.execute(
+                        delete(IdempotencyKey).where(
+                            IdempotencyKey.key == key,
+                            IdempotencyKey.expires_at < dt.now(),
+                        )
+                    )
+                continue
+            if row.fingerprint != fingerprint:
+                raise IdempotencyKeyReusedException(key=key)
+            if row.status_code is not None:
+                return StoredResponse(
+                    status_code=row.status_code,
+                    content_type=row.content_type,
+                    body=row.response_body or b"",
+                )
+            if time.monotonic() >= deadline:
+                raise IdempotencyKeyInProgressException(key=key)
+            time.sleep(self._poll_interval)
+
+    def complete(self, key: str, response: StoredResponse) -> None:
+        with self._db.engine.begin() as conn:
+            conn.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.key == key)
+                .values(
+                    status_code=response.status_code,
+                    content_type=response.content_type,
+                    response_body=response.body,
+                    expires_at=dt.now() + td(seconds=self._ttl),
+                )
+            )
+
+    def release(self, key: str) -> None:
+        with self._db.engine.begin() as conn:
+            conn.execute(
+                delete(IdempotencyKey).where(IdempotencyKey.key == key)
+            )
@@ -0,0 +1,263 @@
+import json
+import uuid
+from datetime import (
+    datetime as dt,
+    timedelta as td,
+)
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import select, insert, update, delete, func, bindparam, Row
+
+if TYPE_CHECKING:
+    from flask_sqlalchemy import SQLAlchemy
+
+from app.src.exceptions import JobNotFoundException, TooManyJobsException
+from app.src.models import UserJob
+
+_JOBS_TABLE = UserJob.__table__
+ACTIVE_STATUSES = ("queued", "running")
+
+_SELECT_JOB = select(_JOBS_TABLE).where(_JOBS_TABLE.c.id == bindparam("id"))
+_COUNT_ACTIVE_JOBS = select(func.count(_JOBS_TABLE.c.id)).where(
+    _JOBS_TABLE.c.status.in_(ACTIVE_STATUSES)
+)
+_SELECT_NEXT_QUEUED_JOB = (
+    select(_JOBS_TABLE.c.id)
+    .where(_JOBS_TABLE.c.status == "queued")
+    .order_by(_JOBS_TABLE.c.created_at, _JOBS_TABLE.c.id)
+    .limit(1)
+)
+# compare-and-set, only one worker claims a queued job
+_CLAIM_JOB = (
+    update(_JOBS_TABLE)
+    .where(
+        _JOBS_TABLE.c.id == bindparam("job_id"),
+        _JOBS_TABLE.c.status == "queued",
+    )
+    .values(
+        status="running",
+        attempts=_JOBS_TABLE.c.attempts + 1,
+        rows_done=0,
+        started_at=bindparam("now"),
+        heartbeat_at=bindparam("now"),
+    )
+)
+_UPDATE_RUNNING_JOB = update(_JOBS_TABLE).where(
+    _JOBS_TABLE.c.id == bindparam("job_id"),
+    _JOBS_TABLE.c.status == "running",
+    _JOBS_TABLE.c.attempts == bindparam("attempt"),
+)
+_STALE_RUNNING_JOBS = (
+    _JOBS_TABLE.c.status == "running",
+    _JOBS_TABLE.c.heartbeat_at < bindparam("stale_before"),
+)
+
+
+class UserJobRepository:
+    """
+    Repository class for UserJob model.
+
+    Every method runs in own short transaction, independent of request
+    session, so progress of long job is visible to pollers at once.
+    Updates of running job are matched by its attempt, a job requeued
+    after lost heartbeat is not updated by its previous run.
+    """
+
+    def __init__(self, db: "SQLAlchemy") -> None:
+        """
+        :param db: SQLAlchemy instance
+        """
+        self._db = db
+
+    def create(
+        self,
+        kind: str,
+        format: str,
+        params: dict[str, Any],
+        max_active: int,
+    ) -> Row[Any]:
+        """
+        Create queued job.
+        :param kind: "export" or "report"
+        :param format: format of result file
+        :param params: JSON-serializable job parameters
+        :param max_active: max number of queued and running jobs
+        :return: created job
+        :raises TooManyJobsException: if limit of active jobs is reached
+        """
+        job_id = uuid.uuid4().hex
+        with self._db.engine.begin() as conn:
+            if (conn.scalar(_COUNT_ACTIVE_JOBS) or 0) >= max_active:
+                raise TooManyJobsException(limit=max_active)
+            conn.execute(
+                insert(_JOBS_TABLE).values(
+                    id=job_id,
+                    kind=kind,
+                    format=format,
+                    params=json.dumps(params),
+                    status="queued",
+                    attempts=0,
+                    rows_done=0,
+                    created_at=dt.now(),
+                )
+            )
+            return conn.execute(_SELECT_JOB, {"id": job_id}).one()
+
+    def get(self, job_id: str) -> Row[Any]:
+        """
+        Get job by id.
+        :param job_id: job id
+        :return: job
+        :raises JobNotFoundException: if job not found
+        """
+        with self._db.engine.connect() as conn:
+            row = conn.execute(_SELECT_JOB, {"id": job_id}).one_or_none()
+        if row is None:
+            raise JobNotFoundException(job_id=job_id)
+        return row
+
+    def count_active(self) -> int:
+        """
+        Get count of queued and running jobs of all workers.
+        :return: count of jobs
+        """
+        with self._db.engine.connect() as conn:
+            return conn.scalar(_COUNT_ACTIVE_JOBS) or 0
+
+    def requeue_stale(self, lease_timeout: float, max_attempts: int) -> int:
+        """
+        Requeue running jobs without heartbeat for lease timeout,
+        their worker is gone. Jobs started max attempts times fail.
+        :param lease_timeout: seconds without heartbeat
+        :param max_attempts: max number of starts of job
+        :return: number of requeued and failed jobs
+        """
+        params = {"stale_before": dt.now() - td(seconds=lease_timeout)}
+        with self._db.engine.begin() as conn:
+            failed = conn.execute(
+                update(_JOBS_TABLE)
+                .where(
+                    *_STALE_RUNNING_JOBS,
+                    _JOBS_TABLE.c.attempts >= max_attempts,
+                )
+                .values(
+                    status="failed",
+                    error="Job was interrupted too many times",
+                    finished_at=dt.now(),
+                ),
+                params,
+            ).rowcount
+            requeued = conn.execute(
+                update(_JOBS_TABLE)
+                .where(*_STALE_RUNNING_JOBS)
+                .values(status="queued", heartbeat_at=None),
+                params,
+            ).rowcount
+        return failed + requeued
+
+    def claim_next(self) -> Row[Any] | None:
+        """
+        Mark the oldest queued job as running by this worker.
+        :return: claimed job or None if no job is queued
+        """
+        while True:
+            with self._db.engine.begin() as conn:
+                job_id = conn.scalar(_SELECT_NEXT_QUEUED_JOB)
+                if job_id is None:
+                    return None
+                claimed = conn.execute(
+                    _CLAIM_JOB, {"job_id": job_id, "now": dt.now()}
+                ).rowcount
+                if claimed:
+                    return conn.execute(_SELECT_JOB, {"id": job_id}).one()
+            # claimed by another worker in the meantime
+
+    def heartbeat(
+        self,
+        job_id: str,
+        attempt: int,
+        rows_done: int,
+        rows_total: int | None = None,
+    ) -> bool:
+        """
+        Save progress of running job.
+        :param job_id: job id
+        :param attempt: attempt of job run
+        :param rows_done: number of processed rows
+        :param rows_total: number of rows to process, not changed if None
+        :return: False if job is no longer run by this attempt
+        """
+        values: dict[str, Any] = {
+            "rows_done": rows_done,
+            "heartbeat_at": dt.now(),
+        }
+        if rows_total is not None:
+            values["rows_total"] = rows_total
+        with self._db.engine.begin() as conn:
+            return bool(
+                conn.execute(
+                    _UPDATE_RUNNING_JOB.values(**values),
+                    {"job_id": job_id, "attempt": attempt},
+                ).rowcount
+            )
+
+    def finish(
+        self,
+        job_id: str,
+        attempt: int,
+        rows_done: int,
+        result_file: str,
+    ) -> bool:
+        """
+        Mark running job as succeeded.
+        :param job_id: job id
+        :param attempt: attempt of job run
+        :param rows_done: number of processed rows
+        :param result_file: name of result file in jobs directory
+        :return: False if job is no longer run by this attempt
+        """
+        with self._db.engine.begin() as conn:
+            return bool(
+                conn.execute(
+                    _UPDATE_RUNNING_JOB.values(
+                        status="succeeded",
+                        rows_done=rows_done,
+                        result_file=result_file,
+                        finished_at=dt.now(),
+                    ),
+                    {"job_id": job_id, "attempt": attempt},
+                ).rowcount
+            )
+
+    def fail(self, job_id: str, attempt: int, error: str) -> None:
+        """
+        Mark running job as failed.
+        :param job_id: job id
+        :param attempt: attempt of job run
+        :param error: error message
+        """
+        with self._db.engine.begin() as conn:
+            conn.execute(
+                _UPDATE_RUNNING_JOB.values(
+                    status="failed",
+                    error=error,
+                    finished_at=dt.now(),
+                ),
+                {"job_id": job_id, "attempt": attempt},
+            )
+
+    def delete_finished_before(self, before: dt) -> list[str]:
+        """
+        Delete jobs finished before time.
+        :param before: time of finish
+        :return: names of result files of deleted jobs
+        """
+        condition = _JOBS_TABLE.c.finished_at < before
+        with self._db.engine.begin() as conn:
+            files = conn.scalars(
+                select(_JOBS_TABLE.c.result_file).where(
+                    condition, _JOBS_TABLE.c.result_file.is_not(None)
+                )
+            ).all()
+            conn.execute(delete(_JOBS_TABLE).where(condition))
+        return list(files)
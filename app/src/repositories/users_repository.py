@@ -1,20 +1,326 @@
-from sqlalchemy import select, func
+from sqlalchemy import (
+    select,
+    insert,
+    update,
+    delete,
+    func,
+    bindparam,
+    case,
+    and_,
+    or_,
+    true,
+    Row,
+    Select,
+    Executable,
+)
+from sqlalchemy.exc import IntegrityError
+import uuid
+from contextlib import contextmanager, nullcontext
 from datetime import (
     datetime as dt,
     timedelta as td,
 )
-from typing import TYPE_CHECKING
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Iterator, NamedTuple
 
 if TYPE_CHECKING:
     from flask_sqlalchemy import SQLAlchemy
 
+    from app.src.repositories.cache_backend import CacheBackend
+    from app.src.repositories.existence_filter import UserExistenceFilter
+    from app.src.services.user_analytics import UserAnalytics
+
 from app.src.exceptions import (
     UserNotFoundException,
     UserAlreadyExistsException,
 )
-from app.src.models import User
+from app.src.models import User, UserChange, EmailDomain
 from app.src.schemas.entities import UserUpdate, UserCreate
-from app.src.schemas.query import UserPaginatorQueryParams
+from app.src.schemas.query import UserPaginatorQueryParams, UserFilterParams
+from app.src.utils import epoch_seconds
+
+"""
+Statement templates for the hot repository methods.
+They are built once at import time with bound parameters, so SQLAlchemy
+memoizes their cache keys and every call hits the compiled cache.
+"""
+
+# Core statements over table columns, rows are not tracked by session
+_USERS_TABLE = User.__table__
+_SELECT_USER_RECORDS = select(
+    _USERS_TABLE.c.id,
+    _USERS_TABLE.c.username,
+    _USERS_TABLE.c.email,
+    _USERS_TABLE.c.registration_date,
+)
+_SELECT_USER_RECORD_BY_ID = _SELECT_USER_RECORDS.where(
+    _USERS_TABLE.c.id == bindparam("id")
+)
+_SELECT_USER_RECORDS_BY_IDS = _SELECT_USER_RECORDS.where(
+    _USERS_TABLE.c.id.in_(bindparam("ids", expanding=True))
+)
+_SELECT_USER_RECORD_BY_FIELD = {
+    "username": _SELECT_USER_RECORDS.where(
+        func.lower(_USERS_TABLE.c.username) == func.lower(bindparam("value"))
+    ),
+    "email": _SELECT_USER_RECORDS.where(
+        func.lower(_USERS_TABLE.c.email) == func.lower(bindparam("value"))
+    ),
+}
+# conflicts of new username and email with other users, username first
+_SELECT_USER_CONFLICTS = (
+    select(
+        (
+            func.lower(_USERS_TABLE.c.username)
+            == func.lower(bindparam("username"))
+        ).label("username"),
+        (
+            func.lower(_USERS_TABLE.c.email) == func.lower(bindparam("email"))
+        ).label("email"),
+    )
+    .where(
+        or_(
+            func.lower(_USERS_TABLE.c.username)
+            == func.lower(bindparam("username")),
+            func.lower(_USERS_TABLE.c.email) == func.lower(bindparam("email")),
+        ),
+        _USERS_TABLE.c.id != bindparam("exclude_id"),
+    )
+    .limit(2)
+)
+
+# writes return the written row where backend supports RETURNING
+_INSERT_USER = insert(_USERS_TABLE)
+_INSERT_USER_RETURNING = _INSERT_USER.returning(
+    *_SELECT_USER_RECORDS.selected_columns
+)
+_UPDATE_USER = update(_USERS_TABLE).where(
+    _USERS_TABLE.c.id == bindparam("user_id")
+)
+_UPDATE_USER_RETURNING = _UPDATE_USER.returning(
+    *_SELECT_USER_RECORDS.selected_columns
+)
+_DELETE_USER = delete(_USERS_TABLE).where(
+    _USERS_TABLE.c.id == bindparam("user_id")
+)
+_DELETE_USER_RETURNING = _DELETE_USER.returning(_USERS_TABLE.c.id)
+_INSERT_CHANGE = insert(UserChange)
+
+# username and email are compared case-insensitively, both sides are
+# lowered in SQL so comparison matches functional indexes of users table
+_SELECT_USER_BY_FIELD = {
+    "id": select(User).where(User.id == bindparam("value")),
+    "username": select(User).where(
+        func.lower(User.username) == func.lower(bindparam("value"))
+    ),
+    "email": select(User).where(
+        func.lower(User.email) == func.lower(bindparam("value"))
+    ),
+}
+
+_EMAIL_DOMAIN = EmailDomain(User.email)
+
+# list pages: sort keys and filters, each matching an index of users table
+_USERS_PAGE_BASES = {"orm": select(User), "records": _SELECT_USER_RECORDS}
+_USERS_PAGE_SORT_KEYS = {
+    "id": (_USERS_TABLE.c.id,),
+    "registration_date": (
+        _USERS_TABLE.c.registration_date,
+        _USERS_TABLE.c.id,
+    ),
+    "username": (func.lower(_USERS_TABLE.c.username),),
+}
+_USERS_PAGE_FILTERS = {
+    "registered_from": (
+        _USERS_TABLE.c.registration_date >= bindparam("registered_from")
+    ),
+    "registered_to": (
+        _USERS_TABLE.c.registration_date < bindparam("registered_to")
+    ),
+    "email_domain": _EMAIL_DOMAIN == bindparam("email_domain"),
+    # prefix as range of lowered usernames, LIKE can not use the index
+    "username_prefix": and_(
+        func.lower(_USERS_TABLE.c.username) >= bindparam("username_prefix"),
+        func.lower(_USERS_TABLE.c.username) < bindparam("username_prefix_end"),
+    ),
+}
+# greater than any character, upper bound of prefix range
+_MAX_CHAR = "\U0010ffff"
+
+
+@lru_cache(maxsize=None)
+def _select_users_page(
+    base: str,
+    sort: str,
+    filters: frozenset[str],
+    limited: bool,
+) -> Select[Any]:
+    """
+    Build statement of users page once per combination of sort
+    and filters, so every call hits the compiled cache.
+    :param base: "orm" for User entities, "records" for Core rows
+    :param sort: sort field, prefixed with "-" if descending
+    :param filters: names of applied filters
+    :param limited: apply limit
+    :return: statement with bound params of filters, offset and limit
+    """
+    descending = sort.startswith("-")
+    keys = _USERS_PAGE_SORT_KEYS[sort.removeprefix("-")]
+    stmt = (
+        _USERS_PAGE_BASES[base]
+        .where(*(_USERS_PAGE_FILTERS[name] for name in sorted(filters)))
+        .order_by(*(key.desc() if descending else key for key in keys))
+        .offset(bindparam("offset"))
+    )
+    if limited:
+        stmt = stmt.limit(bindparam("limit"))
+    return stmt
+
+
+@lru_cache(maxsize=None)
+def _select_user_records_after_id(filters: frozenset[str]) -> Select[Any]:
+    """
+    Build statement of keyset batch of user records once per combination
+    of filters.
+    :param filters: names of applied filters
+    :return: statement with bound params of filters, after_id and limit
+    """
+    return (
+        _SELECT_USER_RECORDS.where(
+            *(_USERS_PAGE_FILTERS[name] for name in sorted(filters)),
+            _USERS_TABLE.c.id > bindparam("after_id"),
+        )
+        .order_by(_USERS_TABLE.c.id)
+        .limit(bindparam("limit"))
+    )
+
+
+@lru_cache(maxsize=None)
+def _count_users_filtered(filters: frozenset[str]) -> Select[Any]:
+    """
+    Build statement counting users once per combination of filters.
+    :param filters: names of applied filters
+    :return: statement with bound params of filters
+    """
+    return select(func.count(_USERS_TABLE.c.id)).where(
+        *(_USERS_PAGE_FILTERS[name] for name in sorted(filters))
+    )
+
+
+def _users_filter_params(
+    filter_params: UserFilterParams | None,
+) -> tuple[frozenset[str], dict[str, Any]]:
+    """
+    Get applied filters and their bound params.
+    :param filter_params: filters schema, no filters if None
+    :return: names of applied filters and bound params
+    """
+    params: dict[str, Any] = {}
+    if filter_params is None:
+        return frozenset(), params
+    for name in _USERS_PAGE_FILTERS:
+        value = getattr(filter_params, name)
+        if value is not None:
+            params[name] = value
+    if filter_params.username_prefix is not None:
+        params["username_prefix_end"] = (
+            filter_params.username_prefix + _MAX_CHAR
+        )
+    return frozenset(params).intersection(_USERS_PAGE_FILTERS), params
+
+
+def _users_page_params(
+    paginator_params: UserPaginatorQueryParams,
+) -> tuple[frozenset[str], dict[str, Any]]:
+    """
+    Get applied filters and bound params of users page.
+    :param paginator_params: pagination params schema
+    :return: names of applied filters and bound params
+    """
+    filters, params = _users_filter_params(paginator_params)
+    params["offset"] = paginator_params.offset
+    params["limit"] = paginator_params.limit
+    return filters, params
+
+
+_SELECT_USERS_REGISTERED_SINCE = select(User).where(
+    User.registration_date > bindparam("since")
+)
+
+_SELECT_USERS_BY_LONGEST_USERNAME = (
+    select(User)
+    .order_by(func.char_length(User.username).desc())
+    .limit(bindparam("limit"))
+)
+
+_COUNT_USERS_MATCHING_EMAIL = select(func.count(User.id)).where(
+    User.email.ilike(bindparam("pattern"))
+)
+
+_COUNT_USERS = select(func.count(User.id))
+
+_SELECT_TOP_EMAIL_DOMAINS = (
+    select(
+        _EMAIL_DOMAIN.label("domain"),
+        func.count(User.id).label("count"),
+        func.sum(func.count(User.id)).over().label("total"),
+    )
+    .group_by(_EMAIL_DOMAIN)
+    .order_by(func.count(User.id).desc(), _EMAIL_DOMAIN)
+    .limit(bindparam("limit"))
+)
+
+# hot statements of requests for warm-up, executed with values matching
+# no user, except insert of a sample user rolled back by caller
+_WARM_UP_READS: tuple[tuple[Executable, dict[str, Any]], ...] = (
+    (_SELECT_USER_RECORD_BY_ID, {"id": 0}),
+    (_SELECT_USER_RECORD_BY_FIELD["username"], {"value": ""}),
+    (_SELECT_USER_RECORD_BY_FIELD["email"], {"value": ""}),
+    (_SELECT_USER_BY_FIELD["id"], {"value": 0}),
+    (_SELECT_USER_CONFLICTS, {"username": "", "email": "", "exclude_id": 0}),
+)
+# sets of updated columns, update statement is compiled for each of them
+_WARM_UP_UPDATED_FIELDS = (("username",), ("email",), ("username", "email"))
+
+
+class UserRecord(NamedTuple):
+    """
+    Read-only user record selected without ORM.
+    """
+
+    id: int
+    username: str
+    email: str
+    registration_date: dt
+
+    def to_dict(self, epoch_dates: bool = False) -> dict[str, Any]:
+        """
+        Return a dict with user's data with stringified timestamp,
+        same as UserFromDB.to_dict().
+        :param epoch_dates: timestamp as unix time, for binary formats
+        :return: record fields and values as dictionary
+        """
+        return dict(
+            id=self.id,
+            username=self.username,
+            email=self.email,
+            registration_date=(
+                epoch_seconds(self.registration_date)
+                if epoch_dates
+                else self.registration_date.isoformat()
+            ),
+        )
+
+
+class UsersStatsSummary(NamedTuple):
+    """
+    Result of multi-aggregate stats summary query.
+    """
+
+    total: int
+    registered_since: int | None
+    domains_counts: list[tuple[str, int]]
+    longest_username_users: list[Row[Any]]
 
 
 class UserRepository:
@@ -22,33 +328,231 @@ class UserRepository:
     Repository class for User model.
     """
 
-    def __init__(self, db: "SQLAlchemy") -> None:
+    def __init__(
+        self,
+        db: "SQLAlchemy",
+        autocommit: bool = True,
+        cache: "CacheBackend | None" = None,
+        analytics: "UserAnalytics | None" = None,
+        existence_filter: "UserExistenceFilter | None" = None,
+    ) -> None:
+        """
+        :param db: SQLAlchemy instance
+        :param autocommit: commit after each write, otherwise changes
+        are only flushed and caller commits them
+        :param cache: cache of user lookups, invalidated after commit
+        of each write; caller invalidates it if autocommit is disabled
+        :param analytics: columnar snapshot of users, marked stale after
+        commit of each write; caller marks it if autocommit is disabled
+        :param existence_filter: filter of taken usernames and emails,
+        conflict checks of values not in filter are skipped
+        """
         self._db = db
+        self._autocommit = autocommit
+        self._cache = cache
+        self._analytics = analytics
+        self._filter = existence_filter
+
+    def _record_change(self, user_id: int, operation: str) -> None:
+        """
+        Add change of user to change log, in the same transaction.
+        :param user_id: user id
+        :param operation: "insert", "update" or "delete"
+        """
+        self._db.session.execute(
+            _INSERT_CHANGE, {"user_id": user_id, "operation": operation}
+        )
+
+    def _commit(self) -> None:
+        """
+        Commit changes if repository is in autocommit mode, else flush them.
+        """
+        if self._autocommit:
+            self._db.session.commit()
+            if self._cache is not None:
+                self._cache.bump_generation()
+            if self._analytics is not None:
+                self._analytics.mark_stale()
+        else:
+            self._db.session.flush()
 
     def get_all(
         self,
         paginator_params: UserPaginatorQueryParams,
     ) -> list[User]:
         """
-        Get all users with applied pagination params.
+        Get all users with applied pagination, sorting and filter params.
         :param paginator_params: pagination params schema
         :return: list of users
         """
-        stmt = select(User).offset(paginator_params.offset)
-        if paginator_params.limit != 0:
-            stmt = stmt.limit(paginator_params.limit)
-        result = list(self._db.session.scalars(stmt).all())
+        filters, params = _users_page_params(paginator_params)
+        stmt = _select_users_page(
+            "orm",
+            paginator_params.sort,
+            filters,
+            paginator_params.limit != 0,
+        )
+        result = list(self._db.session.scalars(stmt, params).all())
         return result
 
-    def _get_user_by_field(self, field_name: str, value: str) -> User | None:
+    def get_all_records(
+        self,
+        paginator_params: UserPaginatorQueryParams,
+    ) -> list[UserRecord]:
+        """
+        Get all users with applied pagination, sorting and filter params
+        as read-only records. Rows are fetched on Core level, bypassing
+        ORM identity map.
+        :param paginator_params: pagination params schema
+        :return: list of user records
+        """
+        filters, params = _users_page_params(paginator_params)
+        stmt = _select_users_page(
+            "records",
+            paginator_params.sort,
+            filters,
+            paginator_params.limit != 0,
+        )
+        result = self._db.session.connection().execute(stmt, params)
+        return [UserRecord._make(row) for row in result]
+
+    def get_record(self, id: int) -> UserRecord:
+        """
+        Get user by id as read-only record, from cache if available.
+        :param id: user id
+        :return: user record
+        :raises UserNotFoundException: if user not found
+        """
+
+        def fetch() -> UserRecord | None:
+            row = (
+                self._db.session.connection()
+                .execute(_SELECT_USER_RECORD_BY_ID, {"id": id})
+                .one_or_none()
+            )
+            return UserRecord._make(row) if row is not None else None
+
+        if self._cache is not None:
+            record = self._cache.get_or_set(f"user:{id}", fetch)
+        else:
+            record = fetch()
+        if record is None:
+            raise UserNotFoundException(user_id=id)
+        return record
+
+    def warm_up(self) -> None:
+        """
+        Execute hot statements of requests, so they are in compiled cache
+        of engine before the first request. Writes are executed the way
+        create, update and delete execute them: update and delete match
+        no user, a sample user is inserted. Caller rolls back the session.
+        """
+        connection = self._db.session.connection()
+        for stmt, params in _WARM_UP_READS:
+            connection.execute(stmt, params).all()
+        self.get_all_records(UserPaginatorQueryParams(limit=1))
+
+        sample = {
+            "username": f"warmup_{uuid.uuid4().hex}",
+            "email": f"warmup_{uuid.uuid4().hex}@example.com",
+        }
+        if self._supports("insert_returning"):
+            connection.execute(_INSERT_USER_RETURNING, sample).all()
+        else:
+            connection.execute(_INSERT_USER, sample)
+        update_stmt = (
+            _UPDATE_USER_RETURNING
+            if self._supports("update_returning")
+            else _UPDATE_USER
+        )
+        for fields in _WARM_UP_UPDATED_FIELDS:
+            values = {field: sample[field] for field in fields}
+            connection.execute(update_stmt.values(**values), {"user_id": 0})
+        if self._supports("delete_returning"):
+            connection.execute(_DELETE_USER_RETURNING, {"user_id": 0}).all()
+        else:
+            connection.execute(_DELETE_USER, {"user_id": 0})
+
+    def get_records_by_ids(self, ids: list[int]) -> list[UserRecord]:
+        """
+        Get users by ids as read-only records, in order of ids.
+        Missing users are skipped.
+        :param ids: user ids
+        :return: list of user records
+        """
+        rows = self._db.session.connection().execute(
+            _SELECT_USER_RECORDS_BY_IDS, {"ids": ids}
+        )
+        records = {row.id: UserRecord._make(row) for row in rows}
+        return [records[id] for id in ids if id in records]
+
+    def find_record(self, field_name: str, value: str) -> UserRecord | None:
+        """
+        Find user by username or email, case-insensitive, as read-only
+        record, from cache if available.
+        :param field_name: "username" or "email"
+        :param value: field value in any case
+        :return: user record if found else None
+        """
+
+        def fetch() -> UserRecord | None:
+            row = (
+                self._db.session.connection()
+                .execute(
+                    _SELECT_USER_RECORD_BY_FIELD[field_name],
+                    {"value": value},
+                )
+                .one_or_none()
+            )
+            return UserRecord._make(row) if row is not None else None
+
+        if self._cache is not None:
+            return self._cache.get_or_set(
+                f"user:{field_name}:{value.lower()}", fetch
+            )
+        return fetch()
+
+    def iter_records(
+        self,
+        batch_size: int = 1000,
+        filter_params: UserFilterParams | None = None,
+    ) -> Iterator[UserRecord]:
+        """
+        Walk all users in order of id as read-only records.
+        Users are fetched in batches by id, so memory use is bounded
+        by batch size and every batch uses index.
+        :param batch_size: number of users fetched per query
+        :param filter_params: filters of walked users, all users if None
+        :return: iterator of user records
+        """
+        filters, params = _users_filter_params(filter_params)
+        stmt = _select_user_records_after_id(filters)
+        after_id = -1
+        connection = self._db.session.connection()
+        while True:
+            rows = connection.execute(
+                stmt,
+                {**params, "after_id": after_id, "limit": batch_size},
+            ).all()
+            for row in rows:
+                yield UserRecord._make(row)
+            if len(rows) < batch_size:
+                return
+            after_id = rows[-1].id
+
+    def _get_user_by_field(
+        self,
+        field_name: str,
+        value: str | int,
+    ) -> User | None:
         """
         Get user by field. Service method.
         :param field_name: field name
         :param value: field value
         :return: user model if found else None
         """
-        stmt = select(User).filter_by(**{field_name: value})
-        result = self._db.session.scalars(stmt).one_or_none()
+        stmt = _SELECT_USER_BY_FIELD[field_name]
+        result = self._db.session.scalars(stmt, {"value": value}).one_or_none()
         return result
 
     def get_one(self, id: int) -> User:
@@ -57,66 +561,225 @@ class UserRepository:
         :param id: user id
         :return: user
         """
-        result = self._get_user_by_field("id", str(id))
+        result = self._get_user_by_field("id", id)
 
         if result is None:
             raise UserNotFoundException(user_id=id)
 
         return result
 
-    def update(self, id: int, data: UserUpdate) -> User:
+    def _supports(self, feature: str) -> bool:
+        """
+        Check if database backend supports feature, e.g. "update_returning"
+        (SQLite >= 3.35, PostgreSQL).
+        :param feature: name of dialect flag
+        :return: True if supported
+        """
+        return bool(getattr(self._db.engine.dialect, feature, False))
+
+    def _check_conflicts(
+        self,
+        username: str | None,
+        email: str | None,
+        exclude_id: int = 0,
+        use_filter: bool = True,
+    ) -> bool:
+        """
+        Check username and email are not taken by other users,
+        with one query. Query is skipped if existence filter tells
+        neither value is taken.
+        :param username: new username or None if not changed
+        :param email: new email or None if not changed
+        :param exclude_id: id of updated user, ids start from 1
+        :param use_filter: consult existence filter before query
+        :return: False if query was skipped
+        :raises UserAlreadyExistsException: if username or email is taken
+        """
+        if username is None and email is None:
+            return True
+        if (
+            use_filter
+            and self._filter is not None
+            and not (
+                username is not None
+                and self._filter.might_exist("username", username)
+            )
+            and not (
+                email is not None and self._filter.might_exist("email", email)
+            )
+        ):
+            return False
+        conflicts = (
+            self._db.session.connection()
+            .execute(
+                _SELECT_USER_CONFLICTS,
+                {
+                    "username": username,
+                    "email": email,
+                    "exclude_id": exclude_id,
+                },
+            )
+            .all()
+        )
+        # None value matches no user, conflict is on the other field
+        if username is not None and any(row.username for row in conflicts):
+            raise UserAlreadyExistsException(field="username", value=username)
+        if email is not None and conflicts:
+            raise UserAlreadyExistsException(field="email", value=email)
+        return True
+
+    @contextmanager
+    def _unchecked(
+        self,
+        checked: bool,
+        username: str | None,
+        email: str | None,
+        exclude_id: int = 0,
+    ) -> Iterator[None]:
+        """
+        Run write not preceded by conflict check so that its failure
+        leaves transaction usable. Value taken by another worker and not
+        in existence filter yet violates unique index, it is reported
+        as conflict.
+        SQLite rolls back only the failed statement. Other databases,
+        such as PostgreSQL, abort the whole transaction, so the write runs
+        in a savepoint of the connection executing it; pysqlite is left
+        out, as its implicit transactions break savepoints.
+        :param checked: conflicts were checked by query, no savepoint
+        :param username: new username or None if not changed
+        :param email: new email or None if not changed
+        :param exclude_id: id of updated user, ids start from 1
+        :raises UserAlreadyExistsException: if username or email is taken
+        """
+        if checked:
+            yield
+        else:
+            connection = self._db.session.connection()
+            try:
+                with (
+                    nullcontext()
+                    if connection.dialect.name == "sqlite"
+                    else connection.begin_nested()
+                ):
+                    yield
+            except IntegrityError:
+                self._check_conflicts(
+                    username, email, exclude_id, use_filter=False
+                )
+                raise
+        if self._filter is not None:
+            self._filter.add(username, email)
+
+    def is_available(self, field_name: str, value: str) -> bool:
+        """
+        Check if username or email is not taken, case-insensitively.
+        Value not in existence filter is available without query.
+        :param field_name: "username" or "email"
+        :param value: value of field
+        :return: True if no user has the value
+        """
+        if self._filter is not None and not self._filter.might_exist(
+            field_name, value
+        ):
+            return True
+        available = (
+            self._db.session.connection()
+            .execute(
+                _SELECT_USER_RECORD_BY_FIELD[field_name], {"value": value}
+            )
+            .first()
+            is None
+        )
+        if available and self._filter is not None:
+            self._filter.report_false_positive()
+        return available
+
+    def update(self, id: int, data: UserUpdate) -> UserRecord:
         """
         Update user.
         :param id: user id
-        :param data: user update data
-        :return: updated user model
+        :param data: user update data, None fields are not changed
+        :return: updated user record
         """
         # check if another user with provided data already exists
-        for field, value in data.model_dump().items():
-            other_user_with_provided_new_field = self._get_user_by_field(
-                field, value
-            )
-            if (
-                other_user_with_provided_new_field is not None
-                and other_user_with_provided_new_field.id != id
-            ):
-                raise UserAlreadyExistsException(field=field, value=value)
+        checked = self._check_conflicts(
+            data.username, data.email, exclude_id=id
+        )
 
-        user = self.get_one(id)
-        user.email = data.email or user.email  # takes new val or old val
-        user.username = data.username or user.username  # takes new val or old val
-        self._db.session.commit()
-        return user
+        values = data.model_dump(exclude_none=True)
+        if not values:
+            # nothing is changed, change feed and caches stay as they are
+            return self.get_record(id)
+        connection = self._db.session.connection()
+        if self._supports("update_returning"):
+            with self._unchecked(checked, data.username, data.email, id):
+                row = connection.execute(
+                    _UPDATE_USER_RETURNING.values(**values), {"user_id": id}
+                ).one_or_none()
+            if row is None:
+                raise UserNotFoundException(user_id=id)
+            record = UserRecord._make(row)
+        else:
+            with self._unchecked(checked, data.username, data.email, id):
+                result = connection.execute(
+                    _UPDATE_USER.values(**values), {"user_id": id}
+                )
+            if result.rowcount == 0:
+                raise UserNotFoundException(user_id=id)
+            record = UserRecord._make(
+                connection.execute(_SELECT_USER_RECORD_BY_ID, {"id": id}).one()
+            )
+        self._record_change(id, "update")
+        self._commit()
+        return record
 
-    def create(self, user: UserCreate) -> User:
+    def create(self, user: UserCreate) -> UserRecord:
         """
         Create user.
         :param user: user model
-        :return: created user model
+        :return: created user record
         """
-        user_dict = user.model_dump()
-
         # check if user with provided data already exists
-        for field, value in user_dict.items():
-            found_user_by_field = self._get_user_by_field(field, value)
-            if found_user_by_field is not None:
-                raise UserAlreadyExistsException(field=field, value=value)
-
-        user_model = User(**user.model_dump())
-        self._db.session.add(user_model)
-        self._db.session.flush()
-        self._db.session.refresh(user_model)
-        self._db.session.commit()
-        return user_model
+        checked = self._check_conflicts(user.username, user.email)
+
+        connection = self._db.session.connection()
+        values = user.model_dump()
+        if self._supports("insert_returning"):
+            with self._unchecked(checked, user.username, user.email):
+                row = connection.execute(_INSERT_USER_RETURNING, values).one()
+        else:
+            with self._unchecked(checked, user.username, user.email):
+                result = connection.execute(_INSERT_USER, values)
+            row = connection.execute(
+                _SELECT_USER_RECORD_BY_ID,
+                {"id": result.inserted_primary_key[0]},
+            ).one()
+        record = UserRecord._make(row)
+        self._record_change(record.id, "insert")
+        self._commit()
+        return record
 
     def delete(self, id: int) -> None:
         """
         Delete user by id.
         :param id: user id
         """
-        user = self.get_one(id)
-        self._db.session.delete(user)
-        self._db.session.commit()
+        connection = self._db.session.connection()
+        if self._supports("delete_returning"):
+            found = (
+                connection.execute(
+                    _DELETE_USER_RETURNING, {"user_id": id}
+                ).one_or_none()
+                is not None
+            )
+        else:
+            found = (
+                connection.execute(_DELETE_USER, {"user_id": id}).rowcount > 0
+            )
+        if not found:
+            raise UserNotFoundException(user_id=id)
+        self._record_change(id, "delete")
+        self._commit()
         return None
 
     def get_all_filter_by_registered_date(
@@ -128,9 +791,12 @@ class UserRepository:
         :param days: number of days, positive number
         :return: list of users
         """
-        timestamp_filter = (dt.now() - td(days=days)).isoformat()
-        stmt = select(User).filter(User.registration_date > timestamp_filter)
-        result = list(self._db.session.scalars(stmt).all())
+        since = dt.now() - td(days=days)
+        result = list(
+            self._db.session.scalars(
+                _SELECT_USERS_REGISTERED_SINCE, {"since": since}
+            ).all()
+        )
         return result
 
     def get_order_by_longest_username(self, limit: int) -> list[User]:
@@ -142,12 +808,11 @@ class UserRepository:
         if limit <= 0:
             raise ValueError("Limit must be positive number")
 
-        stmt = (
-            select(User)
-            .order_by(func.char_length(User.username).desc())
-            .limit(limit)
+        result = list(
+            self._db.session.scalars(
+                _SELECT_USERS_BY_LONGEST_USERNAME, {"limit": limit}
+            ).all()
         )
-        result = list(self._db.session.scalars(stmt).all())
         return result
 
     def get_count_matching_email_domain(self, domain: str) -> int:
@@ -156,10 +821,22 @@ class UserRepository:
         :param domain: email domain
         :return: count of users
         """
-        stmt = select(func.count(User.id)).filter(
-            User.email.ilike(f"%{domain}")
+        result = self._db.session.scalar(
+            _COUNT_USERS_MATCHING_EMAIL, {"pattern": f"%{domain}"}
+        )
+
+        return result or 0
+
+    def count_filtered(self, filter_params: UserFilterParams) -> int:
+        """
+        Get count of users matching filters
+        :param filter_params: filters schema
+        :return: count of users
+        """
+        filters, params = _users_filter_params(filter_params)
+        result = self._db.session.scalar(
+            _count_users_filtered(filters), params
         )
-        result = self._db.session.scalar(stmt)
 
         return result or 0
 
@@ -168,7 +845,116 @@ class UserRepository:
         Get all users count
         :return: count of users
         """
-        stmt = select(func.count(User.id))
-        result = self._db.session.scalar(stmt)
+        result = self._db.session.scalar(_COUNT_USERS)
 
         return result or 0
+
+    def get_top_email_domains_counts(
+        self,
+        limit: int,
+    ) -> tuple[int, list[tuple[str, int]]]:
+        """
+        Get the most common email domains with counts of users
+        in one aggregated query.
+        :param limit: max number of domains, positive number
+        :return: count of all users and list of domains with counts
+        """
+        rows = self._db.session.execute(
+            _SELECT_TOP_EMAIL_DOMAINS, {"limit": limit}
+        ).all()
+        if not rows:
+            return 0, []
+        total = int(rows[0].total)
+        # "count" attribute of row is shadowed by Sequence.count for typing
+        return total, [
+            (str(row.domain), int(row._mapping["count"])) for row in rows
+        ]
+
+    def get_email_domains_counts(
+        self,
+        domains: list[str],
+    ) -> tuple[int, list[tuple[str, int]]]:
+        """
+        Get counts of users for each of provided email domains
+        in one query with conditional aggregation.
+        :param domains: email domains
+        :return: count of all users and list of domains with counts
+        """
+        domains = [domain.lower() for domain in domains]
+        stmt = select(
+            func.count(User.id),
+            *(
+                func.count(case((_EMAIL_DOMAIN == domain, User.id)))
+                for domain in domains
+            ),
+        )
+        total, *counts = self._db.session.execute(stmt).one()
+        return total, list(zip(domains, counts))
+
+    def get_stats_summary(
+        self,
+        since: dt | None,
+        longest_username_limit: int | None,
+        domains: list[str],
+    ) -> UsersStatsSummary:
+        """
+        Get stats summary in one query. Counts are computed with
+        conditional aggregates in one CTE, users with the longest
+        username are joined from another CTE.
+        :param since: count users registered after it, skipped if None
+        :param longest_username_limit: number of users with the longest
+        username, skipped if None
+        :param domains: email domains to count users for
+        :return: stats summary
+        """
+        domains = [domain.lower() for domain in domains]
+        columns = [func.count(User.id).label("total")]
+        if since is not None:
+            columns.append(
+                func.count(
+                    case((User.registration_date > since, User.id))
+                ).label("registered_since")
+            )
+        columns.extend(
+            func.count(case((_EMAIL_DOMAIN == domain, User.id))).label(
+                f"domain_{i}"
+            )
+            for i, domain in enumerate(domains)
+        )
+        counts = select(*columns).cte("counts")
+
+        if longest_username_limit is None:
+            stmt = select(counts)
+        else:
+            longest = (
+                select(
+                    User.id,
+                    User.username,
+                    User.email,
+                    User.registration_date,
+                )
+                .order_by(func.char_length(User.username).desc())
+                .limit(longest_username_limit)
+                .cte("longest")
+            )
+            stmt = (
+                select(counts, longest)
+                .select_from(counts.outerjoin(longest, true()))
+                .order_by(func.char_length(longest.c.username).desc())
+            )
+
+        rows = self._db.session.execute(stmt).all()
+        first = rows[0]._mapping
+        return UsersStatsSummary(
+            total=first["total"],
+            registered_since=first.get("registered_since"),
+            domains_counts=[
+                (domain, first[f"domain_{i}"])
+                for i, domain in enumerate(domains)
+            ],
+            longest_username_users=(
+                [row for row in rows if row.id is not None]
+                if longest_username_limit is not None
+                else []
+            ),
+        )
@@ -0,0 +1,218 @@
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Any, Callable
+
+from flask import Flask
+
+from app.src.core import register_metrics
+from app.src.exceptions import (
+    UserNotFoundException,
+    UserAlreadyExistsException,
+)
+from app.src.repositories.users_repository import UserRepository
+from app.src.schemas.entities import UserCreate, UserUpdate, UserFromDB
+
+if TYPE_CHECKING:
+    from flask_sqlalchemy import SQLAlchemy
+
+    from app.src.repositories.cache_backend import CacheBackend
+    from app.src.repositories.existence_filter import UserExistenceFilter
+    from app.src.services.user_analytics import UserAnalytics
+
+logger = logging.getLogger(__name__)
+
+WriteOperation = Callable[[UserRepository], UserFromDB | None]
+
+
+class UserWritePipeline:
+    """
+    Group commit of user writes.
+
+    Request threads submit create/update/delete operations, a single writer
+    thread collects them for a batching window (or until batch is full),
+    applies them in one transaction and resolves future of each caller
+    with its own result or exception.
+
+    Conflicts are detected by repository checks before any write of an
+    operation, so a conflicting operation does not affect others in batch.
+    If the batch fails on commit, its operations are applied one by one.
+    """
+
+    EXPECTED_EXCEPTIONS = (UserNotFoundException, UserAlreadyExistsException)
+
+    def __init__(
+        self,
+        db: "SQLAlchemy",
+        window: float,
+        max_batch_size: int,
+        cache: "CacheBackend | None" = None,
+        analytics: "UserAnalytics | None" = None,
+        existence_filter: "UserExistenceFilter | None" = None,
+    ) -> None:
+        self._db = db
+        self._window = window
+        self._max_batch_size = max_batch_size
+        self._cache = cache
+        self._analytics = analytics
+        self._existence_filter = existence_filter
+        self._queue: queue.Queue[tuple[WriteOperation, Future[Any]]] = (
+            queue.Queue()
+        )
+        self._lock = threading.Lock()
+        self._pid: int | None = None
+        self._app: Flask | None = None
+
+        self.batches_total = 0
+        self.operations_total = 0
+        self.max_batch_size_seen = 0
+        self.fallbacks_total = 0
+
+    def init_app(self, app: Flask) -> None:
+        """
+        Register pipeline for application.
+        :param app: Flask application
+        """
+        self._app = app
+        app.extensions["write_pipeline"] = self
+        register_metrics(app, "write_pipeline", self.stats)
+
+    def _ensure_started(self) -> None:
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            threading.Thread(
+                target=self._run,
+                name="user-write-pipeline",
+                daemon=True,
+            ).start()
+
+    def _submit(self, operation: WriteOperation) -> Any:
+        """
+        Submit operation and wait for its result.
+        :param operation: function applying write with repository
+        :return: result of operation
+        """
+        self._ensure_started()
+        future: Future[Any] = Future()
+        self._queue.put((operation, future))
+        return future.result()
+
+    def create(self, user: UserCreate) -> UserFromDB:
+        """
+        Create user in next batch.
+        :param user: user model
+        :return: created user
+        """
+        return self._submit(  # type: ignore[no-any-return]
+            lambda repo: UserFromDB.model_validate(repo.create(user))
+        )
+
+    def update(self, id: int, data: UserUpdate) -> UserFromDB:
+        """
+        Update user in next batch.
+        :param id: user id
+        :param data: user update data
+        :return: updated user
+        """
+        return self._submit(  # type: ignore[no-any-return]
+            lambda repo: UserFromDB.model_validate(repo.update(id, data))
+        )
+
+    def delete(self, id: int) -> None:
+        """
+        Delete user in next batch.
+        :param id: user id
+        """
+        self._submit(lambda repo: repo.delete(id))
+
+    def _collect_batch(self) -> list[tuple[WriteOperation, Future[Any]]]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self._window
+        while len(batch) < self._max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect_batch()
+            try:
+                self._apply(batch)
+            except Exception as exc:
+                logger.exception("Failed to apply batch of user writes")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+
+    def _apply(self, batch: list[tuple[WriteOperation, Future[Any]]]) -> None:
+        """
+        Apply batch in one transaction and resolve futures.
+        :param batch: operations with futures of callers
+        """
+        assert self._app is not None
+        self.batches_total += 1
+        self.operations_total += len(batch)
+        self.max_batch_size_seen = max(self.max_batch_size_seen, len(batch))
+
+        with self._app.app_context():
+            repo = UserRepository(
+                self._db,
+                autocommit=False,
+                existence_filter=self._existence_filter,
+            )
+            outcomes: list[tuple[bool, Any]] = []
+            try:
+                for operation, _ in batch:
+                    try:
+                        outcomes.append((True, operation(repo)))
+                    except self.EXPECTED_EXCEPTIONS as exc:
+                        outcomes.append((False, exc))
+                self._db.session.commit()
+                if self._cache is not None:
+                    self._cache.bump_generation()
+                if self._analytics is not None:
+                    self._analytics.mark_stale()
+            except Exception:
+                self._db.session.rollback()
+                if len(batch) == 1:
+                    raise
+                self.fallbacks_total += 1
+                # failure of one operation must not fail the others
+                for item in batch:
+                    try:
+                        self._apply([item])
+                    except Exception as exc:
+                        logger.exception("Failed to apply user write")
+                        item[1].set_exception(exc)
+                return
+
+        for (_, future), (ok, value) in zip(batch, outcomes):
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Pipeline counters.
+        :return: counters as dict
+        """
+        return {
+            "queued": self._queue.qsize(),
+            "batches_total": self.batches_total,
+            "operations_total": self.operations_total,
+            "max_batch_size_seen": self.max_batch_size_seen,
+            "fallbacks_total": self.fallbacks_total,
+        }
@@ -1,7 +1,12 @@
 from .users_router import router as users_router
-from .swagger import setup_swagger
+from .metrics_router import router as metrics_router
+from .health_router import router as health_router
+from .swagger import setup_openapi, setup_swagger
 
 __all__ = (
     "users_router",
+    "metrics_router",
+    "health_router",
+    "setup_openapi",
     "setup_swagger",
 )
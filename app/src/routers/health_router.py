@@ -0,0 +1,50 @@
+import logging
+
+from flask import Blueprint, make_response, Response, jsonify, current_app
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.src.core import db
+
+logger = logging.getLogger(__name__)
+
+router = Blueprint(
+    name="health_router",
+    import_name=__name__,
+)
+
+
+def _not_ready(reason: str) -> Response:
+    return make_response(
+        jsonify({"status": "not ready", "reason": reason}),
+        503,
+    )
+
+
+@router.get("/healthz")
+def get_liveness() -> Response:
+    """
+    Endpoint for liveness check, process serves requests.
+    Database is not checked, so its outage does not restart workers.
+    :return: json response with status
+    """
+    return make_response(jsonify({"status": "ok"}), 200)
+
+
+@router.get("/readyz")
+def get_readiness() -> Response:
+    """
+    Endpoint for readiness check: warm-up of process finished, if enabled,
+    and database answers. Failed warm-up is retried.
+    :return: json response with status, 503 if process is not ready
+    """
+    warmup = current_app.extensions.get("warmup")
+    if warmup is not None and not warmup.run():
+        return _not_ready("warm-up is not finished")
+    try:
+        with db.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except SQLAlchemyError:
+        logger.warning("Readiness check of database failed", exc_info=True)
+        return _not_ready("database is not available")
+    return make_response(jsonify({"status": "ready"}), 200)
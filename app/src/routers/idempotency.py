@@ -0,0 +1,100 @@
+import hashlib
+from functools import wraps
+from typing import Any, Callable
+
+from flask import Response, current_app, jsonify, make_response, request
+
+from app.src.exceptions import (
+    IdempotencyKeyReusedException,
+    IdempotencyKeyInProgressException,
+)
+from app.src.repositories import StoredResponse, IdempotencyStore
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+
+def _fingerprint() -> str:
+    """
+    Fingerprint of current request: hash of method, path and body.
+    :return: hex digest
+    """
+    digest = hashlib.sha256()
+    digest.update(request.method.encode())
+    digest.update(b"\n")
+    digest.update(request.path.encode())
+    digest.update(b"\n")
+    digest.update(request.get_data())
+    return digest.hexdigest()
+
+
+def idempotent(func: Callable[..., Any]) -> Callable[..., Response]:
+    """
+    Make write endpoint idempotent for requests with Idempotency-Key header.
+    Response of the first request is stored and replayed for retries
+    with the same key, without executing endpoint again.
+    Concurrent duplicates wait for the first request.
+    """
+
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Response:
+        store: IdempotencyStore | None = current_app.extensions.get(
+            "idempotency"
+        )
+        key = request.headers.get(IDEMPOTENCY_KEY_HEADER)
+        if store is None or key is None:
+            return make_response(func(*args, **kwargs))
+
+        if not key or len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            err_body = {
+                "error": f"{IDEMPOTENCY_KEY_HEADER} must be from 1 to "
+                f"{IDEMPOTENCY_KEY_MAX_LENGTH} characters"
+            }
+            return make_response(jsonify(err_body), 400)
+
+        try:
+            stored = store.begin(key, _fingerprint())
+        except IdempotencyKeyReusedException as exc:
+            err_body = {
+                "error": f"{IDEMPOTENCY_KEY_HEADER} '{exc.key}' "
+                "was used with different request"
+            }
+            return make_response(jsonify(err_body), 422)
+        except IdempotencyKeyInProgressException as exc:
+            err_body = {
+                "error": f"Request with {IDEMPOTENCY_KEY_HEADER} "
+                f"'{exc.key}' is in progress"
+            }
+            response = make_response(jsonify(err_body), 409)
+            response.headers["Retry-After"] = "1"
+            return response
+
+        if stored is not None:
+            response = Response(
+                response=stored.body,
+                status=stored.status_code,
+                content_type=stored.content_type,
+            )
+            response.headers["Idempotent-Replayed"] = "true"
+            return response
+
+        try:
+            response = make_response(func(*args, **kwargs))
+        except BaseException:
+            store.release(key)
+            raise
+
+        if response.status_code >= 500:
+            store.release(key)
+        else:
+            store.complete(
+                key,
+                StoredResponse(
+                    status_code=response.status_code,
+                    content_type=response.content_type,
+                    body=response.get_data(),
+                ),
+            )
+        return response
+
+    return wrapper
@@ -0,0 +1,21 @@
+from flask import Blueprint, make_response, Response, jsonify, current_app
+
+from app.src.core import collect_metrics
+
+router = Blueprint(
+    name="metrics_router",
+    import_name=__name__,
+    url_prefix="/api/metrics",
+)
+
+
+@router.get("/")
+def get_metrics() -> Response:
+    """
+    Endpoint for getting runtime metrics of application.
+    :return: json response with metrics grouped by section
+    """
+    return make_response(
+        jsonify(collect_metrics(current_app)),
+        200,
+    )
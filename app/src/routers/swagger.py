@@ -1,13 +1,85 @@
-from flask import Flask, Response
-from flask_swagger_ui import get_swaggerui_blueprint
+import gzip
+import hashlib
+from functools import cache
+from typing import NamedTuple
+
+from flask import Flask, Response, request
 
 from app.config import Settings
 
 
+class OpenAPIDocument(NamedTuple):
+    """
+    OpenAPI document kept in memory with its precomputed representations.
+    """
+
+    content: bytes
+    gzipped: bytes
+    etag: str
+
+
+@cache
+def load_openapi_document(path: str) -> OpenAPIDocument:
+    """
+    Read OpenAPI document from disk once and keep it in memory.
+    :param path: path to the document
+    :return: document with raw and gzip-compressed bytes and ETag
+    of raw bytes, gzip representation has its own ETag with "-gzip" suffix
+    """
+    with open(path, "rb") as f:
+        content = f.read()
+    return OpenAPIDocument(
+        content=content,
+        gzipped=gzip.compress(content, compresslevel=9),
+        etag=hashlib.sha256(content).hexdigest()[:32],
+    )
+
+
+def setup_openapi(app: Flask, settings: Settings) -> None:
+    """
+    Register route serving OpenAPI document from memory.
+    The document is loaded on first request and served with ETag,
+    Cache-Control and pre-compressed gzip body when client accepts it.
+    """
+
+    PATH_TO_DOCS = settings.PATH_TO_DOCS
+    CACHE_CONTROL = f"public, max-age={settings.OPENAPI_CACHE_MAX_AGE}"
+
+    @app.route(PATH_TO_DOCS)
+    def serve_openapi() -> Response:
+        document = load_openapi_document(PATH_TO_DOCS.lstrip("/"))
+
+        # quality 0 of "gzip;q=0" means gzip is not acceptable
+        use_gzip = request.accept_encodings["gzip"] > 0
+        etag = f"{document.etag}-gzip" if use_gzip else document.etag
+
+        if etag in request.if_none_match:
+            response = Response(status=304)
+        elif use_gzip:
+            response = Response(
+                response=document.gzipped,
+                mimetype="application/yaml",
+                status=200,
+            )
+            response.content_encoding = "gzip"
+        else:
+            response = Response(
+                response=document.content,
+                mimetype="application/yaml",
+                status=200,
+            )
+
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = CACHE_CONTROL
+        response.vary.add("Accept-Encoding")
+        return response
+
+
 def setup_swagger(app: Flask, settings: Settings) -> None:
     """
-    Swagger configuration setup for Flask application.
+    Swagger UI configuration setup for Flask application.
     """
+    from flask_swagger_ui import get_swaggerui_blueprint
 
     SWAGGER_API_URL = settings.SWAGGER_API_URL
     PATH_TO_DOCS = settings.PATH_TO_DOCS
@@ -19,12 +91,3 @@ def setup_swagger(app: Flask, settings: Settings) -> None:
     )
 
     app.register_blueprint(swaggerui_blueprint, url_prefix=SWAGGER_API_URL)
-
-    @app.route(PATH_TO_DOCS)
-    def serve_openapi() -> Response:
-        with open(PATH_TO_DOCS.lstrip("/"), "r") as f:
-            return Response(
-                response=f.read(),
-                mimetype="application/yaml",
-                status=200,
-            )
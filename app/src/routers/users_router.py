@@ -1,19 +1,51 @@
-from flask import Blueprint, make_response, Response, jsonify
-from flask_pydantic import validate
+from flask import (
+    Blueprint,
+    make_response,
+    Response,
+    jsonify,
+    current_app,
+    send_file,
+    url_for,
+)
 
 from app.src.core import db
 from app.src.exceptions import (
     UserNotFoundException,
     UserAlreadyExistsException,
+    JobNotFoundException,
+    TooManyJobsException,
+)
+from app.src.repositories import (
+    CacheBackend,
+    UserRepository,
+    UserChangeRepository,
+    UserWritePipeline,
+    UserJobRepository,
+    UserExistenceFilter,
 )
-from app.src.repositories import UserRepository
 from app.src.schemas.entities import (
     UserFromDB,
     UserUpdate,
     UserCreate,
+    UserJobCreate,
+    UserJobFromDB,
+)
+from app.src.schemas.query import (
+    UserPaginatorQueryParams,
+    EmailDomainsQueryParams,
+    StatsSummaryQueryParams,
+    UserChangesQueryParams,
+    UserAvailabilityQueryParams,
 )
-from app.src.schemas.query import UserPaginatorQueryParams
-from app.src.services import UserService
+from app.src.services import (
+    UserService,
+    StatsSnapshot,
+    UserJobRunner,
+    JOB_MEDIA_TYPES,
+    UserAnalytics,
+)
+from app.src.utils import validate_request, respond, response_codec
+from app.src.routers.idempotency import idempotent
 
 router = Blueprint(
     name="users_router",
@@ -22,22 +54,127 @@ router = Blueprint(
 )
 
 
+def _get_cache() -> CacheBackend | None:
+    """
+    Get cache of user lookups and stats results if enabled.
+    :return: cache or None
+    """
+    return current_app.extensions.get("cache")
+
+
+def _get_analytics() -> UserAnalytics | None:
+    """
+    Get columnar snapshot of users for stats if enabled.
+    :return: snapshot or None
+    """
+    return current_app.extensions.get("analytics")
+
+
+def _get_existence_filter() -> UserExistenceFilter | None:
+    """
+    Get filter of taken usernames and emails if enabled.
+    :return: filter or None
+    """
+    return current_app.extensions.get("existence_filter")
+
+
+def _get_user_service() -> UserService:
+    """
+    Get users service with coalescing, caching and in-process
+    analytics of stats if enabled.
+    :return: users service
+    """
+    return UserService(
+        UserRepository(db),
+        flight=current_app.extensions.get("single_flight"),
+        cache=_get_cache(),
+        analytics=_get_analytics(),
+    )
+
+
 @router.get("/")
-@validate()  # type: ignore[misc]
+@validate_request
 def get_all_users(query: UserPaginatorQueryParams) -> Response:
     """
-    Endpoint for getting all users. Pagination is optional.
-    :return: response with list of users in json format
+    Endpoint for getting all users. Pagination, sorting and filters
+    are optional.
+    :return: response with list of users in json format, or in binary
+    format negotiated by Accept header
     """
+    codec = response_codec()
     repo = UserRepository(db)
-    users_list = repo.get_all(query)
-    users_dto_list = [UserFromDB.model_validate(usr) for usr in users_list]
+    # read-only records, no ORM instances and no DTO copies
+    users_list = repo.get_all_records(query)
+    return respond(
+        [usr.to_dict(epoch_dates=codec is not None) for usr in users_list],
+        200,
+        codec,
+    )
+
+
+@router.get("/changes")
+@validate_request
+def get_user_changes(query: UserChangesQueryParams) -> Response:
+    """
+    Endpoint for getting changes of users after provided sequence number,
+    in order. Consumers pass "next_since" of response to get next page.
+    If "since" is lower than "first_seq" - 1, older changes were compacted
+    and consumer has to resync. Feed is ordered by commit only with one
+    writer at a time, as on SQLite, see UserChangeRepository.get_changes.
+    :return: json response with changes and current state of users
+    """
+    repo = UserChangeRepository(db)
+    changes = repo.get_changes(since=query.since, limit=query.limit)
+    changes_list = [
+        {
+            "seq": change.seq,
+            "operation": change.operation,
+            "user_id": change.user_id,
+            "changed_at": change.changed_at.isoformat(),
+            "user": (
+                UserFromDB.model_validate(user).to_dict()
+                if user is not None and change.operation != "delete"
+                else None
+            ),
+        }
+        for change, user in changes
+    ]
     return make_response(
-        jsonify([usr.to_dict() for usr in users_dto_list]),
+        jsonify(
+            {
+                "changes": changes_list,
+                "first_seq": repo.get_first_seq(),
+                "next_since": changes[-1][0].seq if changes else query.since,
+            }
+        ),
         200,
     )
 
 
+@router.get("/availability")
+@validate_request
+def get_availability(query: UserAvailabilityQueryParams) -> Response:
+    """
+    Endpoint for checking if username and email are not taken.
+    Values are answered from filter of taken values if enabled,
+    only its hits are confirmed by query.
+    :return: json response with availability of each provided value
+    """
+    repo = UserRepository(db, existence_filter=_get_existence_filter())
+    result = {
+        field_name: {
+            "value": value,
+            "available": repo.is_available(field_name, value),
+        }
+        for field_name, value in (
+            ("username", query.username),
+            ("email", query.email),
+        )
+        if value is not None
+    }
+    return make_response(jsonify(result), 200)
+
+
 @router.get("/<int:id>/")
 def get_user(id: int) -> Response:
     """
@@ -45,37 +182,103 @@ def get_user(id: int) -> Response:
     :param id: user id
     :return: json response with user data
     """
-    repo = UserRepository(db)
+    codec = response_codec()
+    repo = UserRepository(db, cache=_get_cache())
     try:
-        user = repo.get_one(id)
+        user = repo.get_record(id)
     except UserNotFoundException as exc:
         err_body = {"error": f"User with id {exc.user_id} not found"}
         return make_response(
             jsonify(err_body),
             404,
         )
-    user_dto = UserFromDB.model_validate(user)
-    return make_response(
-        jsonify(user_dto.to_dict()),
+    return respond(
+        user.to_dict(epoch_dates=codec is not None),
+        200,
+        codec,
+    )
+
+
+@router.get("/by-email/<email>")
+def get_user_by_email(email: str) -> Response:
+    """
+    Endpoint for getting user by email, case-insensitive.
+    :param email: user email
+    :return: json response with user data
+    """
+    codec = response_codec()
+    repo = UserRepository(db, cache=_get_cache())
+    user = repo.find_record("email", email)
+    if user is None:
+        err_body = {"error": f"User with email '{email}' not found"}
+        return make_response(
+            jsonify(err_body),
+            404,
+        )
+    return respond(
+        user.to_dict(epoch_dates=codec is not None),
+        200,
+        codec,
+    )
+
+
+@router.get("/by-username/<name>")
+def get_user_by_username(name: str) -> Response:
+    """
+    Endpoint for getting user by username, case-insensitive.
+    :param name: username
+    :return: json response with user data
+    """
+    codec = response_codec()
+    repo = UserRepository(db, cache=_get_cache())
+    user = repo.find_record("username", name)
+    if user is None:
+        err_body = {"error": f"User with username '{name}' not found"}
+        return make_response(
+            jsonify(err_body),
+            404,
+        )
+    return respond(
+        user.to_dict(epoch_dates=codec is not None),
         200,
+        codec,
+    )
+
+
+def _get_user_writer() -> UserRepository | UserWritePipeline:
+    """
+    Get object applying user writes: group commit pipeline if enabled,
+    otherwise repository committing each write.
+    :return: writer with create, update and delete methods
+    """
+    pipeline = current_app.extensions.get("write_pipeline")
+    if pipeline is not None:
+        return pipeline  # type: ignore[no-any-return]
+    return UserRepository(
+        db,
+        cache=_get_cache(),
+        analytics=_get_analytics(),
+        existence_filter=_get_existence_filter(),
     )
 
 
 @router.post("/")
-@validate()  # type: ignore[misc]
+@idempotent
+@validate_request
 def create_user(body: UserCreate) -> Response:
     """
     Endpoint for creating user.
     :param body: user data for creating
     :return: json response with created user data
     """
-    repo = UserRepository(db)
+    codec = response_codec()
+    repo = _get_user_writer()
     try:
         created_user = repo.create(body)
-        user_dto = UserFromDB.model_validate(created_user)
-        return make_response(
-            jsonify(user_dto.to_dict()),
+        return respond(
+            created_user.to_dict(epoch_dates=codec is not None),
             201,
+            codec,
         )
     except UserAlreadyExistsException as exc:
         err_body = {
@@ -88,7 +291,8 @@ def create_user(body: UserCreate) -> Response:
 
 
 @router.patch("/<int:id>/")
-@validate()  # type: ignore[misc]
+@idempotent
+@validate_request
 def update_user(id: int, body: UserUpdate) -> Response:
     """
     Endpoint for updating user.
@@ -96,13 +300,14 @@ def update_user(id: int, body: UserUpdate) -> Response:
     :param body: user data for updating
     :return: json response with updated user data
     """
-    repo = UserRepository(db)
+    codec = response_codec()
+    repo = _get_user_writer()
     try:
         updated_user = repo.update(id=id, data=body)
-        user_dto = UserFromDB.model_validate(updated_user)
-        return make_response(
-            jsonify(user_dto.to_dict()),
+        return respond(
+            updated_user.to_dict(epoch_dates=codec is not None),
             200,
+            codec,
         )
     except UserNotFoundException as exc:
         err_body = {"error": f"User with id {exc.user_id} not found"}
@@ -121,13 +326,14 @@ def update_user(id: int, body: UserUpdate) -> Response:
 
 
 @router.delete("/<int:id>/")
+@idempotent
 def delete_user(id: int) -> Response:
     """
     Endpoint for deleting user.
     :param id: user id
     :return: json response with status message
     """
-    repo = UserRepository(db)
+    repo = _get_user_writer()
     try:
         repo.delete(id)
         return make_response(
@@ -142,18 +348,164 @@ def delete_user(id: int) -> Response:
         )
 
 
+def _get_job_runner() -> UserJobRunner | None:
+    """
+    Get runner of background jobs if enabled.
+    :return: runner or None
+    """
+    return current_app.extensions.get("user_jobs")
+
+
+def _jobs_disabled() -> Response:
+    return make_response(
+        jsonify({"error": "Background jobs are disabled"}),
+        404,
+    )
+
+
+def _job_not_found(exc: JobNotFoundException) -> Response:
+    return make_response(
+        jsonify({"error": f"Job with id {exc.job_id} not found"}),
+        404,
+    )
+
+
+@router.post("/jobs")
+@idempotent
+@validate_request
+def create_job(body: UserJobCreate) -> Response:
+    """
+    Endpoint for submitting background export or report job.
+    :param body: job kind, format and parameters
+    :return: json response with queued job and its status URL
+    """
+    runner = _get_job_runner()
+    if runner is None:
+        return _jobs_disabled()
+    try:
+        job = runner.submit(
+            body.kind,
+            body.format,  # type: ignore[arg-type]
+            body.job_params(),
+        )
+    except TooManyJobsException as exc:
+        response = make_response(
+            jsonify(
+                {"error": f"Limit of {exc.limit} unfinished jobs is reached"}
+            ),
+            429,
+        )
+        response.headers["Retry-After"] = "30"
+        return response
+    response = make_response(
+        jsonify(UserJobFromDB.model_validate(job).to_dict()),
+        202,
+    )
+    response.headers["Location"] = url_for(".get_job", job_id=job.id)
+    return response
+
+
+@router.get("/jobs/<job_id>")
+def get_job(job_id: str) -> Response:
+    """
+    Endpoint for polling status and progress of background job.
+    :param job_id: job id
+    :return: json response with job status, with result URL if succeeded
+    """
+    if _get_job_runner() is None:
+        return _jobs_disabled()
+    try:
+        job = UserJobRepository(db).get(job_id)
+    except JobNotFoundException as exc:
+        return _job_not_found(exc)
+    body = UserJobFromDB.model_validate(job).to_dict()
+    if job.status == "succeeded":
+        body["result_url"] = url_for(".get_job_result", job_id=job.id)
+    return make_response(
+        jsonify(body),
+        200,
+    )
+
+
+@router.get("/jobs/<job_id>/result")
+def get_job_result(job_id: str) -> Response:
+    """
+    Endpoint for downloading result file of succeeded job.
+    File is streamed from disk, not loaded into memory.
+    :param job_id: job id
+    :return: response with result file
+    """
+    runner = _get_job_runner()
+    if runner is None:
+        return _jobs_disabled()
+    try:
+        job = UserJobRepository(db).get(job_id)
+    except JobNotFoundException as exc:
+        return _job_not_found(exc)
+    if job.status != "succeeded":
+        return make_response(
+            jsonify({"error": f"Job with id {job_id} is {job.status}"}),
+            409,
+        )
+    try:
+        return send_file(
+            runner.result_path(job),
+            mimetype=JOB_MEDIA_TYPES[job.format],
+            as_attachment=True,
+            download_name=f"users-{job.kind}-{job.id}.{job.format}",
+        )
+    except FileNotFoundError:
+        return make_response(
+            jsonify({"error": f"Result of job with id {job_id} is deleted"}),
+            410,
+        )
+
+
+def _get_stats_snapshot(key: str | tuple[str, str]) -> StatsSnapshot | None:
+    """
+    Get precomputed stats snapshot if background refresher is enabled.
+    :param key: stats name, or tuple of name and argument
+    :return: snapshot or None if stats should be computed synchronously
+    """
+    refresher = current_app.extensions.get("stats_refresher")
+    if refresher is None:
+        return None
+    return refresher.get(key)  # type: ignore[no-any-return]
+
+
+def _set_snapshot_age(
+    response: Response,
+    snapshot: StatsSnapshot | None,
+) -> Response:
+    """
+    Add age of served snapshot to response headers.
+    :param response: response
+    :param snapshot: served snapshot or None if computed synchronously
+    :return: response
+    """
+    if snapshot is not None:
+        response.headers["X-Snapshot-Age"] = f"{snapshot.age:.3f}"
+    return response
+
+
 @router.get("/stats/from_last_week")
 def get_users_registered_from_last_week() -> Response:
     """
     Endpoint for getting count of users registered from last week.
     :return: json response with count of users.
     """
-    repo = UserRepository(db)
-    service = UserService(repo)
-    count_users = service.count_registered_last_week()
-    return make_response(
-        jsonify({"count": count_users}),
-        200,
+    snapshot = _get_stats_snapshot("count_registered_last_week")
+    if snapshot is not None:
+        count_users = snapshot.value
+    else:
+        service = _get_user_service()
+        count_users = service.count_registered_last_week()
+    return _set_snapshot_age(
+        make_response(
+            jsonify({"count": count_users}),
+            200,
+        ),
+        snapshot,
     )
 
 
@@ -163,13 +515,23 @@ def get_top_5_longest_username() -> Response:
     Endpoint for getting top 5 users with the longest username.
     :return: response with list of users in json format.
     """
-    repo = UserRepository(db)
-    service = UserService(repo)
-    users_list = service.get_top_5_longest_username()
-    users_dto_list = [UserFromDB.model_validate(usr) for usr in users_list]
-    return make_response(
-        jsonify([usr.to_dict() for usr in users_dto_list]),
-        200,
+    codec = response_codec()
+    snapshot = _get_stats_snapshot("get_top_5_longest_username")
+    if snapshot is not None:
+        users_dto_list = snapshot.value
+    else:
+        service = _get_user_service()
+        users_dto_list = service.get_top_5_longest_username()
+    return _set_snapshot_age(
+        respond(
+            [
+                usr.to_dict(epoch_dates=codec is not None)
+                for usr in users_dto_list
+            ],
+            200,
+            codec,
+        ),
+        snapshot,
     )
 
 
@@ -180,18 +542,27 @@ def get_users_with_email_domain(domain: str) -> Response:
     :param domain: email domain
     :return: response with list of users in json format.
     """
-    repo = UserRepository(db)
-    service = UserService(repo)
+    snapshot = _get_stats_snapshot(("get_proportion_with_domain", domain))
     try:
-        proportion = service.get_proportion_with_domain(domain)
-        return make_response(
-            jsonify(
-                {
-                    "domain": domain,
-                    "proportion": proportion,
-                }
+        if snapshot is not None:
+            proportion = snapshot.value
+        else:
+            service = _get_user_service()
+            proportion = service.get_proportion_with_domain(domain)
+            refresher = current_app.extensions.get("stats_refresher")
+            if refresher is not None:
+                refresher.track_domain(domain)
+        return _set_snapshot_age(
+            make_response(
+                jsonify(
+                    {
+                        "domain": domain,
+                        "proportion": proportion,
+                    }
+                ),
+                200,
             ),
-            200,
+            snapshot,
         )
     except ValueError:
         err_body = {"error": f"Invalid domain: {domain}"}
@@ -199,3 +570,54 @@ def get_users_with_email_domain(domain: str) -> Response:
             jsonify(err_body),
             400,
         )
+
+
+@router.get("/stats/email_domains")
+@validate_request
+def get_email_domains_distribution(query: EmailDomainsQueryParams) -> Response:
+    """
+    Endpoint for getting distribution of users by email domain.
+    Returns the most common domains or the requested ones.
+    :return: json response with counts and proportions of domains
+    """
+    service = _get_user_service()
+    try:
+        distribution = service.get_email_domains_distribution(
+            query.top, tuple(query.domains)
+        )
+    except ValueError as exc:
+        return make_response(
+            jsonify({"error": str(exc)}),
+            400,
+        )
+    return make_response(
+        jsonify(distribution),
+        200,
+    )
+
+
+@router.get("/stats/summary")
+@validate_request
+def get_stats_summary(query: StatsSummaryQueryParams) -> Response:
+    """
+    Endpoint for getting summary of users stats in one request.
+    Parts of summary are selected with "include" query param.
+    :return: json response with selected parts of summary
+    """
+    service = _get_user_service()
+    try:
+        summary = service.summary(
+            tuple(dict.fromkeys(query.include)),
+            query.days,
+            query.top,
+            tuple(query.domains),
+        )
+    except ValueError as exc:
+        return make_response(
+            jsonify({"error": str(exc)}),
+            400,
+        )
+    return make_response(
+        jsonify(summary),
+        200,
+    )
@@ -3,10 +3,16 @@ from .user_schema import (
     UserUpdate,
     UserFromDB,
 )
+from .user_job_schema import (
+    UserJobCreate,
+    UserJobFromDB,
+)
 
 
 __all__ = (
     "UserCreate",
     "UserUpdate",
     "UserFromDB",
+    "UserJobCreate",
+    "UserJobFromDB",
 )
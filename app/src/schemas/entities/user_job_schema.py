@@ -0,0 +1,121 @@
+from typing import Any, Literal, Self
+
+from pydantic import (
+    BaseModel,
+    Field,
+    ConfigDict,
+    PositiveInt,
+    model_validator,
+)
+from pydantic_core import PydanticCustomError
+from datetime import datetime as dt
+
+from app.src.schemas.query import UserFilterParams
+
+
+class UserJobCreate(BaseModel):
+    """
+    Background job create schema.
+    "export" writes users matching filters to "jsonl" (default)
+    or "csv" file, "report" writes stats summary and email domains
+    distribution to "json" file.
+    """
+
+    kind: Literal["export", "report"] = Field(description="Kind of job.")
+    format: Literal["jsonl", "csv", "json"] | None = Field(
+        default=None,
+        description="Format of result file.",
+    )
+    filters: UserFilterParams = Field(
+        default_factory=UserFilterParams,
+        description="Filters of exported users.",
+    )
+    days: PositiveInt = Field(
+        default=7,
+        le=3650,
+        description="Number of days for count of registered users.",
+    )
+    top: PositiveInt = Field(
+        default=5,
+        le=100,
+        description="Number of users with the longest username and "
+        "of the most common email domains.",
+    )
+
+    model_config = ConfigDict(extra="forbid")
+
+    @model_validator(mode="after")
+    def _check_format(self) -> Self:
+        if self.format is None:
+            self.format = "jsonl" if self.kind == "export" else "json"
+        elif (self.kind == "report") != (self.format == "json"):
+            raise PydanticCustomError(
+                "job_format",
+                "format of {kind} can not be {format}",
+                {"kind": self.kind, "format": self.format},
+            )
+        return self
+
+    def job_params(self) -> dict[str, Any]:
+        """
+        Parameters stored with job.
+        :return: JSON-serializable parameters of job kind
+        """
+        if self.kind == "export":
+            return {
+                "filters": self.filters.model_dump(
+                    mode="json", exclude_none=True
+                )
+            }
+        return {"days": self.days, "top": self.top}
+
+
+class UserJobFromDB(BaseModel):
+    """
+    Background job schema from database.
+    """
+
+    id: str = Field(description="Job identifier.")
+    kind: str = Field(description="Kind of job.")
+    format: str = Field(description="Format of result file.")
+    status: str = Field(
+        description='"queued", "running", "succeeded" or "failed".'
+    )
+    attempts: int = Field(description="Number of times job was started.")
+    rows_done: int = Field(description="Number of processed rows.")
+    rows_total: int | None = Field(description="Number of rows to process.")
+    error: str | None = Field(description="Error of failed job.")
+    created_at: dt = Field(description="Time of submission.")
+    started_at: dt | None = Field(description="Time of last start.")
+    finished_at: dt | None = Field(description="Time of finish.")
+
+    model_config = ConfigDict(
+        from_attributes=True,
+    )
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Return a dict with job's state with stringified timestamps
+        and progress from 0.0 to 1.0, None while it is unknown.
+        :return: model attrs and values as dictionary.
+        """
+        if self.status == "succeeded":
+            progress: float | None = 1.0
+        elif self.rows_total:
+            progress = round(min(self.rows_done / self.rows_total, 1.0), 4)
+        else:
+            progress = None
+        return dict(
+            id=self.id,
+            kind=self.kind,
+            format=self.format,
+            status=self.status,
+            attempts=self.attempts,
+            rows_done=self.rows_done,
+            rows_total=self.rows_total,
+            progress=progress,
+            error=self.error,
+            created_at=self.created_at.isoformat(),
+            started_at=self.started_at and self.started_at.isoformat(),
+            finished_at=self.finished_at and self.finished_at.isoformat(),
+        )
@@ -3,6 +3,8 @@ from typing import Any
 from pydantic import BaseModel, Field, EmailStr, ConfigDict
 from datetime import datetime as dt
 
+from app.src.utils import epoch_seconds
+
 
 class BaseUser(BaseModel):
     """
@@ -63,14 +65,19 @@ class UserFromDB(BaseUser):
         from_attributes=True,
     )
 
-    def to_dict(self) -> dict[str, Any]:
+    def to_dict(self, epoch_dates: bool = False) -> dict[str, Any]:
         """
         Return a dict with user's data with stringified timestamp
+        :param epoch_dates: timestamp as unix time, for binary formats
         :return: model attrs and values as dictionary.
         """
         return dict(
             id=self.id,
             username=self.username,
             email=self.email,
-            registration_date=self.registration_date.isoformat(),
+            registration_date=(
+                epoch_seconds(self.registration_date)
+                if epoch_dates
+                else self.registration_date.isoformat()
+            ),
         )
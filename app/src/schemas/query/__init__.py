@@ -1,3 +1,14 @@
-from .users_pagination import UserPaginatorQueryParams
+from .users_pagination import UserPaginatorQueryParams, UserFilterParams
+from .email_domains import EmailDomainsQueryParams
+from .stats_summary import StatsSummaryQueryParams
+from .user_changes import UserChangesQueryParams
+from .user_availability import UserAvailabilityQueryParams
 
-__all__ = ("UserPaginatorQueryParams",)
+__all__ = (
+    "UserPaginatorQueryParams",
+    "UserFilterParams",
+    "EmailDomainsQueryParams",
+    "StatsSummaryQueryParams",
+    "UserChangesQueryParams",
+    "UserAvailabilityQueryParams",
+)
@@ -0,0 +1,19 @@
+from pydantic import (
+    BaseModel,
+    Field,
+    ConfigDict,
+    PositiveInt,
+)
+
+
+class EmailDomainsQueryParams(BaseModel):
+    """
+    Email domains distribution query params validation schema.
+    By default, top 10 domains are returned.
+    If domains are provided, distribution is computed for them instead.
+    """
+
+    top: PositiveInt = Field(default=10, le=1000)
+    domains: list[str] = Field(default_factory=list, max_length=100)
+
+    model_config = ConfigDict(extra="forbid")
@@ -0,0 +1,31 @@
+from typing import Literal, get_args
+
+from pydantic import (
+    BaseModel,
+    Field,
+    ConfigDict,
+    PositiveInt,
+)
+
+SummaryPart = Literal["total", "last_days", "top_longest_username", "domains"]
+
+
+def _all_summary_parts() -> list[SummaryPart]:
+    return list(get_args(SummaryPart))
+
+
+class StatsSummaryQueryParams(BaseModel):
+    """
+    Stats summary query params validation schema.
+    By default, all parts of summary are included,
+    registrations are counted for last 7 days and top 5 usernames returned.
+    """
+
+    include: list[SummaryPart] = Field(
+        default_factory=_all_summary_parts,
+    )
+    days: PositiveInt = Field(default=7, le=3650)
+    top: PositiveInt = Field(default=5, le=100)
+    domains: list[str] = Field(default_factory=list, max_length=100)
+
+    model_config = ConfigDict(extra="forbid")
@@ -0,0 +1,32 @@
+from typing import Self
+
+from pydantic import (
+    BaseModel,
+    Field,
+    ConfigDict,
+    EmailStr,
+    model_validator,
+)
+from pydantic_core import PydanticCustomError
+
+
+class UserAvailabilityQueryParams(BaseModel):
+    """
+    Availability check query params validation schema.
+    At least one of username and email is required, they are validated
+    the same way as on user creation.
+    """
+
+    username: str | None = Field(default=None, min_length=3, max_length=32)
+    email: EmailStr | None = Field(default=None, min_length=6, max_length=64)
+
+    model_config = ConfigDict(extra="forbid")
+
+    @model_validator(mode="after")
+    def _check_any(self) -> Self:
+        if self.username is None and self.email is None:
+            raise PydanticCustomError(
+                "availability_params",
+                "username or email is required",
+            )
+        return self
@@ -0,0 +1,20 @@
+from pydantic import (
+    BaseModel,
+    Field,
+    ConfigDict,
+    NonNegativeInt,
+    PositiveInt,
+)
+
+
+class UserChangesQueryParams(BaseModel):
+    """
+    Change feed query params validation schema.
+    By default, changes are returned from the beginning, 100 per page.
+    The maximum number of changes is set to 1000.
+    """
+
+    since: NonNegativeInt = Field(default=0)
+    limit: PositiveInt = Field(default=100, le=1000)
+
+    model_config = ConfigDict(extra="forbid")
@@ -1,19 +1,92 @@
+from datetime import datetime as dt, UTC
+from typing import Literal, Self
+
 from pydantic import (
     BaseModel,
     Field,
     ConfigDict,
     NonNegativeInt,
+    field_validator,
+    model_validator,
 )
+from pydantic_core import PydanticCustomError
+
+UsersSort = Literal[
+    "id",
+    "-id",
+    "registration_date",
+    "-registration_date",
+    "username",
+    "-username",
+]
+
+
+class UserFilterParams(BaseModel):
+    """
+    Filters of users validation schema, all optional.
+    Every filter is served by index of users table.
+    """
+
+    registered_from: dt | None = Field(
+        default=None,
+        description="Users registered at or after this time.",
+    )
+    registered_to: dt | None = Field(
+        default=None,
+        description="Users registered before this time.",
+    )
+    email_domain: str | None = Field(
+        default=None,
+        min_length=1,
+        max_length=63,
+        pattern=r"^[^@\s]+$",
+        description="Domain part of email, case-insensitive.",
+    )
+    username_prefix: str | None = Field(
+        default=None,
+        min_length=1,
+        max_length=32,
+        description="Start of username, case-insensitive.",
+    )
 
+    model_config = ConfigDict(extra="forbid")
+
+    @field_validator("registered_from", "registered_to")
+    @classmethod
+    def _to_naive_utc(cls, value: dt | None) -> dt | None:
+        # registration dates are stored as naive UTC
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(UTC).replace(tzinfo=None)
+        return value
+
+    @field_validator("email_domain", "username_prefix")
+    @classmethod
+    def _to_lower(cls, value: str | None) -> str | None:
+        return value.lower() if value is not None else None
+
+    @model_validator(mode="after")
+    def _check_registered_range(self) -> Self:
+        if (
+            self.registered_from is not None
+            and self.registered_to is not None
+            and self.registered_from > self.registered_to
+        ):
+            raise PydanticCustomError(
+                "registered_range",
+                "registered_from must not be later than registered_to",
+            )
+        return self
 
-class UserPaginatorQueryParams(BaseModel):
+
+class UserPaginatorQueryParams(UserFilterParams):
     """
-    Pagination query params validation schema.
-    By default, offset = 0 and items = 5.
+    Pagination, sorting and filtering query params validation schema.
+    By default, offset = 0 and items = 5, users are sorted by id.
     The maximum number of records is set to 1000.
+    Sort field prefixed with "-" is descending, usernames are sorted
+    case-insensitively.
     """
 
     offset: NonNegativeInt = Field(default=0)
     limit: NonNegativeInt = Field(default=5, le=1000)
-
-    model_config = ConfigDict(extra="forbid")
+    sort: UsersSort = Field(default="id")
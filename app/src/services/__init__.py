@@ -1,4 +1,16 @@
 from .users_service import UserService
+from .stats_refresher import StatsRefresher, StatsSnapshot
+from .user_jobs import UserJobRunner, JOB_MEDIA_TYPES
+from .user_analytics import UserAnalytics
+from .warmup import AppWarmup
 
 
-__all__ = ("UserService",)
+__all__ = (
+    "UserService",
+    "StatsRefresher",
+    "StatsSnapshot",
+    "UserJobRunner",
+    "JOB_MEDIA_TYPES",
+    "UserAnalytics",
+    "AppWarmup",
+)
@@ -0,0 +1,186 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, NamedTuple
+
+from flask import Flask
+
+from app.src.core import db, register_metrics
+from app.src.repositories import UserRepository
+from app.src.services.users_service import UserService
+
+logger = logging.getLogger(__name__)
+
+
+class StatsSnapshot(NamedTuple):
+    """
+    Precomputed stats value with time of computation.
+    """
+
+    value: Any
+    computed_at: float
+
+    @property
+    def age(self) -> float:
+        """
+        Age of snapshot.
+        :return: seconds since computation
+        """
+        return time.monotonic() - self.computed_at
+
+
+class StatsRefresher:
+    """
+    Background thread recomputing UserService stats on a schedule.
+
+    Domain proportions are refreshed for configured domains and for
+    recently requested ones. Snapshots older than max staleness
+    are not served, so callers compute them synchronously.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        max_staleness: float,
+        tracked_domains: list[str],
+        max_recent_domains: int,
+    ) -> None:
+        self._interval = interval
+        self._max_staleness = max_staleness
+        self._tracked_domains = list(tracked_domains)
+        self._max_recent_domains = max_recent_domains
+        self._recent_domains: OrderedDict[str, None] = OrderedDict()
+        self._snapshots: dict[Hashable, StatsSnapshot] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._pid: int | None = None
+        self._app: Flask | None = None
+
+        self.served_total = 0
+        self.fallback_total = 0
+        self.refresh_errors_total = 0
+
+    def init_app(self, app: Flask) -> None:
+        """
+        Register refresher for application.
+        Thread is started on first request of each process,
+        so refresher also works in forked workers.
+        :param app: Flask application
+        """
+        self._app = app
+        app.before_request(self._ensure_started)
+        app.extensions["stats_refresher"] = self
+        register_metrics(app, "stats_refresher", self.stats)
+
+    def _ensure_started(self) -> None:
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run,
+                name="stats-refresher",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop background thread.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self._interval)
+
+    def track_domain(self, domain: str) -> None:
+        """
+        Mark domain as recently requested, so it is refreshed.
+        :param domain: valid email domain
+        """
+        with self._lock:
+            self._recent_domains[domain] = None
+            self._recent_domains.move_to_end(domain)
+            while len(self._recent_domains) > self._max_recent_domains:
+                self._recent_domains.popitem(last=False)
+
+    def _domains(self) -> list[str]:
+        with self._lock:
+            recent = list(self._recent_domains)
+        return list(dict.fromkeys(self._tracked_domains + recent))
+
+    def refresh(self) -> None:
+        """
+        Recompute all stats snapshots.
+        """
+        assert self._app is not None
+        with self._app.app_context():
+            service = UserService(UserRepository(db))
+            jobs: list[tuple[Hashable, Any]] = [
+                (
+                    "count_registered_last_week",
+                    service.count_registered_last_week,
+                ),
+                (
+                    "get_top_5_longest_username",
+                    service.get_top_5_longest_username,
+                ),
+            ]
+            for domain in self._domains():
+                jobs.append(
+                    (
+                        ("get_proportion_with_domain", domain),
+                        lambda d=domain: service.get_proportion_with_domain(d),
+                    )
+                )
+
+            for key, compute in jobs:
+                try:
+                    value = compute()
+                except Exception:
+                    self.refresh_errors_total += 1
+                    logger.exception("Failed to refresh stats %s", key)
+                    continue
+                with self._lock:
+                    self._snapshots[key] = StatsSnapshot(
+                        value=value,
+                        computed_at=time.monotonic(),
+                    )
+
+    def get(self, key: Hashable) -> StatsSnapshot | None:
+        """
+        Get snapshot if it is not older than max staleness.
+        :param key: stats name, or tuple of name and argument
+        :return: snapshot or None if caller should compute synchronously
+        """
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot is None or snapshot.age > self._max_staleness:
+                self.fallback_total += 1
+                return None
+            self.served_total += 1
+            return snapshot
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Refresher counters.
+        :return: counters as dict
+        """
+        with self._lock:
+            return {
+                "snapshots": len(self._snapshots),
+                "recent_domains": len(self._recent_domains),
+                "served_total": self.served_total,
+                "fallback_total": self.fallback_total,
+                "refresh_errors_total": self.refresh_errors_total,
+            }
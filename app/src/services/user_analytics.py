@@ -0,0 +1,456 @@
+import logging
+import sys
+import threading
+import time
+from datetime import datetime as dt
+from typing import Any, Iterable, Sequence
+
+from flask import Flask
+
+from app.src.core import db, register_metrics
+from app.src.repositories import UserRepository, UserChangeRepository
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency, stats are computed in SQL
+    np = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+# characters of LIKE patterns and of email address, domains with them
+# do not match only the domain part and are counted in SQL
+_NOT_SUFFIX_CHARS = frozenset("@%_\\")
+
+
+class UserAnalytics:
+    """
+    In-process columnar snapshot of users for stats endpoints.
+
+    Columns needed by stats are kept in compact NumPy arrays sorted by
+    user id: username lengths as int8, email domains as int32 codes of
+    a dictionary of domains, registration dates as int64 microseconds.
+    Count of registrations, top of the longest usernames and domain
+    proportions are then answered by vectorized scans instead of queries
+    walking users table.
+
+    Snapshot is loaded on first use in each process and kept current from
+    the user changes log: local commits mark it stale, writes of other
+    workers are picked up at most sync interval later. If the log was
+    compacted past the last applied change, snapshot is reloaded. It is
+    also reloaded periodically, so a change committed out of order of its
+    sequence number by a concurrent transaction is not missed for long.
+
+    Snapshot larger than memory budget is dropped; methods return None
+    while snapshot is not available and callers compute stats in SQL.
+    """
+
+    # bytes per user: id, username length, domain code, date, alive flag
+    ROW_BYTES = 8 + 1 + 4 + 8 + 1
+    # snapshot is rebuilt from users table at least this often, in seconds
+    RELOAD_INTERVAL = 600.0
+    # number of users or changes fetched per query on load and sync
+    BATCH_SIZE = 1000
+
+    def __init__(self, max_bytes: int, sync_interval: float) -> None:
+        """
+        :param max_bytes: memory budget of snapshot, in bytes
+        :param sync_interval: how often changes of other workers
+        are applied, in seconds
+        """
+        self._max_bytes = max_bytes
+        self._sync_interval = sync_interval
+        self._lock = threading.Lock()
+        self._stale = True
+        self._synced_at = 0.0
+        self._loaded_at = 0.0
+        self._last_seq = 0
+        self._reset()
+
+        self.loads_total = 0
+        self.syncs_total = 0
+        self.served_total = 0
+        self.fallback_total = 0
+        self.over_budget = False
+
+    def init_app(self, app: Flask) -> None:
+        """
+        Register snapshot for application.
+        Snapshot is not used if NumPy is not installed.
+        :param app: Flask application
+        """
+        if np is None:
+            logger.warning("NumPy is not installed, analytics is disabled")
+            return
+        app.extensions["analytics"] = self
+        register_metrics(app, "analytics", self.stats)
+
+    def _reset(self) -> None:
+        self._size = 0
+        self._dead = 0
+        self._ids: Any = None
+        self._lengths: Any = None
+        self._domains: Any = None
+        self._registered: Any = None
+        self._alive: Any = None
+        self._dictionary: list[str] = []
+        self._codes: dict[str, int] = {}
+        self._dictionary_bytes = 0
+        self._domain_matches: dict[str, tuple[int, Any]] = {}
+
+    @property
+    def _capacity(self) -> int:
+        return 0 if self._ids is None else len(self._ids)
+
+    def nbytes(self) -> int:
+        """
+        Memory used by snapshot.
+        :return: size of arrays and domains dictionary, in bytes
+        """
+        return self._capacity * self.ROW_BYTES + self._dictionary_bytes
+
+    def mark_stale(self) -> None:
+        """
+        Apply pending changes on next use, called after commit of writes.
+        """
+        self._stale = True
+
+    def _ensure_current(self) -> bool:
+        """
+        Load snapshot or apply pending changes if needed.
+        Called with lock held.
+        :return: True if snapshot is available
+        """
+        now = time.monotonic()
+        if not self._stale and now - self._synced_at < self._sync_interval:
+            return self._ids is not None
+        self._stale = False
+        self._synced_at = now
+        try:
+            if self._ids is None or now - self._loaded_at >= (
+                self.RELOAD_INTERVAL
+            ):
+                self._load()
+            else:
+                self._sync()
+        except Exception:
+            logger.exception("Update of analytics snapshot failed")
+            self._reset()
+        return self._ids is not None
+
+    def _load(self) -> None:
+        self._reset()
+        self._loaded_at = time.monotonic()
+        self.loads_total += 1
+        # changes committed during load are applied again, upserts are
+        # idempotent
+        last_seq = UserChangeRepository(db).get_last_seq()
+        repo = UserRepository(db)
+        total = repo.get_all_count()
+        if total * self.ROW_BYTES > self._max_bytes:
+            self._over_budget(total)
+            return
+        if not self._reserve(total):
+            return
+        self.over_budget = False
+        batch: list[Sequence[Any]] = []
+        for record in repo.iter_records(self.BATCH_SIZE):
+            batch.append(record)
+            if len(batch) == self.BATCH_SIZE:
+                self._append(batch)
+                batch = []
+        self._append(batch)
+        if self._ids is None:
+            return
+        self._last_seq = last_seq
+        self._apply_changes(UserChangeRepository(db))
+
+    def _over_budget(self, rows: int) -> None:
+        if not self.over_budget:
+            logger.warning(
+                "Analytics snapshot of %d users exceeds memory budget, "
+                "stats are computed in SQL",
+                rows,
+            )
+        self.over_budget = True
+        self._reset()
+
+    def _sync(self) -> None:
+        self.syncs_total += 1
+        changes = UserChangeRepository(db)
+        first_seq = changes.get_first_seq()
+        # snapshot loaded from empty log reads all changes made after it
+        if self._last_seq and (first_seq or 0) > self._last_seq + 1:
+            # changes were compacted before they were applied
+            self._load()
+            return
+        self._apply_changes(changes)
+
+    def _apply_changes(self, changes: UserChangeRepository) -> None:
+        while self._ids is not None:
+            rows = changes.get_changed_records(self._last_seq, self.BATCH_SIZE)
+            if not rows:
+                return
+            self._apply(rows)
+            self._last_seq = rows[-1].seq
+            if len(rows) < self.BATCH_SIZE:
+                return
+
+    def _apply(self, rows: Iterable[Any]) -> None:
+        """
+        Apply changes with current state of users, the last one per user.
+        :param rows: rows of seq, user_id, username, email,
+        registration_date, user columns are None for deleted users
+        """
+        latest = {row.user_id: row for row in rows}
+        deleted = [id for id, row in latest.items() if row.username is None]
+        changed = [
+            (id, row.username, row.email, row.registration_date)
+            for id, row in latest.items()
+            if row.username is not None
+        ]
+
+        if deleted:
+            positions, found = self._find(deleted)
+            positions = positions[found]
+            self._dead += int(np.count_nonzero(self._alive[positions]))
+            self._alive[positions] = False
+
+        if changed:
+            changed.sort()
+            positions, found = self._find([row[0] for row in changed])
+            existing = [row for row, ok in zip(changed, found) if ok]
+            if existing:
+                positions = positions[found]
+                self._dead -= int(np.count_nonzero(~self._alive[positions]))
+                lengths, domains, registered = self._encode(existing)
+                self._lengths[positions] = lengths
+                self._domains[positions] = domains
+                self._registered[positions] = registered
+                self._alive[positions] = True
+            self._append([row for row, ok in zip(changed, found) if not ok])
+
+        if self._ids is not None and self._dead > max(self._size // 4, 1024):
+            self._compact()
+
+    def _find(self, ids: list[int]) -> tuple[Any, Any]:
+        """
+        Find positions of users in snapshot.
+        :param ids: user ids
+        :return: positions and mask of found ids
+        """
+        keys = np.asarray(ids, dtype=np.int64)
+        positions = np.searchsorted(self._ids[: self._size], keys)
+        found = positions < self._size
+        found[found] = self._ids[positions[found]] == keys[found]
+        return positions, found
+
+    def _encode(self, rows: Sequence[Sequence[Any]]) -> tuple[Any, Any, Any]:
+        """
+        Encode columns of users.
+        :param rows: tuples of id, username, email, registration_date
+        :return: arrays of username lengths, domain codes and dates
+        """
+        lengths = np.fromiter(
+            (len(row[1]) for row in rows), dtype=np.int8, count=len(rows)
+        )
+        domains = np.fromiter(
+            (self._code(row[2]) for row in rows),
+            dtype=np.int32,
+            count=len(rows),
+        )
+        registered = np.array(
+            [row[3] for row in rows], dtype="datetime64[us]"
+        ).view(np.int64)
+        return lengths, domains, registered
+
+    def _code(self, email: str) -> int:
+        domain = email.rpartition("@")[2].lower()
+        code = self._codes.get(domain)
+        if code is None:
+            code = len(self._dictionary)
+            self._dictionary.append(domain)
+            self._codes[domain] = code
+            # string is referenced by both list and dict
+            self._dictionary_bytes += sys.getsizeof(domain) + 2 * 8
+        return code
+
+    def _reserve(self, rows: int) -> bool:
+        """
+        Grow arrays to fit more users, capacity is doubled while
+        it fits memory budget.
+        :param rows: number of added users
+        :return: False if snapshot was dropped as over budget
+        """
+        needed = self._size + rows
+        if needed <= self._capacity and self._ids is not None:
+            return True
+        capacity = max(needed, 2 * self._capacity, 1024)
+        if capacity * self.ROW_BYTES + self._dictionary_bytes > (
+            self._max_bytes
+        ):
+            capacity = needed
+        if capacity * self.ROW_BYTES + self._dictionary_bytes > (
+            self._max_bytes
+        ):
+            self._over_budget(needed)
+            return False
+        size = self._size
+        self._ids = self._grown(self._ids, capacity, np.int64, size)
+        self._lengths = self._grown(self._lengths, capacity, np.int8, size)
+        self._domains = self._grown(self._domains, capacity, np.int32, size)
+        self._registered = self._grown(
+            self._registered, capacity, np.int64, size
+        )
+        self._alive = self._grown(self._alive, capacity, np.bool_, size)
+        return True
+
+    @staticmethod
+    def _grown(array: Any, capacity: int, dtype: Any, size: int) -> Any:
+        grown = np.zeros(capacity, dtype=dtype)
+        if array is not None:
+            grown[:size] = array[:size]
+        return grown
+
+    def _append(self, rows: Sequence[Sequence[Any]]) -> None:
+        """
+        Add users missing in snapshot.
+        :param rows: tuples of id, username, email, registration_date
+        """
+        if not self._reserve(len(rows)) or not rows:
+            return
+        lengths, domains, registered = self._encode(rows)
+        start, end = self._size, self._size + len(rows)
+        self._ids[start:end] = [row[0] for row in rows]
+        self._lengths[start:end] = lengths
+        self._domains[start:end] = domains
+        self._registered[start:end] = registered
+        self._alive[start:end] = True
+        self._size = end
+        if start and self._ids[start - 1] > self._ids[start]:
+            # ids are assigned in ascending order, keep rare others sorted
+            self._compact(order=np.argsort(self._ids[:end], kind="stable"))
+        if self.nbytes() > self._max_bytes:
+            self._over_budget(self._size)
+
+    def _compact(self, order: Any = None) -> None:
+        """
+        Drop deleted users from arrays.
+        :param order: positions of kept users, alive ones by default
+        """
+        if order is None:
+            order = np.flatnonzero(self._alive[: self._size])
+        size = len(order)
+        for name in ("_ids", "_lengths", "_domains", "_registered", "_alive"):
+            array = getattr(self, name)
+            array[:size] = array[order]
+        self._size = size
+        self._dead = int(np.count_nonzero(~self._alive[:size]))
+
+    def count_registered_since(self, since: dt) -> int | None:
+        """
+        Count users registered after time.
+        :param since: time, naive as registration dates
+        :return: count of users or None if snapshot is not available
+        """
+        with self._lock:
+            if not self._ensure_current():
+                self.fallback_total += 1
+                return None
+            size = self._size
+            threshold = np.datetime64(since, "us").astype(np.int64)
+            count = np.count_nonzero(
+                (self._registered[:size] > threshold) & self._alive[:size]
+            )
+            self.served_total += 1
+            return int(count)
+
+    def top_longest_username_ids(self, limit: int) -> list[int] | None:
+        """
+        Get ids of users with the longest username, ties by id.
+        :param limit: positive number
+        :return: user ids or None if snapshot is not available
+        """
+        with self._lock:
+            if not self._ensure_current():
+                self.fallback_total += 1
+                return None
+            size = self._size
+            lengths = self._lengths[:size].astype(np.int16)
+            lengths[~self._alive[:size]] = -1
+            alive = size - self._dead
+            limit = min(limit, alive)
+            if limit <= 0:
+                self.served_total += 1
+                return []
+            # length of the last user in top, users of the same length
+            # are taken in order of positions, which is order of ids
+            kth = lengths[np.argpartition(-lengths, limit - 1)[limit - 1]]
+            longer = np.flatnonzero(lengths > kth)
+            same = np.flatnonzero(lengths == kth)[: limit - len(longer)]
+            candidates = np.concatenate((longer, same))
+            top = candidates[np.lexsort((candidates, -lengths[candidates]))]
+            self.served_total += 1
+            return [int(id) for id in self._ids[top]]
+
+    def count_email_domain(self, domain: str) -> tuple[int, int] | None:
+        """
+        Count users with email ending with domain, same as
+        case-insensitive LIKE '%domain' on email.
+        :param domain: email domain
+        :return: count of matching users and of all users, or None
+        if snapshot is not available
+        """
+        if _NOT_SUFFIX_CHARS.intersection(domain):
+            self.fallback_total += 1
+            return None
+        domain = domain.lower()
+        with self._lock:
+            if not self._ensure_current():
+                self.fallback_total += 1
+                return None
+            size = self._size
+            codes = self._matching_codes(domain)
+            matching = np.count_nonzero(
+                np.isin(self._domains[:size], codes) & self._alive[:size]
+            )
+            self.served_total += 1
+            return int(matching), size - self._dead
+
+    def _matching_codes(self, domain: str) -> Any:
+        """
+        Codes of dictionary domains ending with domain, cached
+        until dictionary grows.
+        :param domain: lowered email domain
+        :return: array of codes
+        """
+        cached = self._domain_matches.get(domain)
+        if cached is not None and cached[0] == len(self._dictionary):
+            return cached[1]
+        codes = np.array(
+            [
+                code
+                for code, name in enumerate(self._dictionary)
+                if name.endswith(domain)
+            ],
+            dtype=np.int32,
+        )
+        if len(self._domain_matches) >= 1024:
+            self._domain_matches.clear()
+        self._domain_matches[domain] = (len(self._dictionary), codes)
+        return codes
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Snapshot counters.
+        :return: counters as dict
+        """
+        return {
+            "rows": self._size - self._dead,
+            "bytes": self.nbytes(),
+            "domains": len(self._dictionary),
+            "over_budget": self.over_budget,
+            "loads_total": self.loads_total,
+            "syncs_total": self.syncs_total,
+            "served_total": self.served_total,
+            "fallback_total": self.fallback_total,
+        }
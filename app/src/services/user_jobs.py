@@ -0,0 +1,317 @@
+import csv
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import (
+    datetime as dt,
+    timedelta as td,
+)
+from typing import IO, Any
+
+from flask import Flask
+from sqlalchemy import Row
+
+from app.src.core import db, register_metrics
+from app.src.repositories import UserRepository, UserJobRepository
+from app.src.schemas.query import UserFilterParams
+from app.src.services.users_service import UserService
+
+logger = logging.getLogger(__name__)
+
+JOB_MEDIA_TYPES = {
+    "jsonl": "application/x-ndjson",
+    "csv": "text/csv",
+    "json": "application/json",
+}
+
+_SUMMARY_PARTS = ("total", "last_days", "top_longest_username")
+
+
+class _JobLost(Exception):
+    """
+    Job was requeued or finished by another worker during its run.
+    """
+
+
+class UserJobRunner:
+    """
+    Runner of background export and report jobs.
+
+    Jobs are stored in database and claimed by a dispatcher thread of each
+    worker process, so a job survives restart of the worker that accepted
+    it. Each process runs at most max_concurrent jobs on its thread pool,
+    number of queued and running jobs of all workers is capped by
+    max_active. Running job reports progress after every batch of rows;
+    job without heartbeat for lease timeout is requeued and run again.
+
+    Result is written to temporary file renamed when complete, so a file
+    in jobs directory is never partial. Finished jobs and their files are
+    deleted after result ttl.
+    """
+
+    # deleting of expired jobs runs at most once per interval, in seconds
+    CLEANUP_INTERVAL = 60.0
+
+    def __init__(
+        self,
+        directory: str,
+        max_concurrent: int,
+        max_active: int,
+        batch_size: int,
+        lease_timeout: float,
+        max_attempts: int,
+        result_ttl: float,
+        poll_interval: float,
+    ) -> None:
+        """
+        :param directory: directory of result files, created if needed
+        :param max_concurrent: max number of jobs run by process at once
+        :param max_active: max number of queued and running jobs
+        :param batch_size: number of rows fetched and reported per batch
+        :param lease_timeout: seconds without heartbeat before requeue
+        :param max_attempts: max number of starts of job
+        :param result_ttl: how long finished job is kept, in seconds
+        :param poll_interval: how often queue is checked for jobs
+        submitted by other workers, in seconds
+        """
+        self._directory = directory
+        self._max_concurrent = max_concurrent
+        self._max_active = max_active
+        self._batch_size = batch_size
+        self._lease_timeout = lease_timeout
+        self._max_attempts = max_attempts
+        self._result_ttl = result_ttl
+        self._poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._pid: int | None = None
+        self._app: Flask | None = None
+        self._running = 0
+        self._cleaned_at = 0.0
+
+        self.submitted_total = 0
+        self.rejected_total = 0
+        self.succeeded_total = 0
+        self.failed_total = 0
+        self.lost_total = 0
+
+    def init_app(self, app: Flask) -> None:
+        """
+        Register runner for application.
+        Dispatcher is started on first request of each process,
+        so queued jobs are picked up after restart.
+        :param app: Flask application
+        """
+        self._app = app
+        app.before_request(self._ensure_started)
+        app.extensions["user_jobs"] = self
+        register_metrics(app, "user_jobs", self.stats)
+
+    def _ensure_started(self) -> None:
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._running = 0
+            self._stop.clear()
+            os.makedirs(self._directory, exist_ok=True)
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_concurrent,
+                thread_name_prefix="user-job",
+            )
+            self._thread = threading.Thread(
+                target=self._run,
+                name="user-jobs-dispatcher",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop dispatcher and wait for running jobs.
+        """
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    def submit(
+        self, kind: str, format: str, params: dict[str, Any]
+    ) -> Row[Any]:
+        """
+        Queue job and wake dispatcher.
+        :param kind: "export" or "report"
+        :param format: format of result file
+        :param params: JSON-serializable job parameters
+        :return: queued job
+        :raises TooManyJobsException: if limit of active jobs is reached
+        """
+        try:
+            job = UserJobRepository(db).create(
+                kind, format, params, max_active=self._max_active
+            )
+        except Exception:
+            self.rejected_total += 1
+            raise
+        self.submitted_total += 1
+        self._ensure_started()
+        self._wake.set()
+        return job
+
+    def result_path(self, job: Row[Any]) -> str:
+        """
+        Path to result file of succeeded job.
+        :param job: job
+        :return: path to file
+        """
+        return os.path.join(self._directory, job.result_file)
+
+    def _run(self) -> None:
+        assert self._app is not None
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                with self._app.app_context():
+                    self._dispatch()
+            except Exception:
+                logger.exception("Dispatching of user jobs failed")
+            self._wake.wait(self._poll_interval)
+
+    def _dispatch(self) -> None:
+        repo = UserJobRepository(db)
+        now = time.monotonic()
+        if now - self._cleaned_at >= self.CLEANUP_INTERVAL:
+            self._cleaned_at = now
+            self._cleanup(repo)
+        repo.requeue_stale(self._lease_timeout, self._max_attempts)
+        while not self._stop.is_set():
+            with self._lock:
+                if self._running >= self._max_concurrent:
+                    return
+                job = repo.claim_next()
+                if job is None:
+                    return
+                self._running += 1
+            assert self._executor is not None
+            self._executor.submit(self._execute, job)
+
+    def _cleanup(self, repo: UserJobRepository) -> None:
+        before = dt.now() - td(seconds=self._result_ttl)
+        for name in repo.delete_finished_before(before):
+            try:
+                os.remove(os.path.join(self._directory, name))
+            except FileNotFoundError:
+                pass
+
+    def _execute(self, job: Row[Any]) -> None:
+        assert self._app is not None
+        try:
+            with self._app.app_context():
+                self._execute_job(job)
+        finally:
+            with self._lock:
+                self._running -= 1
+            self._wake.set()
+
+    def _execute_job(self, job: Row[Any]) -> None:
+        repo = UserJobRepository(db)
+        filename = f"{job.id}.{job.format}"
+        path = os.path.join(self._directory, filename)
+        temp_path = f"{path}.{job.attempts}.part"
+        params = json.loads(job.params)
+        try:
+            with open(temp_path, "w", newline="", encoding="utf-8") as file:
+                if job.kind == "export":
+                    rows_done = self._export(repo, job, params, file)
+                else:
+                    rows_done = self._report(params, file)
+            os.replace(temp_path, path)
+            if not repo.finish(job.id, job.attempts, rows_done, filename):
+                raise _JobLost()
+        except _JobLost:
+            self.lost_total += 1
+            logger.warning(
+                "User job %s was taken over, result dropped", job.id
+            )
+        except Exception as exc:
+            self.failed_total += 1
+            logger.exception("User job %s failed", job.id)
+            repo.fail(job.id, job.attempts, f"{type(exc).__name__}: {exc}")
+        else:
+            self.succeeded_total += 1
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _export(
+        self,
+        repo: UserJobRepository,
+        job: Row[Any],
+        params: dict[str, Any],
+        file: IO[str],
+    ) -> int:
+        filters = UserFilterParams.model_validate(params["filters"])
+        users = UserRepository(db)
+        if not repo.heartbeat(
+            job.id, job.attempts, 0, users.count_filtered(filters)
+        ):
+            raise _JobLost()
+
+        if job.format == "csv":
+            writer = csv.writer(file)
+            writer.writerow(("id", "username", "email", "registration_date"))
+
+            def write(record: Any) -> None:
+                writer.writerow(record.to_dict().values())
+
+        else:
+
+            def write(record: Any) -> None:
+                file.write(json.dumps(record.to_dict()))
+                file.write("\n")
+
+        rows_done = 0
+        for record in users.iter_records(self._batch_size, filters):
+            write(record)
+            rows_done += 1
+            if rows_done % self._batch_size == 0 and not repo.heartbeat(
+                job.id, job.attempts, rows_done
+            ):
+                raise _JobLost()
+        return rows_done
+
+    def _report(self, params: dict[str, Any], file: IO[str]) -> int:
+        service = UserService(UserRepository(db))
+        report = service.summary(
+            _SUMMARY_PARTS, params["days"], params["top"], ()
+        )
+        report["email_domains"] = service.get_email_domains_distribution(
+            params["top"]
+        )["domains"]
+        report["generated_at"] = dt.now().isoformat()
+        json.dump(report, file)
+        return int(report["total"])
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Runner counters.
+        :return: counters as dict
+        """
+        return {
+            "running": self._running,
+            "submitted_total": self.submitted_total,
+            "rejected_total": self.rejected_total,
+            "succeeded_total": self.succeeded_total,
+            "failed_total": self.failed_total,
+            "lost_total": self.lost_total,
+        }
@@ -1,10 +1,61 @@
-from typing import TYPE_CHECKING
+from datetime import (
+    datetime as dt,
+    timedelta as td,
+)
+from functools import wraps
+from typing import TYPE_CHECKING, Any, Callable, TypeVar
 
-from app.src.models import User
+from app.src.schemas.entities import UserFromDB
 from app.src.utils import validate_domain
 
 if TYPE_CHECKING:
-    from app.src.repositories import UserRepository
+    from app.src.repositories import UserRepository, CacheBackend
+    from app.src.services.user_analytics import UserAnalytics
+    from app.src.utils import SingleFlight
+
+T = TypeVar("T")
+
+
+def single_flight(
+    method: Callable[..., T],
+) -> Callable[..., T]:
+    """
+    Coalesce concurrent identical calls of service method
+    if service has single flight group.
+    """
+
+    @wraps(method)
+    def wrapper(self: "UserService", *args: Any) -> T:
+        if self._flight is None:
+            return method(self, *args)
+        return self._flight.do(
+            method.__name__,
+            args,
+            lambda: method(self, *args),
+        )
+
+    return wrapper
+
+
+def cached(
+    method: Callable[..., T],
+) -> Callable[..., T]:
+    """
+    Serve result of service method from cache if service has cache.
+    Arguments of method are part of cache key, so they have to be
+    hashable values with stable repr.
+    """
+
+    @wraps(method)
+    def wrapper(self: "UserService", *args: Any) -> T:
+        if self._cache is None:
+            return method(self, *args)
+        return self._cache.get_or_set(
+            f"stats:{method.__name__}:{args!r}",
+            lambda: method(self, *args),
+        )
+
+    return wrapper
 
 
 class UserService:
@@ -12,25 +63,58 @@ class UserService:
     Service class for User model.
     """
 
-    def __init__(self, repo: "UserRepository") -> None:
+    def __init__(
+        self,
+        repo: "UserRepository",
+        flight: "SingleFlight | None" = None,
+        cache: "CacheBackend | None" = None,
+        analytics: "UserAnalytics | None" = None,
+    ) -> None:
         self._repo = repo
+        self._flight = flight
+        self._cache = cache
+        self._analytics = analytics
 
+    @cached
+    @single_flight
     def count_registered_last_week(self) -> int:
         """
         Count registered users last week.
         :return: count of registered users
         """
+        if self._analytics is not None:
+            count = self._analytics.count_registered_since(
+                dt.now() - td(days=7)
+            )
+            if count is not None:
+                return count
         users_list = self._repo.get_all_filter_by_registered_date(days=7)
         return len(users_list)
 
-    def get_top_5_longest_username(self) -> list[User]:
+    @cached
+    @single_flight
+    def get_top_5_longest_username(self) -> list[UserFromDB]:
         """
         Get top 5 users with the longest username.
+        Users are returned as schemas, so result can be shared
+        between threads and processes.
         :return: list of users
         """
+        if self._analytics is not None:
+            ids = self._analytics.top_longest_username_ids(limit=5)
+            if ids is not None:
+                records = self._repo.get_records_by_ids(ids)
+                # user deleted after snapshot was synced, ask database
+                if len(records) == len(ids):
+                    return [
+                        UserFromDB.model_validate(rec._asdict())
+                        for rec in records
+                    ]
         users_list = self._repo.get_order_by_longest_username(limit=5)
-        return users_list
+        return [UserFromDB.model_validate(usr) for usr in users_list]
 
+    @cached
+    @single_flight
     def get_proportion_with_domain(self, domain: str) -> float:
         """
         Get proportion of users with the specified domain.
@@ -40,9 +124,114 @@ class UserService:
         if not validate_domain(domain):
             raise ValueError("Provided domain is not valid")
 
-        count_all = self._repo.get_all_count()
-        count_match_domain = self._repo.get_count_matching_email_domain(domain)
+        counts = None
+        if self._analytics is not None:
+            counts = self._analytics.count_email_domain(domain)
+        if counts is not None:
+            count_match_domain, count_all = counts
+        else:
+            count_all = self._repo.get_all_count()
+            count_match_domain = self._repo.get_count_matching_email_domain(
+                domain
+            )
 
         proportion = round(count_match_domain / count_all, 2)
 
         return proportion
+
+    @cached
+    @single_flight
+    def get_email_domains_distribution(
+        self,
+        top: int,
+        domains: tuple[str, ...] = (),
+    ) -> dict[str, Any]:
+        """
+        Get counts and proportions of users by email domain.
+        If domains are provided, distribution is computed for them,
+        otherwise for the top most common domains.
+        :param top: number of the most common domains
+        :param domains: domains to compute distribution for
+        :return: count of all users and list of domains with counts
+        and proportions
+        """
+        for domain in domains:
+            if not validate_domain(domain):
+                raise ValueError(f"Provided domain is not valid: {domain}")
+
+        if domains:
+            total, counts = self._repo.get_email_domains_counts(list(domains))
+        else:
+            total, counts = self._repo.get_top_email_domains_counts(limit=top)
+
+        return {
+            "total": total,
+            "domains": [
+                {
+                    "domain": domain,
+                    "count": count,
+                    "proportion": round(count / total, 2) if total else 0.0,
+                }
+                for domain, count in counts
+            ],
+        }
+
+    @cached
+    @single_flight
+    def summary(
+        self,
+        include: tuple[str, ...],
+        days: int = 7,
+        top: int = 5,
+        domains: tuple[str, ...] = (),
+    ) -> dict[str, Any]:
+        """
+        Get summary of users stats computed in one pass.
+        :param include: parts of summary: "total", "last_days",
+        "top_longest_username", "domains"
+        :param days: number of days for count of registered users
+        :param top: number of users with the longest username
+        :param domains: domains to compute proportions for
+        :return: selected parts of summary
+        """
+        if "domains" not in include:
+            domains = ()
+        for domain in domains:
+            if not validate_domain(domain):
+                raise ValueError(f"Provided domain is not valid: {domain}")
+
+        stats = self._repo.get_stats_summary(
+            since=(
+                dt.now() - td(days=days) if "last_days" in include else None
+            ),
+            longest_username_limit=(
+                top if "top_longest_username" in include else None
+            ),
+            domains=list(domains),
+        )
+
+        result: dict[str, Any] = {}
+        if "total" in include:
+            result["total"] = stats.total
+        if "last_days" in include:
+            result["last_days"] = {
+                "days": days,
+                "count": stats.registered_since,
+            }
+        if "top_longest_username" in include:
+            result["top_longest_username"] = [
+                UserFromDB.model_validate(usr).to_dict()
+                for usr in stats.longest_username_users
+            ]
+        if "domains" in include:
+            result["domains"] = [
+                {
+                    "domain": domain,
+                    "count": count,
+                    "proportion": (
+                        round(count / stats.total, 2) if stats.total else 0.0
+                    ),
+                }
+                for domain, count in stats.domains_counts
+            ]
+        return result
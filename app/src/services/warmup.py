@@ -0,0 +1,141 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime as dt
+from typing import Any
+
+from flask import Flask
+from sqlalchemy import text
+
+from app.src.core import db, register_metrics
+from app.src.repositories import UserRepository
+from app.src.schemas.entities import UserCreate, UserUpdate, UserFromDB
+from app.src.schemas.query import UserPaginatorQueryParams
+
+logger = logging.getLogger(__name__)
+
+_SAMPLE_USER = {"username": "warmup", "email": "warmup@example.com"}
+
+
+class AppWarmup:
+    """
+    Warm-up of a worker process before it takes traffic.
+
+    Opens connections of the pool, executes hot statements of users
+    repository so they are compiled and cached by the engine, runs the
+    first validation of request and response schemas and primes the
+    in-process snapshots of users. Process is ready when warm-up finished
+    in it; pre-fork server warms up each worker after fork, a failed
+    warm-up is retried by readiness check.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._ready_pid: int | None = None
+        self._app: Flask | None = None
+
+        self.runs_total = 0
+        self.failures_total = 0
+        self.duration: float | None = None
+        self.last_error: str | None = None
+
+    def init_app(self, app: Flask) -> None:
+        """
+        Register warm-up for application.
+        :param app: Flask application
+        """
+        self._app = app
+        app.extensions["warmup"] = self
+        register_metrics(app, "warmup", self.stats)
+
+    @property
+    def ready(self) -> bool:
+        """
+        Warm-up finished in current process.
+        """
+        return self._ready_pid == os.getpid()
+
+    def run(self) -> bool:
+        """
+        Warm up current process, unless it is warm or warming up.
+        :return: True if process is warm
+        """
+        if self.ready:
+            return True
+        if not self._lock.acquire(blocking=False):
+            return False
+        assert self._app is not None
+        try:
+            self.runs_total += 1
+            started = time.perf_counter()
+            with self._app.app_context():
+                self._open_connections()
+                self._build_validators()
+                try:
+                    UserRepository(db).warm_up()
+                finally:
+                    db.session.rollback()
+                self._prime_snapshots()
+            self.duration = time.perf_counter() - started
+            self._ready_pid = os.getpid()
+            self.last_error = None
+            logger.info(
+                "Worker %s warmed up in %.3fs", os.getpid(), self.duration
+            )
+            return True
+        except Exception as exc:
+            self.failures_total += 1
+            self.last_error = f"{type(exc).__name__}: {exc}"
+            logger.exception("Warm-up of worker %s failed", os.getpid())
+            return False
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def _open_connections() -> None:
+        """
+        Open as many connections as the pool keeps, all at once,
+        so they are checked in to the pool.
+        """
+        size = getattr(db.engine.pool, "size", None)
+        connections = []
+        try:
+            for _ in range(size() if callable(size) else 1):
+                connection = db.engine.connect()
+                connections.append(connection)
+                connection.execute(text("SELECT 1"))
+        finally:
+            for connection in connections:
+                connection.close()
+
+    @staticmethod
+    def _build_validators() -> None:
+        UserCreate.model_validate(_SAMPLE_USER)
+        UserUpdate.model_validate(_SAMPLE_USER)
+        UserFromDB.model_validate(
+            {**_SAMPLE_USER, "id": 0, "registration_date": dt.now()}
+        ).to_dict()
+        UserPaginatorQueryParams.model_validate({})
+
+    def _prime_snapshots(self) -> None:
+        assert self._app is not None
+        analytics = self._app.extensions.get("analytics")
+        if analytics is not None:
+            analytics.count_registered_since(dt.now())
+        existence_filter = self._app.extensions.get("existence_filter")
+        if existence_filter is not None:
+            existence_filter.might_exist("username", "")
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Warm-up counters.
+        :return: counters as dict
+        """
+        return {
+            "ready": self.ready,
+            "duration_seconds": self.duration,
+            "runs_total": self.runs_total,
+            "failures_total": self.failures_total,
+            "last_error": self.last_error,
+        }
@@ -1,4 +1,24 @@
 from .string_validators import validate_domain
+from .single_flight import SingleFlight
+from .bloom_filter import BloomFilter
+from .request_validation import validate_request
+from .content_negotiation import (
+    Codec,
+    epoch_seconds,
+    request_codec,
+    respond,
+    response_codec,
+)
 
 
-__all__ = ("validate_domain",)
+__all__ = (
+    "validate_domain",
+    "SingleFlight",
+    "BloomFilter",
+    "validate_request",
+    "Codec",
+    "epoch_seconds",
+    "request_codec",
+    "respond",
+    "response_codec",
+)
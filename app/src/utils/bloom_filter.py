@@ -0,0 +1,68 @@
+import hashlib
+import math
+import threading
+from typing import Iterator
+
+
+class BloomFilter:
+    """
+    Bloom filter of strings.
+
+    Item not added is reported as present with probability about
+    error rate while number of added items is within capacity, added
+    item is always reported as present. Items can not be removed.
+    Positions of item are derived from one 128-bit BLAKE2 digest
+    by double hashing. Number of bits is rounded up to a power of two,
+    so false positive rate is at most error rate.
+    """
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        """
+        :param capacity: expected number of items
+        :param error_rate: false positive rate at capacity, from 0 to 1
+        """
+        self.capacity = max(capacity, 1)
+        optimal_size = math.ceil(
+            -self.capacity * math.log(error_rate) / math.log(2) ** 2
+        )
+        self._size = 1 << max(optimal_size - 1, 7).bit_length()
+        self._mask = self._size - 1
+        self._hashes = max(1, round(self._size / self.capacity * math.log(2)))
+        self._bits = bytearray((self._size + 7) // 8)
+        # setting of bit is read-modify-write of its byte
+        self._lock = threading.Lock()
+        self.count = 0
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Size of bit array in bytes.
+        """
+        return len(self._bits)
+
+    def _positions(self, item: str) -> Iterator[int]:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        # odd step is coprime with power of two size, so positions
+        # are distinct while there are fewer hashes than bits
+        step = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self._hashes):
+            yield (first + i * step) & self._mask
+
+    def add(self, item: str) -> None:
+        """
+        Add item.
+        :param item: string
+        """
+        positions = list(self._positions(item))
+        with self._lock:
+            for position in positions:
+                self._bits[position >> 3] |= 1 << (position & 7)
+            self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        return all(
+            bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
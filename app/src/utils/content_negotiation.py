@@ -0,0 +1,115 @@
+import importlib
+from datetime import datetime as dt, UTC
+from types import ModuleType
+from typing import Any, Callable, NamedTuple
+
+from flask import Response, jsonify, make_response, request
+
+
+def _import_optional(name: str) -> ModuleType | None:
+    try:
+        return importlib.import_module(name)
+    except ImportError:  # optional dependency
+        return None
+
+
+msgpack = _import_optional("msgpack")
+cbor2 = _import_optional("cbor2")
+
+"""
+Content negotiation of compact binary formats, MessagePack and CBOR.
+Formats are available if their optional packages are installed,
+JSON stays the default for clients not asking for them.
+"""
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+class Codec(NamedTuple):
+    """
+    Binary format of request and response bodies.
+    """
+
+    media_type: str
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[bytes], Any]
+
+
+CODECS: dict[str, Codec] = {}
+
+if msgpack is not None:
+    CODECS["application/msgpack"] = Codec(
+        media_type="application/msgpack",
+        dumps=msgpack.packb,
+        loads=msgpack.unpackb,
+    )
+    # media type used by many clients before application/msgpack
+    CODECS["application/x-msgpack"] = CODECS["application/msgpack"]
+
+if cbor2 is not None:
+    CODECS["application/cbor"] = Codec(
+        media_type="application/cbor",
+        dumps=cbor2.dumps,
+        loads=cbor2.loads,
+    )
+
+_OFFERED_MEDIA_TYPES = [JSON_MEDIA_TYPE, *CODECS]
+
+
+def epoch_seconds(value: dt) -> int:
+    """
+    Convert datetime to unix time, naive datetime is treated as UTC.
+    :param value: datetime
+    :return: seconds since epoch
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    return int(value.timestamp())
+
+
+def response_codec() -> Codec | None:
+    """
+    Get binary format of response preferred by client.
+    :return: codec or None if response should be JSON
+    """
+    if not CODECS:
+        return None
+    best = request.accept_mimetypes.best_match(_OFFERED_MEDIA_TYPES)
+    return CODECS.get(best or JSON_MEDIA_TYPE)
+
+
+def request_codec() -> Codec | None:
+    """
+    Get binary format of request body from its Content-Type.
+    :return: codec or None if body is not in binary format
+    """
+    return CODECS.get(request.mimetype)
+
+
+def supported_request_media_types() -> list[str]:
+    """
+    Media types accepted for request bodies.
+    :return: list of media types
+    """
+    return _OFFERED_MEDIA_TYPES
+
+
+def respond(payload: Any, status: int, codec: Codec | None) -> Response:
+    """
+    Make response with payload encoded by negotiated format.
+    :param payload: JSON-serializable payload
+    :param status: status code
+    :param codec: binary format or None for JSON
+    :return: response
+    """
+    if codec is None:
+        response = make_response(jsonify(payload), status)
+    else:
+        response = Response(
+            codec.dumps(payload),
+            status=status,
+            mimetype=codec.media_type,
+        )
+    if CODECS:
+        response.vary.add("Accept")
+    return response
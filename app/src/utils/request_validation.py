@@ -0,0 +1,147 @@
+from functools import wraps
+from typing import Any, Callable, TypeVar, get_args, get_origin, Union
+
+from flask import Response, jsonify, make_response, request
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from pydantic_core import ErrorDetails
+
+from app.src.utils.content_negotiation import (
+    Codec,
+    request_codec,
+    supported_request_media_types,
+)
+
+T = TypeVar("T")
+
+
+def _is_list(annotation: Any) -> bool:
+    origin = get_origin(annotation)
+    if origin is list:
+        return True
+    if origin is Union:
+        return any(_is_list(arg) for arg in get_args(annotation))
+    return False
+
+
+def _list_fields(model: type[BaseModel]) -> frozenset[str]:
+    return frozenset(
+        name
+        for name, field in model.model_fields.items()
+        if _is_list(field.annotation)
+    )
+
+
+def _body_errors(exc: ValidationError) -> list[ErrorDetails]:
+    """
+    Get errors of body validation. Input of invalid JSON error
+    is raw request bytes, so it is decoded to be serializable.
+    """
+    errors: list[ErrorDetails] = []
+    for error in exc.errors():
+        if isinstance(error.get("input"), bytes):
+            error = {**error, "input": error["input"].decode(errors="replace")}
+        errors.append(error)
+    return errors
+
+
+class _BodyDecodeError(Exception):
+    pass
+
+
+def _decode(codec: Codec, data: bytes) -> Any:
+    try:
+        return codec.loads(data)
+    except Exception as exc:
+        # decoders raise own exceptions on malformed data
+        raise _BodyDecodeError() from exc
+
+
+def _decode_error(exc: Exception, media_type: str) -> list[dict[str, Any]]:
+    """
+    Get error of binary body decoding in the shape of pydantic errors.
+    """
+    return [
+        {
+            "type": "body_invalid",
+            "loc": [],
+            "msg": f"Invalid {media_type} body: {exc}",
+            "input": "",
+        }
+    ]
+
+
+def validate_request(func: Callable[..., T]) -> Callable[..., T | Response]:
+    """
+    Validate query params and JSON body of request with pydantic models
+    from "query" and "body" annotations of view function.
+
+    Type adapters are built once at decoration time. JSON body is validated
+    from raw request bytes without intermediate dict, MessagePack and CBOR
+    bodies are decoded first if supported. Validation errors
+    are returned in the same shape as flask_pydantic does:
+    {"validation_error": {"query_params": [...], "body_params": [...]}}
+    """
+    query_model = func.__annotations__.get("query")
+    body_model = func.__annotations__.get("body")
+
+    query_adapter = TypeAdapter(query_model) if query_model else None
+    query_list_fields = _list_fields(query_model) if query_model else None
+    body_adapter = TypeAdapter(body_model) if body_model else None
+
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> T | Response:
+        errors: dict[str, Any] = {}
+
+        if query_adapter is not None:
+            query_params: dict[str, Any] = request.args.to_dict()
+            for name in query_list_fields or ():
+                if name in request.args:
+                    query_params[name] = request.args.getlist(name)
+            try:
+                kwargs["query"] = query_adapter.validate_python(query_params)
+            except ValidationError as exc:
+                errors["query_params"] = exc.errors()
+
+        if body_adapter is not None:
+            # JSON, the common case, skips lookup of binary formats
+            codec = None if request.is_json else request_codec()
+            if codec is None and not request.is_json:
+                content_type = request.headers.get("Content-Type", "")
+                supported = " or ".join(
+                    f"'{media_type}'"
+                    for media_type in supported_request_media_types()
+                )
+                return make_response(
+                    jsonify(
+                        {
+                            "detail": f"Unsupported media type "
+                            f"'{content_type.lower()}' in request. "
+                            f"{supported} is required."
+                        }
+                    ),
+                    415,
+                )
+            try:
+                if codec is None:
+                    kwargs["body"] = body_adapter.validate_json(
+                        request.get_data()
+                    )
+                else:
+                    kwargs["body"] = body_adapter.validate_python(
+                        _decode(codec, request.get_data())
+                    )
+            except ValidationError as exc:
+                errors["body_params"] = _body_errors(exc)
+            except _BodyDecodeError as exc:
+                errors["body_params"] = _decode_error(
+                    exc.__cause__ or exc, codec.media_type  # type: ignore
+                )
+
+        if errors:
+            return make_response(
+                jsonify({"validation_error": errors}),
+                400,
+            )
+        return func(*args, **kwargs)
+
+    return wrapper
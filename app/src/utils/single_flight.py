@@ -0,0 +1,160 @@
+import hashlib
+import os
+import pickle
+import threading
+import time
+from typing import Any, Callable, Hashable, TypeVar
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None  # type: ignore[assignment]
+
+T = TypeVar("T")
+
+
+class _Call:
+    """
+    In-flight call shared by concurrent callers with the same key.
+    """
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls into one computation.
+
+    Within a process, callers with the same name and args wait for the
+    first caller and share its result or exception. Callers waiting longer
+    than the timeout of the name stop waiting and compute on their own.
+
+    If lock_dir is set, leaders of different processes additionally
+    serialize on a file lock of key's stripe, and the result is written
+    next to the lock, so processes that waited reuse it for result_ttl
+    seconds. Keys are hashed to a fixed number of stripes, so number of
+    files in lock_dir is bounded whatever keys callers pass; a stripe
+    keeps the result of the last key computed in it only.
+    """
+
+    # number of lock and result files in lock_dir
+    LOCK_STRIPES = 256
+
+    def __init__(
+        self,
+        default_timeout: float = 10.0,
+        timeouts: dict[str, float] | None = None,
+        lock_dir: str | None = None,
+        result_ttl: float = 1.0,
+    ) -> None:
+        self._default_timeout = default_timeout
+        self._timeouts = timeouts or {}
+        self._lock_dir = lock_dir
+        self._result_ttl = result_ttl
+        self._calls: dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+        if lock_dir is not None:
+            if fcntl is None:
+                raise RuntimeError("File locks are not supported on platform")
+            os.makedirs(lock_dir, exist_ok=True)
+
+    def timeout_for(self, name: str) -> float:
+        """
+        Get wait timeout for calls with provided name.
+        :param name: call name
+        :return: timeout in seconds
+        """
+        return self._timeouts.get(name, self._default_timeout)
+
+    def do(
+        self, name: str, args: tuple[Hashable, ...], fn: Callable[[], T]
+    ) -> T:
+        """
+        Execute fn once for all concurrent callers with the same key.
+        :param name: call name, selects timeout
+        :param args: call args, part of key
+        :param fn: computation
+        :return: result of computation
+        """
+        key = (name, args)
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+
+        if not is_leader:
+            if not call.done.wait(self.timeout_for(name)):
+                return fn()
+            if call.error is not None:
+                raise call.error
+            return call.result  # type: ignore[no-any-return]
+
+        try:
+            if self._lock_dir is not None:
+                call.result = self._do_shared(key, fn, self.timeout_for(name))
+            else:
+                call.result = fn()
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def _do_shared(
+        self,
+        key: Hashable,
+        fn: Callable[[], T],
+        timeout: float,
+    ) -> T:
+        """
+        Execute fn once across processes sharing lock directory.
+        :param key: call key
+        :param fn: computation
+        :param timeout: max time to wait for file lock
+        :return: result of computation
+        """
+        assert self._lock_dir is not None
+        digest = hashlib.sha1(repr(key).encode()).digest()
+        stripe = int.from_bytes(digest[:4], "big") % self.LOCK_STRIPES
+        lock_path = os.path.join(self._lock_dir, f"{stripe}.lock")
+        result_path = os.path.join(self._lock_dir, f"{stripe}.result")
+
+        with open(lock_path, "a") as lock_file:
+            deadline = time.monotonic() + timeout
+            while True:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        return fn()
+                    time.sleep(0.005)
+
+            try:
+                try:
+                    age = time.time() - os.path.getmtime(result_path)
+                    if age <= self._result_ttl:
+                        with open(result_path, "rb") as f:
+                            result_digest, cached = pickle.load(f)
+                        # stripe may hold result of another key
+                        if result_digest == digest:
+                            return cached  # type: ignore[no-any-return]
+                except (OSError, pickle.UnpicklingError, EOFError):
+                    pass
+
+                result = fn()
+                tmp_path = f"{result_path}.{os.getpid()}"
+                with open(tmp_path, "wb") as f:
+                    pickle.dump((digest, result), f)
+                os.replace(tmp_path, result_path)
+                return result
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
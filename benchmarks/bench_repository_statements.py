@@ -0,0 +1,96 @@
+"""
+Benchmark of statement construction and compile cost per repository call.
+
+Compares the previous approach (a new ``select(User).filter_by(...)`` per
+call) with the precompiled templates from ``UserRepository``.
+
+Run from the project root:
+    python benchmarks/bench_repository_statements.py
+"""
+
+import sys
+import os
+import timeit
+from typing import Callable
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import Select, create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from app.src.core import metadata
+from app.src.models import User
+from app.src.repositories.users_repository import _SELECT_USER_BY_FIELD
+
+NUMBER = 20_000
+
+
+def build_old() -> Select[tuple[User]]:
+    return select(User).filter_by(**{"id": 1})
+
+
+def build_new() -> Select[tuple[User]]:
+    return _SELECT_USER_BY_FIELD["id"]
+
+
+def report(
+    name: str, func: Callable[[], object], number: int = NUMBER
+) -> float:
+    seconds = timeit.timeit(func, number=number)
+    per_call_us = seconds / number * 1_000_000
+    print(f"{name:<45} {per_call_us:10.2f} us/call")
+    return per_call_us
+
+
+def main() -> None:
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+    dialect = engine.dialect
+
+    with Session(engine) as session:
+        session.execute(
+            insert(User).values(username="johndoe", email="johndoe@google.com")
+        )
+        session.commit()
+
+    print("statement construction")
+    report("  before: select().filter_by(**{...})", build_old)
+    report("  after:  prebuilt template lookup", build_new)
+
+    print("cache key generation")
+    report(
+        "  before: fresh statement", lambda: build_old()._generate_cache_key()
+    )
+    report(
+        "  after:  memoized on template",
+        lambda: build_new()._generate_cache_key(),
+    )
+
+    print("compile (cost paid on every compiled cache miss)")
+    report(
+        "  before: build + compile",
+        lambda: build_old().compile(dialect=dialect),
+        number=NUMBER // 10,
+    )
+    report(
+        "  after:  one-off compile of template",
+        lambda: build_new().compile(dialect=dialect),
+        number=NUMBER // 10,
+    )
+
+    print("end-to-end get_one on in-memory SQLite")
+    with Session(engine) as session:
+        report(
+            "  before",
+            lambda: session.scalars(build_old()).one_or_none(),
+            number=NUMBER // 4,
+        )
+        report(
+            "  after",
+            lambda: session.scalars(build_new(), {"value": 1}).one_or_none(),
+            number=NUMBER // 4,
+        )
+
+
+if __name__ == "__main__":
+    main()
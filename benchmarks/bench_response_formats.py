@@ -0,0 +1,88 @@
+"""
+Benchmark of response formats of "get_all_users" for a page of users.
+
+Compares payload size and encode/decode time of JSON (as produced by
+Flask's JSON provider) with MessagePack and CBOR, where registration date
+is sent as epoch integer instead of ISO string.
+
+Run from the project root (msgpack and cbor2 are optional):
+    python benchmarks/bench_response_formats.py
+"""
+
+import sys
+import os
+import json
+import timeit
+from datetime import datetime as dt, timedelta as td
+from typing import Any, Callable
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+
+from app.src.repositories import UserRecord
+from app.src.utils.content_negotiation import CODECS
+
+PAGE_SIZE = 1000
+NUMBER = 50
+
+
+def make_records() -> list[UserRecord]:
+    started = dt(2025, 1, 1)
+    return [
+        UserRecord(
+            id=i,
+            username=f"user_{i}",
+            email=f"user_{i}@google.com",
+            registration_date=started + td(minutes=i),
+        )
+        for i in range(1, PAGE_SIZE + 1)
+    ]
+
+
+def report(
+    name: str,
+    encode: Callable[[], bytes],
+    decode: Callable[[bytes], Any],
+) -> None:
+    body = encode()
+    encode_ms = timeit.timeit(encode, number=NUMBER) / NUMBER * 1000
+    decode_ms = (
+        timeit.timeit(lambda: decode(body), number=NUMBER) / NUMBER * 1000
+    )
+    print(
+        f"{name:<22} {len(body):>9} bytes "
+        f"{encode_ms:8.2f} ms encode {decode_ms:8.2f} ms decode"
+    )
+
+
+def main() -> None:
+    app = Flask(__name__)
+    records = make_records()
+    print(f"page of {PAGE_SIZE} users, encode includes to_dict()")
+    with app.app_context():
+        report(
+            "application/json",
+            lambda: app.json.dumps(
+                [rec.to_dict() for rec in records]
+            ).encode(),
+            json.loads,
+        )
+    seen = set()
+    for codec in CODECS.values():
+        if codec.media_type in seen:
+            continue
+        seen.add(codec.media_type)
+        report(
+            codec.media_type,
+            lambda codec=codec: codec.dumps(  # type: ignore[misc]
+                [rec.to_dict(epoch_dates=True) for rec in records]
+            ),
+            codec.loads,
+        )
+    if not CODECS:
+        print("install msgpack and cbor2 to compare binary formats")
+
+
+if __name__ == "__main__":
+    main()
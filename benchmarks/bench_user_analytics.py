@@ -0,0 +1,93 @@
+"""
+Benchmark of users stats computed in SQL and from ``UserAnalytics``
+columnar snapshot, as used by stats endpoints.
+
+Requires NumPy. Snapshot load and its memory are measured separately,
+stats are measured on a loaded snapshot.
+
+Run from the project root:
+    python benchmarks/bench_user_analytics.py
+"""
+
+import sys
+import os
+import time
+from datetime import datetime as dt, timedelta as td
+from typing import Callable
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import insert
+
+from app.src.core import db
+from app.src.models import User
+from app.src.repositories import UserRepository
+from app.src.services import UserAnalytics, UserService
+
+TABLE_SIZE = 200_000
+DOMAINS = ("google.com", "mail.ru", "gmail.com", "yandex.ru", "mtuci.ru")
+REPEAT = 20
+
+
+def report(name: str, func: Callable[[], object]) -> None:
+    func()  # warm up
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        func()
+    seconds = (time.perf_counter() - started) / REPEAT
+    print(f"{name:<35} {seconds * 1000:10.3f} ms")
+
+
+def main() -> None:
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        now = dt.now()
+        db.session.execute(
+            insert(User),
+            [
+                {
+                    "username": f"user_{i}" + "x" * (i % 17),
+                    "email": f"user_{i}@{DOMAINS[i % len(DOMAINS)]}",
+                    "registration_date": now - td(minutes=i),
+                }
+                for i in range(TABLE_SIZE)
+            ],
+        )
+        db.session.commit()
+
+        analytics = UserAnalytics(max_bytes=64 * 1024 * 1024, sync_interval=60)
+        started = time.perf_counter()
+        analytics.count_registered_since(now)
+        print(
+            f"load of {TABLE_SIZE} users: "
+            f"{(time.perf_counter() - started) * 1000:.1f} ms, "
+            f"{analytics.nbytes() / 1024:.1f} KiB"
+        )
+
+        sql = UserService(UserRepository(db))
+        snapshot = UserService(UserRepository(db), analytics=analytics)
+        for name, service in (
+            ("before: SQL", sql),
+            ("after:  snapshot", snapshot),
+        ):
+            print(name)
+            report(
+                "  count_registered_last_week",
+                service.count_registered_last_week,
+            )
+            report(
+                "  get_top_5_longest_username",
+                service.get_top_5_longest_username,
+            )
+            report(
+                "  get_proportion_with_domain",
+                lambda: service.get_proportion_with_domain("mail.ru"),
+            )
+
+
+if __name__ == "__main__":
+    main()
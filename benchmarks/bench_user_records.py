@@ -0,0 +1,105 @@
+"""
+Benchmark of ORM and Core read paths of users, as used by "get_all_users".
+
+Compares ORM instances copied into ``UserFromDB`` and then into dicts with
+``UserRecord`` rows fetched on Core level, for a 1000-row page and for a
+full walk of the table. Peak memory is measured with tracemalloc.
+
+Run from the project root:
+    python benchmarks/bench_user_records.py
+"""
+
+import sys
+import os
+import time
+import tracemalloc
+from typing import Any, Callable
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import insert
+
+from app.src.core import db
+from app.src.models import User
+from app.src.repositories import UserRepository
+from app.src.schemas.entities import UserFromDB
+from app.src.schemas.query import UserPaginatorQueryParams
+
+TABLE_SIZE = 50_000
+PAGE = UserPaginatorQueryParams(offset=0, limit=1000)
+WALK_BATCH_SIZE = 1000
+REPEAT = 5
+
+
+def orm_page(repo: UserRepository) -> list[dict[str, Any]]:
+    result = [
+        UserFromDB.model_validate(user).to_dict()
+        for user in repo.get_all(PAGE)
+    ]
+    db.session.expunge_all()
+    return result
+
+
+def core_page(repo: UserRepository) -> list[dict[str, Any]]:
+    return [rec.to_dict() for rec in repo.get_all_records(PAGE)]
+
+
+def orm_walk(repo: UserRepository) -> int:
+    # previous way to walk all users: one query, every row as ORM instance
+    count = 0
+    for user in repo.get_all(UserPaginatorQueryParams(limit=0)):
+        UserFromDB.model_validate(user).to_dict()
+        count += 1
+    db.session.expunge_all()
+    return count
+
+
+def core_walk(repo: UserRepository) -> int:
+    count = 0
+    for rec in repo.iter_records(batch_size=WALK_BATCH_SIZE):
+        rec.to_dict()
+        count += 1
+    return count
+
+
+def report(name: str, func: Callable[[UserRepository], object]) -> None:
+    repo = UserRepository(db)
+    func(repo)  # warm up compiled cache
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        func(repo)
+    seconds = (time.perf_counter() - started) / REPEAT
+
+    tracemalloc.start()
+    func(repo)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<35} {seconds * 1000:10.2f} ms {peak / 1024:12.1f} KiB peak")
+
+
+def main() -> None:
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        db.session.execute(
+            insert(User),
+            [
+                {"username": f"user_{i}", "email": f"user_{i}@google.com"}
+                for i in range(TABLE_SIZE)
+            ],
+        )
+        db.session.commit()
+
+        print(f"page of {PAGE.limit} users")
+        report("  before: ORM + UserFromDB + dict", orm_page)
+        report("  after:  Core records + dict", core_page)
+        print(f"walk of {TABLE_SIZE} users")
+        report("  before: ORM + UserFromDB + dict", orm_walk)
+        report("  after:  Core records in batches", core_walk)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,7 +12,10 @@ from app.config import settings
 from app.src.core import metadata
 
 # import models
-from app.src.models import User
+from app.src.models import User, UserChange, IdempotencyKey, UserJob
+
+# checkpoints of online migrations are not part of models
+from migrations.online import CHECKPOINTS_TABLE
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -29,6 +32,12 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = metadata
 
+
+def include_name(name, type_, parent_names) -> bool:
+    """Exclude tables managed by migration helpers from autogenerate."""
+    return not (type_ == "table" and name == CHECKPOINTS_TABLE)
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -51,6 +60,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_name=include_name,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -73,7 +83,11 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_name=include_name,
+        )
 
         with context.begin_transaction():
             context.run_migrations()
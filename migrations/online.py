@@ -0,0 +1,299 @@
+"""
+Helpers for online migrations of large tables, called from revisions.
+
+Data is backfilled in keyset-ordered batches, each committed separately,
+so no long transaction holds locks of the whole table. Progress of every
+backfill is stored in checkpoint table, an interrupted run resumes after
+the last committed batch. Statements of backfill have to be idempotent,
+a batch can be applied twice if run is interrupted before its checkpoint.
+
+Indexes are created separately from schema changes, concurrently where
+database supports it.
+
+Usage in revision:
+
+    from migrations.online import backfill, create_index_online
+
+    def upgrade() -> None:
+        op.add_column("users", sa.Column("email_domain", sa.String(64)))
+        backfill(
+            "users_email_domain",
+            table="users",
+            values={"email_domain": sa.func.lower(...)},
+        )
+        create_index_online("ix_users_email_domain", "users", ["email_domain"])
+"""
+
+import json
+import logging
+import time
+from typing import Any, Callable, Mapping, Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger("alembic.online")
+
+CHECKPOINTS_TABLE = "online_migration_checkpoints"
+
+_checkpoints = sa.Table(
+    CHECKPOINTS_TABLE,
+    sa.MetaData(),
+    sa.Column("name", sa.String(128), primary_key=True),
+    sa.Column("last_key", sa.Text(), nullable=True),
+    sa.Column("rows_done", sa.BigInteger(), nullable=False),
+    sa.Column("completed", sa.Boolean(), nullable=False),
+    sa.Column("updated_at", sa.Float(), nullable=False),
+)
+
+# apply(connection, lower key exclusive or None, upper key inclusive)
+BatchApply = Callable[[Connection, Any, Any], None]
+
+
+def _get_checkpoint(connection: Connection, name: str) -> sa.Row | None:
+    _checkpoints.create(connection, checkfirst=True)
+    return connection.execute(
+        sa.select(_checkpoints).where(_checkpoints.c.name == name)
+    ).one_or_none()
+
+
+def _save_checkpoint(
+    connection: Connection,
+    name: str,
+    last_key: Any,
+    rows_done: int,
+    completed: bool = False,
+) -> None:
+    values = {
+        "last_key": json.dumps(last_key),
+        "rows_done": rows_done,
+        "completed": completed,
+        "updated_at": time.time(),
+    }
+    updated = connection.execute(
+        sa.update(_checkpoints)
+        .where(_checkpoints.c.name == name)
+        .values(**values)
+    ).rowcount
+    if not updated:
+        connection.execute(sa.insert(_checkpoints).values(name=name, **values))
+
+
+def reset_checkpoint(name: str, connection: Connection | None = None) -> None:
+    """
+    Forget progress of backfill, e.g. in downgrade, so it runs again.
+    :param name: name of backfill
+    :param connection: connection, of current migration by default
+    """
+    connection = connection or op.get_bind()
+    _checkpoints.create(connection, checkfirst=True)
+    connection.execute(
+        sa.delete(_checkpoints).where(_checkpoints.c.name == name)
+    )
+
+
+def backfill(
+    name: str,
+    table: str | sa.Table,
+    values: Mapping[str, Any] | None = None,
+    apply: BatchApply | None = None,
+    key: str = "id",
+    where: sa.ColumnElement[bool] | None = None,
+    batch_size: int = 1000,
+    throttle: float = 0.05,
+    progress_interval: float = 5.0,
+    connection: Connection | None = None,
+) -> int:
+    """
+    Update rows of table in keyset-ordered batches, each in own commit.
+    :param name: unique name of backfill, key of its checkpoint
+    :param table: table name or table object
+    :param values: columns and SQL expressions to set, for simple updates
+    :param apply: function applying one batch, for complex updates;
+    gets connection, lower key (exclusive, None for first batch) and
+    upper key (inclusive) of batch
+    :param key: unique, indexed column batches are ordered by
+    :param where: condition selecting rows to update, e.g. column is null
+    :param batch_size: number of rows per batch
+    :param throttle: pause between batches, in seconds, so replicas and
+    concurrent requests keep up
+    :param progress_interval: how often progress is logged, in seconds
+    :param connection: connection in autocommit mode, by default
+    connection of current migration switched to autocommit
+    :return: number of rows processed by this run
+    """
+    if (values is None) == (apply is None):
+        raise ValueError("Exactly one of values and apply is required")
+    if connection is None:
+        with op.get_context().autocommit_block():
+            return backfill(
+                name,
+                table,
+                values=values,
+                apply=apply,
+                key=key,
+                where=where,
+                batch_size=batch_size,
+                throttle=throttle,
+                progress_interval=progress_interval,
+                connection=op.get_bind(),
+            )
+
+    if isinstance(table, str):
+        table = sa.Table(table, sa.MetaData(), autoload_with=connection)
+    key_column = table.c[key]
+
+    checkpoint = _get_checkpoint(connection, name)
+    if checkpoint is not None and checkpoint.completed:
+        logger.info("Backfill %s is already completed, skipping", name)
+        return 0
+    last_key = json.loads(checkpoint.last_key) if checkpoint else None
+    rows_done = checkpoint.rows_done if checkpoint else 0
+    if last_key is not None:
+        logger.info("Backfill %s resumes after %s=%r", name, key, last_key)
+
+    def after(lower: Any) -> list[sa.ColumnElement[bool]]:
+        conditions = [] if where is None else [where]
+        if lower is not None:
+            conditions.append(key_column > lower)
+        return conditions
+
+    total = rows_done + connection.scalar(
+        sa.select(sa.func.count()).select_from(table).where(*after(last_key))
+    )
+    select_batch = (
+        sa.select(key_column)
+        .order_by(key_column)
+        .limit(sa.bindparam("batch_size"))
+    )
+
+    processed = 0
+    started = last_logged = time.monotonic()
+    while True:
+        keys = connection.scalars(
+            select_batch.where(*after(last_key)),
+            {"batch_size": batch_size},
+        ).all()
+        if not keys:
+            break
+        upper = keys[-1]
+        if apply is not None:
+            apply(connection, last_key, upper)
+        else:
+            connection.execute(
+                sa.update(table)
+                .where(*after(last_key), key_column <= upper)
+                .values(**values)  # type: ignore[arg-type]
+            )
+        last_key = upper
+        rows_done += len(keys)
+        processed += len(keys)
+        _save_checkpoint(connection, name, last_key, rows_done)
+
+        now = time.monotonic()
+        if now - last_logged >= progress_interval:
+            last_logged = now
+            rate = processed / (now - started)
+            eta = (total - rows_done) / rate if rate else 0.0
+            logger.info(
+                "Backfill %s: %s/%s rows (%.1f%%), %.0f rows/s, ETA %.0fs",
+                name,
+                rows_done,
+                total,
+                rows_done / total * 100 if total else 100.0,
+                rate,
+                eta,
+            )
+        if len(keys) < batch_size:
+            break
+        if throttle:
+            time.sleep(throttle)
+
+    _save_checkpoint(connection, name, last_key, rows_done, completed=True)
+    logger.info(
+        "Backfill %s completed: %s rows in %.1fs",
+        name,
+        rows_done,
+        time.monotonic() - started,
+    )
+    return processed
+
+
+def _postgresql_index_is_valid(connection: Connection, name: str) -> bool:
+    # failed CREATE INDEX CONCURRENTLY leaves invalid index behind
+    return bool(
+        connection.scalar(
+            sa.text(
+                "SELECT i.indisvalid FROM pg_index AS i "
+                "JOIN pg_class AS c ON c.oid = i.indexrelid "
+                "WHERE c.relname = :name"
+            ),
+            {"name": name},
+        )
+    )
+
+
+def create_index_online(
+    index_name: str,
+    table_name: str,
+    columns: Sequence[str | sa.ColumnElement[Any]],
+    unique: bool = False,
+    **kw: Any,
+) -> None:
+    """
+    Create index without blocking writes of table where supported.
+    On PostgreSQL index is created CONCURRENTLY outside of transaction,
+    an invalid index left by interrupted run is recreated. On other
+    databases index is created as usual.
+    :param index_name: name of index
+    :param table_name: name of table
+    :param columns: column names or expressions
+    :param unique: create unique index
+    :param kw: dialect-specific arguments of Index
+    """
+    connection = op.get_bind()
+    if connection.dialect.name != "postgresql":
+        op.create_index(index_name, table_name, columns, unique=unique, **kw)
+        return
+    with op.get_context().autocommit_block():
+        exists = connection.scalar(
+            sa.text("SELECT to_regclass(:name) IS NOT NULL"),
+            {"name": index_name},
+        )
+        if exists and not _postgresql_index_is_valid(connection, index_name):
+            logger.info("Recreating invalid index %s", index_name)
+            op.drop_index(
+                index_name,
+                table_name=table_name,
+                postgresql_concurrently=True,
+            )
+            exists = False
+        if not exists:
+            op.create_index(
+                index_name,
+                table_name,
+                columns,
+                unique=unique,
+                postgresql_concurrently=True,
+                **kw,
+            )
+
+
+def drop_index_online(index_name: str, table_name: str) -> None:
+    """
+    Drop index without blocking writes of table where supported.
+    :param index_name: name of index
+    :param table_name: name of table
+    """
+    connection = op.get_bind()
+    if connection.dialect.name != "postgresql":
+        op.drop_index(index_name, table_name=table_name)
+        return
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            index_name,
+            table_name=table_name,
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,32 @@
+"""add_case_insensitive_indexes_to_users
+
+Revision ID: d3a7c9e1f482
+Revises: b5e8f0a3c217
+Create Date: 2026-10-19 19:00:12.418377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.online import create_index_online, drop_index_online
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a7c9e1f482'
+down_revision: Union[str, None] = 'b5e8f0a3c217'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # fails if users differing only in case of username or email exist,
+    # they have to be merged or renamed before upgrade
+    create_index_online('ix_users_username_lower', 'users', [sa.text('lower(username)')], unique=True)
+    create_index_online('ix_users_email_lower', 'users', [sa.text('lower(email)')], unique=True)
+
+
+def downgrade() -> None:
+    drop_index_online('ix_users_email_lower', 'users')
+    drop_index_online('ix_users_username_lower', 'users')
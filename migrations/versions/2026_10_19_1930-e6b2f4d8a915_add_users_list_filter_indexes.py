@@ -0,0 +1,33 @@
+"""add_users_list_filter_indexes
+
+Revision ID: e6b2f4d8a915
+Revises: d3a7c9e1f482
+Create Date: 2026-10-19 19:30:41.902356
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.src.models import EmailDomain
+from migrations.online import create_index_online, drop_index_online
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b2f4d8a915'
+down_revision: Union[str, None] = 'd3a7c9e1f482'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    create_index_online('ix_users_registration_date_id', 'users', ['registration_date', 'id'])
+    # expression is compiled for dialect of migration, the same as in queries
+    create_index_online('ix_users_email_domain_registration_date_id', 'users', [EmailDomain(sa.column('email')), 'registration_date', 'id'])
+
+
+def downgrade() -> None:
+    drop_index_online('ix_users_email_domain_registration_date_id', 'users')
+    drop_index_online('ix_users_registration_date_id', 'users')
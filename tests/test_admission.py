@@ -0,0 +1,98 @@
+import threading
+
+import pytest
+from flask import Flask
+from flask.testing import FlaskClient
+
+from app.src.core import AdaptiveConcurrencyLimiter, AdmissionController
+
+
+class TestAdaptiveConcurrencyLimiter:
+    """Class for testing adaptive concurrency limiter."""
+
+    @pytest.fixture
+    def limiter(self) -> AdaptiveConcurrencyLimiter:
+        return AdaptiveConcurrencyLimiter(
+            initial_limit=2,
+            latency_target=0.1,
+            max_queue=1,
+            queue_timeout=0.01,
+        )
+
+    def test_acquire_up_to_limit(
+        self,
+        limiter: AdaptiveConcurrencyLimiter,
+    ) -> None:
+        """Test requests over limit are rejected after queue timeout."""
+        assert limiter.acquire()
+        assert limiter.acquire()
+        assert not limiter.acquire()
+        stats = limiter.stats()
+        assert stats["in_flight"] == 2
+        assert stats["queued_total"] == 1
+        assert stats["rejected_total"] == 1
+
+    def test_queued_request_admitted_on_release(
+        self,
+        limiter: AdaptiveConcurrencyLimiter,
+    ) -> None:
+        """Test queued request gets slot released by another request."""
+        limiter._queue_timeout = 1
+        limiter.acquire()
+        limiter.acquire()
+        timer = threading.Timer(0.05, limiter.release, args=(0.01,))
+        timer.start()
+        assert limiter.acquire()
+        timer.join()
+        assert limiter.stats()["rejected_total"] == 0
+
+    def test_limit_adapts_to_latency(
+        self,
+        limiter: AdaptiveConcurrencyLimiter,
+    ) -> None:
+        """Test limit increases under target and decreases over it."""
+        for _ in range(10):
+            limiter.acquire()
+            limiter.acquire()
+            limiter.release(0.01)
+            limiter.release(0.01)
+        assert limiter.limit > 2
+
+        for _ in range(50):
+            limiter.acquire()
+            limiter.release(1.0)
+        assert limiter.limit == 1
+
+
+class TestAdmissionControl:
+    """Class for testing admission control of users API."""
+
+    def test_rejects_over_capacity(
+        self,
+        app: Flask,
+        client: FlaskClient,
+    ) -> None:
+        """Test request is rejected with 503 when class budget is used."""
+        controller: AdmissionController = app.extensions["admission"]
+        limiter = controller.limiters["reads"]
+        acquired = [limiter.acquire() for _ in range(limiter.limit)]
+        try:
+            response = client.get("/api/users/100/")
+        finally:
+            for _ in acquired:
+                limiter.release(0.0)
+
+        assert response.status_code == 503
+        assert int(response.headers["Retry-After"]) >= 1
+        # other endpoint classes keep their own budget
+        assert client.get("/api/users/stats/from_last_week").status_code == 200
+
+    def test_metrics_expose_counters(self, client: FlaskClient) -> None:
+        """Test admission counters are exposed by metrics endpoint."""
+        client.get("/api/users/100/")
+        response = client.get("/api/metrics/")
+        assert response.status_code == 200
+        reads = response.json["admission"]["reads"]
+        assert reads["admitted_total"] >= 1
+        assert reads["in_flight"] == 0
+        assert {"queued_total", "rejected_total", "limit"} <= reads.keys()
@@ -1,8 +1,9 @@
+from datetime import datetime as dt, timedelta as td
 from typing import Any
 import pytest
 from flask.testing import FlaskClient
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import delete
+from sqlalchemy import delete, event, text, update
 
 from app.src.models import User
 from tests.conftest import client, users_data
@@ -100,6 +101,233 @@ class TestUserAPI:
         if expected_response_status == 404:
             assert response.json == expected_user_data
 
+    @pytest.mark.parametrize(
+        ("email", "expected_response_status", "expected_username"),
+        (
+            ("johndoe@google.com", 200, "johndoe"),
+            ("JohnDoe@Google.COM", 200, "johndoe"),
+            ("nobody@google.com", 404, None),
+        ),
+    )
+    def test_get_user_by_email(
+        self,
+        client: FlaskClient,
+        email: str,
+        expected_response_status: int,
+        expected_username: str | None,
+    ) -> None:
+        """Test for endpoint "get_user_by_email"."""
+        response = client.get(f"/api/users/by-email/{email}")
+        assert response.status_code == expected_response_status
+        if expected_response_status == 200:
+            assert response.json["username"] == expected_username
+        else:
+            assert response.json == {
+                "error": f"User with email '{email}' not found"
+            }
+
+    @pytest.mark.parametrize(
+        ("name", "expected_response_status", "expected_email"),
+        (
+            ("tony_stark", 200, "tony_stark@mtuci.ru"),
+            ("Tony_STARK", 200, "tony_stark@mtuci.ru"),
+            ("tony", 404, None),
+        ),
+    )
+    def test_get_user_by_username(
+        self,
+        client: FlaskClient,
+        name: str,
+        expected_response_status: int,
+        expected_email: str | None,
+    ) -> None:
+        """Test for endpoint "get_user_by_username"."""
+        response = client.get(f"/api/users/by-username/{name}")
+        assert response.status_code == expected_response_status
+        if expected_response_status == 200:
+            assert response.json["email"] == expected_email
+        else:
+            assert response.json == {
+                "error": f"User with username '{name}' not found"
+            }
+
+    @pytest.mark.parametrize(
+        ("field", "index_name"),
+        (
+            ("username", "ix_users_username_lower"),
+            ("email", "ix_users_email_lower"),
+        ),
+    )
+    def test_lookup_uses_lower_index(
+        self,
+        mock_db: SQLAlchemy,
+        field: str,
+        index_name: str,
+    ) -> None:
+        """Test case-insensitive lookup is served by functional index."""
+        if mock_db.engine.dialect.name != "sqlite":
+            pytest.skip("EXPLAIN QUERY PLAN is SQLite specific")
+        plan = mock_db.session.execute(
+            text(
+                f"EXPLAIN QUERY PLAN SELECT id FROM users "
+                f"WHERE lower({field}) = lower(:value)"
+            ),
+            {"value": "JohnDoe"},
+        ).all()
+        assert index_name in " ".join(row[-1] for row in plan)
+
+    @staticmethod
+    def _spread_registration_dates(mock_db: SQLAlchemy) -> None:
+        """Register users one day after another from 2025-01-01."""
+        for i, user in enumerate(users_data):
+            mock_db.session.execute(
+                update(User)
+                .where(User.username == user["username"])
+                .values(registration_date=dt(2025, 1, 1) + td(days=i))
+            )
+        mock_db.session.commit()
+
+    @pytest.mark.parametrize(
+        ("query", "expected_usernames"),
+        (
+            (
+                "sort=-registration_date",
+                [user["username"] for user in reversed(users_data)],
+            ),
+            (
+                "sort=username",
+                sorted(user["username"] for user in users_data),
+            ),
+            (
+                "sort=-username",
+                sorted(
+                    (user["username"] for user in users_data), reverse=True
+                ),
+            ),
+            ("email_domain=MTUCI.ru&sort=-id", ["marina_sm1", "tony_stark"]),
+            ("username_prefix=D", ["daniel_defau", "dilon_d"]),
+            ("username_prefix=dilon_d", ["dilon_d"]),
+            (
+                "registered_from=2025-01-03&registered_to=2025-01-05",
+                ["petrov_igor", "sergey_ivanov"],
+            ),
+            # 2025-01-02T21:00:00 UTC
+            (
+                "registered_from=2025-01-03T00:00:00%2B03:00&limit=2",
+                ["petrov_igor", "sergey_ivanov"],
+            ),
+            ("email_domain=google.com&username_prefix=s", ["spongebob"]),
+            (
+                "email_domain=google.com&registered_from=2025-01-02"
+                "&sort=-registration_date",
+                ["spongebob"],
+            ),
+        ),
+    )
+    def test_get_all_users_filtered_and_sorted(
+        self,
+        client: FlaskClient,
+        mock_db: SQLAlchemy,
+        query: str,
+        expected_usernames: list[str],
+    ) -> None:
+        """Test sorting and filters of endpoint "get_all_users"."""
+        self._spread_registration_dates(mock_db)
+        limit = "" if "limit=" in query else "&limit=0"
+        response = client.get(f"/api/users/?{query}{limit}")
+        assert response.status_code == 200
+        assert [user["username"] for user in response.json] == (
+            expected_usernames
+        )
+
+    @pytest.mark.parametrize(
+        "query",
+        (
+            "sort=email",
+            "registered_from=2025-01-05&registered_to=2025-01-03",
+            "email_domain=user@gmail.com",
+            "username_prefix=",
+        ),
+    )
+    def test_get_all_users_invalid_filters(
+        self,
+        client: FlaskClient,
+        query: str,
+    ) -> None:
+        """Test invalid sorting and filters are rejected."""
+        response = client.get(f"/api/users/?{query}")
+        assert response.status_code == 400
+        assert response.json["validation_error"]["query_params"]
+
+    @pytest.mark.parametrize(
+        ("query", "index_name"),
+        (
+            (
+                "registered_from=2025-01-03&registered_to=2025-01-05"
+                "&sort=registration_date",
+                "ix_users_registration_date_id",
+            ),
+            (
+                "email_domain=gmail.com",
+                "ix_users_email_domain_registration_date_id",
+            ),
+            (
+                "email_domain=gmail.com&registered_from=2025-01-03"
+                "&sort=-registration_date",
+                "ix_users_email_domain_registration_date_id",
+            ),
+            ("username_prefix=d&sort=username", "ix_users_username_lower"),
+            ("sort=-registration_date", "ix_users_registration_date_id"),
+            ("sort=-username", "ix_users_username_lower"),
+        ),
+    )
+    def test_list_filters_use_indexes(
+        self,
+        client: FlaskClient,
+        mock_db: SQLAlchemy,
+        query: str,
+        index_name: str,
+    ) -> None:
+        """Test filters and sorting of users list never scan the table."""
+        if mock_db.engine.dialect.name != "sqlite":
+            pytest.skip("EXPLAIN QUERY PLAN is SQLite specific")
+        statements: list[tuple[str, Any]] = []
+
+        def capture(conn, cursor, statement, parameters, *args) -> None:  # type: ignore
+            statements.append((statement, parameters))
+
+        event.listen(mock_db.engine, "before_cursor_execute", capture)
+        try:
+            response = client.get(f"/api/users/?{query}")
+        finally:
+            event.remove(mock_db.engine, "before_cursor_execute", capture)
+        assert response.status_code == 200
+        [(statement, parameters)] = statements
+
+        connection = mock_db.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            plan = cursor.fetchall()
+        finally:
+            connection.close()
+        details = [row[-1] for row in plan]
+        assert any(index_name in detail for detail in details), details
+        assert not any(
+            detail.startswith("SCAN users") and "INDEX" not in detail
+            for detail in details
+        ), details
+        if "sort=" in query:
+            # sort key is the order of index, rows are not sorted again
+            assert not any(
+                "TEMP B-TREE" in detail for detail in details
+            ), details
+        if "=" in query.replace("sort=", ""):
+            # filtered queries search the index instead of scanning it
+            assert any(
+                detail.startswith("SEARCH users") for detail in details
+            ), details
+
     @pytest.mark.parametrize(
         (
             "request_body",
@@ -124,6 +352,18 @@ class TestUserAPI:
                     "error": f"User with email 'johndoe@google.com' already exists"
                 },
             ),
+            (
+                {"username": "JohnDoe", "email": "johndoe123@google.com"},
+                409,
+                {"error": f"User with username 'JohnDoe' already exists"},
+            ),
+            (
+                {"username": "johndoe123", "email": "JohnDoe@google.com"},
+                409,
+                {
+                    "error": f"User with email 'JohnDoe@google.com' already exists"
+                },
+            ),
             (
                 {"username": "testuser1", "email": f"{55*"a"}@gmail.com"},
                 400,
@@ -239,6 +479,16 @@ class TestUserAPI:
                 {"username": "spongebob", "email": "tony_stark@mtuci.ru"},
                 409,
             ),
+            (
+                1,
+                {"username": "JohnDoe", "email": "JohnDoe@google.com"},
+                200,
+            ),
+            (
+                2,
+                {"username": "Tony_Stark"},
+                409,
+            ),
             (
                 7,
                 {
@@ -335,3 +585,172 @@ class TestUserAPI:
             assert len(response.json[i]["username"]) >= len(
                 response.json[i + 1]["username"]
             )
+
+    @pytest.mark.parametrize(
+        ("query_string", "expected_response_status", "expected_domains"),
+        (
+            ("?top=2", 200, {"google.com": 2, "mtuci.ru": 2}),
+            (
+                "?domains=Gmail.com&domains=mail.ru&domains=gov.ru",
+                200,
+                {"gmail.com": 1, "mail.ru": 1, "gov.ru": 0},
+            ),
+            ("?domains=mail", 400, None),
+            ("?top=0", 400, None),
+        ),
+    )
+    def test_get_email_domains_distribution(
+        self,
+        client: FlaskClient,
+        query_string: str,
+        expected_response_status: int,
+        expected_domains: dict[str, int] | None,
+    ) -> None:
+        """Test for endpoint "get_email_domains_distribution"."""
+        url = f"/api/users/stats/email_domains{query_string}"
+        response = client.get(url)
+        assert response.status_code == expected_response_status
+        if expected_domains is not None:
+            assert response.json["total"] == len(users_data)
+            assert {
+                item["domain"]: item["count"]
+                for item in response.json["domains"]
+            } == expected_domains
+            for item in response.json["domains"]:
+                assert item["proportion"] == round(
+                    item["count"] / len(users_data), 2
+                )
+
+    @pytest.mark.parametrize(
+        ("query_string", "expected_response_status", "expected_keys"),
+        (
+            (
+                "",
+                200,
+                {"total", "last_days", "top_longest_username", "domains"},
+            ),
+            (
+                "?include=total&include=last_days&days=30",
+                200,
+                {"total", "last_days"},
+            ),
+            ("?include=domains&domains=mail", 400, None),
+            ("?include=unknown", 400, None),
+        ),
+    )
+    def test_get_stats_summary(
+        self,
+        client: FlaskClient,
+        query_string: str,
+        expected_response_status: int,
+        expected_keys: set[str] | None,
+    ) -> None:
+        """Test for endpoint "get_stats_summary"."""
+        url = f"/api/users/stats/summary{query_string}"
+        response = client.get(url)
+        assert response.status_code == expected_response_status
+        if expected_keys is not None:
+            assert set(response.json) == expected_keys
+
+    @pytest.mark.parametrize(
+        ("data", "content_type", "expected_response_status", "expected_key"),
+        (
+            (
+                b'{"username": "tes", ',
+                "application/json",
+                400,
+                "validation_error",
+            ),
+            (b"[]", "application/json", 400, "validation_error"),
+            (b"username=testuser1", "text/plain", 415, "detail"),
+        ),
+    )
+    def test_create_user_malformed_body(
+        self,
+        client: FlaskClient,
+        data: bytes,
+        content_type: str,
+        expected_response_status: int,
+        expected_key: str,
+    ) -> None:
+        """Test for endpoint "create_user" with malformed request body."""
+        response = client.post(
+            "/api/users/", data=data, content_type=content_type
+        )
+        assert response.status_code == expected_response_status
+        assert expected_key in response.json
+
+    @pytest.mark.parametrize(
+        ("method", "url", "body", "expected_statements"),
+        (
+            # conflicts check, insert of user and of change
+            (
+                "post",
+                "/api/users/",
+                {"username": "testuser1", "email": "testuser1@gmail.com"},
+                3,
+            ),
+            # conflicts check, update of user and insert of change
+            ("patch", "/api/users/1/", {"username": "johndoe1"}, 3),
+            # delete of user and insert of change
+            ("delete", "/api/users/1/", None, 2),
+        ),
+    )
+    def test_write_statements(
+        self,
+        client: FlaskClient,
+        mock_db: SQLAlchemy,
+        method: str,
+        url: str,
+        body: dict[str, Any] | None,
+        expected_statements: int,
+    ) -> None:
+        """Test writes return rows with RETURNING, without extra reads."""
+        if not mock_db.engine.dialect.update_returning:
+            pytest.skip("database does not support RETURNING")
+        statements: list[str] = []
+
+        def count(conn, cursor, statement, *args) -> None:  # type: ignore
+            statements.append(statement)
+
+        event.listen(mock_db.engine, "before_cursor_execute", count)
+        try:
+            response = getattr(client, method)(url, json=body)
+        finally:
+            event.remove(mock_db.engine, "before_cursor_execute", count)
+        assert response.status_code in (200, 201)
+        assert len(statements) == expected_statements, statements
+
+    def test_writes_without_returning(
+        self,
+        client: FlaskClient,
+        mock_db: SQLAlchemy,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test fallback path of writes for databases without RETURNING."""
+        dialect = mock_db.engine.dialect
+        for feature in (
+            "insert_returning",
+            "update_returning",
+            "delete_returning",
+        ):
+            monkeypatch.setattr(dialect, feature, False)
+
+        created = client.post(
+            "/api/users/",
+            json={"username": "testuser1", "email": "testuser1@gmail.com"},
+        )
+        assert created.status_code == 201
+        assert created.json["username"] == "testuser1"
+        assert created.json["registration_date"]
+
+        user_id = created.json["id"]
+        updated = client.patch(
+            f"/api/users/{user_id}/", json={"email": "testuser2@gmail.com"}
+        )
+        assert updated.status_code == 200
+        assert updated.json == {**created.json, "email": "testuser2@gmail.com"}
+        assert client.patch("/api/users/112/", json={}).status_code == 404
+
+        assert client.delete(f"/api/users/{user_id}/").status_code == 200
+        assert client.delete(f"/api/users/{user_id}/").status_code == 404
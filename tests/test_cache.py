@@ -0,0 +1,179 @@
+import time
+from pathlib import Path
+
+import pytest
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import delete
+
+from app.main import create_app
+from app.src.models import User, UserChange
+from app.src.repositories import (
+    CacheBackend,
+    MemoryCacheBackend,
+    SQLiteCacheBackend,
+)
+from tests.conftest import MockSettings
+
+
+class TestCacheBackend:
+    """Class for testing cache backends."""
+
+    @pytest.fixture(params=["memory", "sqlite"])
+    def cache(
+        self,
+        request: pytest.FixtureRequest,
+        tmp_path: Path,
+    ) -> CacheBackend:
+        if request.param == "memory":
+            return MemoryCacheBackend(ttl=60, max_entries=100)
+        return SQLiteCacheBackend(
+            path=str(tmp_path / "cache.sqlite3"),
+            ttl=60,
+            max_entries=100,
+        )
+
+    def test_get_or_set(self, cache: CacheBackend) -> None:
+        """Test value is computed once and then served from cache."""
+        calls = []
+
+        def compute() -> dict[str, int]:
+            calls.append(1)
+            return {"count": 5}
+
+        assert cache.get_or_set("key", compute) == {"count": 5}
+        assert cache.get_or_set("key", compute) == {"count": 5}
+        assert len(calls) == 1
+        assert cache.stats()["hits_total"] == 1
+        assert cache.stats()["misses_total"] == 1
+
+    def test_bump_generation_invalidates(self, cache: CacheBackend) -> None:
+        """Test all entries are invalidated by generation bump."""
+        cache.get_or_set("first", lambda: 1)
+        cache.get_or_set("second", lambda: 2)
+
+        assert cache.bump_generation() == 1
+
+        assert cache.get_or_set("first", lambda: 10) == 10
+        assert cache.get_or_set("second", lambda: 20) == 20
+
+    def test_value_computed_before_bump_not_served(
+        self,
+        cache: CacheBackend,
+    ) -> None:
+        """Test value computed concurrently with write is not served."""
+
+        def compute() -> str:
+            # write committed while value is computed
+            cache.bump_generation()
+            return "stale"
+
+        assert cache.get_or_set("key", compute) == "stale"
+        assert cache.get_or_set("key", lambda: "fresh") == "fresh"
+
+    def test_ttl(self, tmp_path: Path) -> None:
+        """Test expired entries are not served."""
+        caches = [
+            MemoryCacheBackend(ttl=0.05, max_entries=100),
+            SQLiteCacheBackend(
+                path=str(tmp_path / "cache.sqlite3"),
+                ttl=0.05,
+                max_entries=100,
+            ),
+        ]
+        for cache in caches:
+            cache.get_or_set("key", lambda: "old")
+        time.sleep(0.1)
+        for cache in caches:
+            assert cache.get_or_set("key", lambda: "new") == "new"
+
+    def test_memory_max_entries(self) -> None:
+        """Test least recently used entries are evicted."""
+        cache = MemoryCacheBackend(ttl=60, max_entries=2)
+        cache.get_or_set("first", lambda: 1)
+        cache.get_or_set("second", lambda: 2)
+        cache.get_or_set("first", lambda: 1)
+        cache.get_or_set("third", lambda: 3)
+
+        assert cache.get_or_set("first", lambda: -1) == 1
+        assert cache.get_or_set("second", lambda: -2) == -2
+
+    def test_sqlite_shared_between_instances(self, tmp_path: Path) -> None:
+        """Test workers on node share entries and invalidations."""
+        path = str(tmp_path / "cache.sqlite3")
+        worker_1 = SQLiteCacheBackend(path=path, ttl=60, max_entries=100)
+        worker_2 = SQLiteCacheBackend(path=path, ttl=60, max_entries=100)
+
+        worker_1.get_or_set("key", lambda: "value")
+        assert worker_2.get_or_set("key", lambda: "other") == "value"
+
+        worker_2.bump_generation()
+        assert worker_1.generation() == 1
+        assert worker_1.get_or_set("key", lambda: "new") == "new"
+
+
+@pytest.mark.usefixtures("app", "mock_db")
+class TestCachedEndpoints:
+    """Class for testing endpoints with cache enabled."""
+
+    @pytest.fixture(autouse=True, scope='function')
+    def _setup(self, mock_db: SQLAlchemy) -> None:
+        """Setup fixture."""
+        yield
+        mock_db.session.execute(delete(User))
+        mock_db.session.execute(delete(UserChange))
+        mock_db.session.commit()
+
+    @pytest.fixture(params=["memory", "sqlite"])
+    def cached_app(
+        self,
+        request: pytest.FixtureRequest,
+        app_settings: MockSettings,
+        tmp_path: Path,
+    ) -> Flask:
+        settings = app_settings.model_copy(
+            update={
+                "CACHE_ENABLED": True,
+                "CACHE_STORE": request.param,
+                "CACHE_PATH": str(tmp_path / "cache.sqlite3"),
+            }
+        )
+        return create_app(settings)
+
+    def test_get_user_invalidated_by_write(self, cached_app: Flask) -> None:
+        """Test cached user is invalidated by update."""
+        client = cached_app.test_client()
+        cache = cached_app.extensions["cache"]
+        user_id = client.post(
+            "/api/users/",
+            json={"username": "johndoe", "email": "johndoe@google.com"},
+        ).json["id"]
+
+        assert client.get(f"/api/users/{user_id}/").json["username"] == (
+            "johndoe"
+        )
+        assert client.get(f"/api/users/{user_id}/").status_code == 200
+        assert cache.stats()["hits_total"] == 1
+
+        client.patch(f"/api/users/{user_id}/", json={"username": "janedoe"})
+
+        assert client.get(f"/api/users/{user_id}/").json["username"] == (
+            "janedoe"
+        )
+        client.delete(f"/api/users/{user_id}/")
+        assert client.get(f"/api/users/{user_id}/").status_code == 404
+
+    def test_stats_invalidated_by_write(self, cached_app: Flask) -> None:
+        """Test cached stats are invalidated by create."""
+        client = cached_app.test_client()
+        url = "/api/users/stats/summary?include=total"
+        assert client.get(url).json == {"total": 0}
+        assert client.get(url).json == {"total": 0}
+
+        client.post(
+            "/api/users/",
+            json={"username": "johndoe", "email": "johndoe@google.com"},
+        )
+
+        assert client.get(url).json == {"total": 1}
+        assert cached_app.extensions["cache"].stats()["hits_total"] == 1
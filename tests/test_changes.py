@@ -0,0 +1,102 @@
+from flask import Flask
+from flask.testing import FlaskClient
+from flask_sqlalchemy import SQLAlchemy
+import pytest
+from sqlalchemy import delete
+
+from app.src.models import User, UserChange
+
+
+@pytest.mark.usefixtures("client", "mock_db")
+class TestUserChanges:
+    """Class for testing change feed of users."""
+
+    @pytest.fixture(autouse=True, scope='function')
+    def _setup(self, mock_db: SQLAlchemy) -> None:
+        """Setup fixture."""
+        mock_db.session.execute(delete(UserChange))
+        mock_db.session.commit()
+        yield
+        mock_db.session.execute(delete(User))
+        mock_db.session.execute(delete(UserChange))
+        mock_db.session.commit()
+
+    def _make_changes(self, client: FlaskClient) -> tuple[int, int]:
+        first = client.post(
+            "/api/users/",
+            json={"username": "johndoe", "email": "johndoe@google.com"},
+        ).json["id"]
+        second = client.post(
+            "/api/users/",
+            json={"username": "spongebob", "email": "spongebob@google.com"},
+        ).json["id"]
+        client.patch(f"/api/users/{first}/", json={"username": "johndoe1"})
+        client.delete(f"/api/users/{second}/")
+        return first, second
+
+    def test_get_user_changes(self, client: FlaskClient) -> None:
+        """Test for endpoint "get_user_changes"."""
+        first, second = self._make_changes(client)
+
+        response = client.get("/api/users/changes?since=0")
+        assert response.status_code == 200
+        changes = response.json["changes"]
+        assert [(c["operation"], c["user_id"]) for c in changes] == [
+            ("insert", first),
+            ("insert", second),
+            ("update", first),
+            ("delete", second),
+        ]
+        seqs = [c["seq"] for c in changes]
+        assert seqs == sorted(seqs)
+        assert response.json["first_seq"] == seqs[0]
+        assert response.json["next_since"] == seqs[-1]
+        assert changes[0]["user"]["username"] == "johndoe1"
+        assert changes[1]["user"] is None
+        assert changes[3]["user"] is None
+
+    def test_empty_update_not_recorded(self, client: FlaskClient) -> None:
+        """Test PATCH without fields does not add change to feed."""
+        user_id = client.post(
+            "/api/users/",
+            json={"username": "johndoe", "email": "johndoe@google.com"},
+        ).json["id"]
+
+        response = client.patch(f"/api/users/{user_id}/", json={})
+        assert response.status_code == 200
+        assert response.json["username"] == "johndoe"
+
+        response = client.get("/api/users/changes?since=0")
+        changes = response.json["changes"]
+        assert [(c["operation"], c["user_id"]) for c in changes] == [
+            ("insert", user_id),
+        ]
+
+    def test_get_user_changes_paginated(self, client: FlaskClient) -> None:
+        """Test consumer reads change feed page by page."""
+        self._make_changes(client)
+
+        since, operations = 0, []
+        while True:
+            response = client.get(f"/api/users/changes?since={since}&limit=3")
+            page = response.json["changes"]
+            if not page:
+                break
+            operations.extend(c["operation"] for c in page)
+            since = response.json["next_since"]
+
+        assert operations == ["insert", "insert", "update", "delete"]
+
+    def test_compact_changes(self, app: Flask, client: FlaskClient) -> None:
+        """Test CLI command compacting change log."""
+        self._make_changes(client)
+        runner = app.test_cli_runner()
+
+        result = runner.invoke(args=["compact-changes", "--keep-days", "1"])
+        assert "Deleted 0 changes" in result.output
+
+        result = runner.invoke(args=["compact-changes", "--keep-days", "0"])
+        assert "Deleted 4 changes" in result.output
+        response = client.get("/api/users/changes")
+        assert response.json["changes"] == []
+        assert response.json["first_seq"] is None
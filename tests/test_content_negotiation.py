@@ -0,0 +1,146 @@
+from datetime import datetime as dt, UTC
+from typing import Any, Callable
+
+import pytest
+from flask.testing import FlaskClient
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import delete
+
+from app.src.models import User
+from tests.conftest import users_data
+
+
+def _codec(media_type: str) -> tuple[str, Callable, Callable]:
+    if media_type == "application/msgpack":
+        msgpack = pytest.importorskip("msgpack")
+        return media_type, msgpack.packb, msgpack.unpackb
+    cbor2 = pytest.importorskip("cbor2")
+    return media_type, cbor2.dumps, cbor2.loads
+
+
+def _epoch(iso: str) -> int:
+    return int(dt.fromisoformat(iso).replace(tzinfo=UTC).timestamp())
+
+
+@pytest.mark.usefixtures("client", "mock_db")
+class TestContentNegotiation:
+    """Class for testing binary formats of users API."""
+
+    @pytest.fixture(autouse=True, scope='function')
+    def _setup(self, mock_db: SQLAlchemy) -> None:
+        """Setup fixture."""
+        mock_db.session.add_all([User(**user) for user in users_data])
+        mock_db.session.commit()
+        yield
+        mock_db.session.execute(delete(User))
+        mock_db.session.commit()
+
+    @pytest.fixture(params=["application/msgpack", "application/cbor"])
+    def codec(self, request: pytest.FixtureRequest) -> tuple[Any, ...]:
+        return _codec(request.param)
+
+    @pytest.mark.parametrize(
+        "url",
+        [
+            "/api/users/?limit=0",
+            "/api/users/1/",
+            "/api/users/by-email/johndoe@google.com",
+            "/api/users/stats/top_longest_username",
+        ],
+    )
+    def test_read_endpoints(
+        self,
+        client: FlaskClient,
+        codec: tuple[Any, ...],
+        url: str,
+    ) -> None:
+        """Test payload is the same as JSON one with epoch dates."""
+        media_type, _, loads = codec
+        expected = client.get(url).json
+        rows = expected if isinstance(expected, list) else [expected]
+        for row in rows:
+            row["registration_date"] = _epoch(row["registration_date"])
+
+        response = client.get(url, headers={"Accept": media_type})
+
+        assert response.status_code == 200
+        assert response.mimetype == media_type
+        assert "Accept" in response.headers["Vary"]
+        assert loads(response.data) == expected
+
+    @pytest.mark.parametrize(
+        ("accept", "expected_mimetype"),
+        [
+            (None, "application/json"),
+            ("*/*", "application/json"),
+            ("application/json", "application/json"),
+            ("text/html", "application/json"),
+            ("application/json;q=0.5, application/msgpack", None),
+        ],
+    )
+    def test_json_is_default(
+        self,
+        client: FlaskClient,
+        accept: str | None,
+        expected_mimetype: str | None,
+    ) -> None:
+        """Test JSON is returned unless binary format is preferred."""
+        media_type, _, _ = _codec("application/msgpack")
+        headers = {"Accept": accept} if accept else {}
+
+        response = client.get("/api/users/", headers=headers)
+
+        assert response.mimetype == (expected_mimetype or media_type)
+
+    def test_write_body(
+        self,
+        client: FlaskClient,
+        codec: tuple[Any, ...],
+    ) -> None:
+        """Test write endpoints accept binary bodies."""
+        media_type, dumps, loads = codec
+        headers = {"Content-Type": media_type, "Accept": media_type}
+
+        created = client.post(
+            "/api/users/",
+            data=dumps({"username": "testuser1", "email": "test1@gmail.com"}),
+            headers=headers,
+        )
+        assert created.status_code == 201
+        user = loads(created.data)
+        assert user["username"] == "testuser1"
+        assert isinstance(user["registration_date"], int)
+
+        updated = client.patch(
+            f"/api/users/{user['id']}/",
+            data=dumps({"username": "testuser2"}),
+            headers=headers,
+        )
+        assert updated.status_code == 200
+        assert loads(updated.data) == {**user, "username": "testuser2"}
+
+    def test_write_body_invalid(
+        self,
+        client: FlaskClient,
+        codec: tuple[Any, ...],
+    ) -> None:
+        """Test malformed and invalid binary bodies are rejected."""
+        media_type, dumps, _ = codec
+
+        malformed = client.post(
+            "/api/users/",
+            data=b"\xc1\xff",
+            headers={"Content-Type": media_type},
+        )
+        assert malformed.status_code == 400
+        error = malformed.json["validation_error"]["body_params"][0]
+        assert error["type"] == "body_invalid"
+
+        invalid = client.post(
+            "/api/users/",
+            data=dumps({"username": "te", "email": "test1@gmail.com"}),
+            headers={"Content-Type": media_type},
+        )
+        assert invalid.status_code == 400
+        error = invalid.json["validation_error"]["body_params"][0]
+        assert error["loc"] == ["username"]
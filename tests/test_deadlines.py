@@ -0,0 +1,127 @@
+import time
+from typing import Any
+
+import pytest
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import delete, text
+
+from app.main import create_app
+from app.src.core import DEADLINE_HEADER, RequestDeadlines, db
+from app.src.exceptions import DeadlineExceededException
+from app.src.models import User
+from tests.conftest import MockSettings, users_data
+
+# counts to 10^9, takes far longer than any budget in tests
+_SLOW_QUERY = text(
+    "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n "
+    "WHERE i < 1000000000) SELECT count(*) FROM n"
+)
+
+
+@pytest.mark.usefixtures("app", "mock_db")
+class TestRequestDeadlines:
+    """Class for testing deadlines of requests enforced by database."""
+
+    @pytest.fixture(autouse=True, scope='function')
+    def _setup(self, mock_db: SQLAlchemy) -> None:
+        """Setup fixture."""
+        users = [User(**user) for user in users_data]
+        mock_db.session.add_all(users)
+        mock_db.session.commit()
+        yield
+        mock_db.session.execute(delete(User))
+        mock_db.session.commit()
+
+    @staticmethod
+    def _make_app(app_settings: MockSettings, **overrides: Any) -> Flask:
+        settings = app_settings.model_copy(
+            update={"DEADLINES_ENABLED": True, **overrides}
+        )
+        return create_app(settings)
+
+    def test_within_deadline(self, app_settings: MockSettings) -> None:
+        """Test requests within budget are served as usual."""
+        _app = self._make_app(app_settings)
+        client = _app.test_client()
+        response = client.get("/api/users/by-username/johndoe")
+        assert response.status_code == 200
+        response = client.get(
+            "/api/users/stats/with_email_domain/google.com",
+            headers={DEADLINE_HEADER: "5"},
+        )
+        assert response.status_code == 200
+        # endpoints out of users API have no deadline
+        response = client.get("/healthz", headers={DEADLINE_HEADER: "0"})
+        assert response.status_code == 200
+
+        stats = client.get("/api/metrics/").json["deadlines"]
+        assert stats["requests_total"] == 2
+        assert stats["from_header_total"] == 1
+        assert stats["exceeded_total"] == 0
+        assert stats["budgets"]["stats"] == 10.0
+
+    def test_deadline_exceeded(self, app_settings: MockSettings) -> None:
+        """Test statements past deadline are interrupted with status 504
+        and their connections are returned to pool."""
+        _app = self._make_app(
+            app_settings,
+            DEADLINE_ROUTE_BUDGETS={"get_users_with_email_domain": 1e-6},
+        )
+        client = _app.test_client()
+        response = client.get("/api/users/stats/with_email_domain/mail.ru")
+        assert response.status_code == 504
+        assert "deadline" in response.json["error"]
+        response = client.get(
+            "/api/users/by-username/johndoe",
+            headers={DEADLINE_HEADER: "0.000001"},
+        )
+        assert response.status_code == 504
+        # expired deadline is rejected before any query
+        response = client.get(
+            "/api/users/by-username/johndoe", headers={DEADLINE_HEADER: "0"}
+        )
+        assert response.status_code == 504
+        # the same pooled connection serves requests without deadline
+        response = client.get("/api/users/by-username/johndoe")
+        assert response.status_code == 200
+
+        stats = client.get("/api/metrics/").json["deadlines"]
+        assert stats["exceeded_total"] == 3
+        assert stats["exceeded_by_endpoint"] == {
+            "get_users_with_email_domain": 1,
+            "get_user_by_username": 2,
+        }
+        with _app.app_context():
+            assert db.engine.pool.checkedout() == 0
+
+    def test_long_statement_interrupted(
+        self,
+        app_settings: MockSettings,
+        mock_db: SQLAlchemy,
+    ) -> None:
+        """Test running statement is interrupted at deadline."""
+        _app = self._make_app(app_settings, DEADLINE_BUDGETS={"reads": 0.05})
+        with _app.test_request_context("/api/users/by-username/johndoe"):
+            assert _app.preprocess_request() is None
+            started = time.monotonic()
+            with pytest.raises(DeadlineExceededException) as exc_info:
+                mock_db.session.execute(_SLOW_QUERY)
+            assert time.monotonic() - started < 1.0
+            assert exc_info.value.budget == 0.05
+            mock_db.session.rollback()
+
+    @pytest.mark.parametrize("value", ["soon", "nan", "inf", ""])
+    def test_invalid_header(
+        self,
+        app_settings: MockSettings,
+        value: str,
+    ) -> None:
+        """Test invalid deadline header is rejected."""
+        _app = self._make_app(app_settings)
+        response = _app.test_client().get(
+            "/api/users/by-username/johndoe", headers={DEADLINE_HEADER: value}
+        )
+        assert response.status_code == 400
+        deadlines: RequestDeadlines = _app.extensions["deadlines"]
+        assert deadlines.stats()["invalid_header_total"] == 1
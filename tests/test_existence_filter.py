@@ -0,0 +1,181 @@
+from typing import Any, Generator
+
+import pytest
+from flask import Flask
+from flask.testing import FlaskClient
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import delete, event
+
+from app.main import create_app
+from app.src.models import User, UserChange
+from app.src.repositories import UserExistenceFilter, UserRepository
+from app.src.schemas.entities import UserCreate
+from tests.conftest import MockSettings, users_data
+
+
+@pytest.mark.usefixtures("app", "mock_db")
+class TestUserExistenceFilter:
+    """Class for testing filter of taken usernames and emails."""
+
+    @pytest.fixture(autouse=True, scope='function')
+    def _setup(self, mock_db: SQLAlchemy) -> None:
+        """Setup fixture."""
+        users = [User(**user) for user in users_data]
+        mock_db.session.add_all(users)
+        mock_db.session.commit()
+        yield
+        mock_db.session.execute(delete(User))
+        mock_db.session.execute(delete(UserChange))
+        mock_db.session.commit()
+
+    @staticmethod
+    def _make_app(app_settings: MockSettings, **overrides: Any) -> Flask:
+        settings = app_settings.model_copy(
+            update={
+                "EXISTENCE_FILTER_ENABLED": True,
+                "EXISTENCE_FILTER_SYNC_INTERVAL": 60.0,
+                **overrides,
+            }
+        )
+        return create_app(settings)
+
+    @pytest.fixture
+    def filter_app(
+        self,
+        app_settings: MockSettings,
+    ) -> Generator[Flask, None, None]:
+        _app = self._make_app(app_settings)
+        with _app.app_context():
+            yield _app
+
+    @staticmethod
+    def _statements(
+        mock_db: SQLAlchemy,
+        client: FlaskClient,
+        method: str,
+        url: str,
+        **kwargs: Any,
+    ) -> tuple[Any, list[str]]:
+        statements: list[str] = []
+
+        def capture(conn, cursor, statement, *args) -> None:  # type: ignore
+            statements.append(statement)
+
+        event.listen(mock_db.engine, "before_cursor_execute", capture)
+        try:
+            response = getattr(client, method)(url, **kwargs)
+        finally:
+            event.remove(mock_db.engine, "before_cursor_execute", capture)
+        return response, statements
+
+    def test_create_skips_conflict_check(
+        self,
+        filter_app: Flask,
+        mock_db: SQLAlchemy,
+    ) -> None:
+        """Test new values are written without conflict query,
+        taken ones are still rejected."""
+        client = filter_app.test_client()
+        existence_filter: UserExistenceFilter = filter_app.extensions[
+            "existence_filter"
+        ]
+        # first use builds filter
+        assert client.get("/api/users/availability?username=nobody").json == {
+            "username": {"value": "nobody", "available": True}
+        }
+        assert existence_filter.stats()["builds_total"] == 1
+
+        response, statements = self._statements(
+            mock_db,
+            client,
+            "post",
+            "/api/users/",
+            json={"username": "newcomer", "email": "newcomer@gov.ru"},
+        )
+        assert response.status_code == 201
+        assert not any(
+            statement.lstrip().startswith("SELECT") for statement in statements
+        ), statements
+
+        for body, field in (
+            ({"username": "NewComer", "email": "other@gov.ru"}, "username"),
+            ({"username": "other", "email": "NEWCOMER@gov.ru"}, "email"),
+        ):
+            response = client.post("/api/users/", json=body)
+            assert response.status_code == 409
+            assert field in response.json["error"]
+        stats = existence_filter.stats()
+        assert stats["negatives_total"] >= 3
+        assert stats["values"] == 2 * (len(users_data) + 1)
+
+    def test_write_of_other_worker(
+        self,
+        filter_app: Flask,
+        mock_db: SQLAlchemy,
+    ) -> None:
+        """Test value taken by another worker and not in filter yet
+        is rejected by unique index as conflict."""
+        client = filter_app.test_client()
+        client.get("/api/users/availability?email=a@gov.ru")
+        # another worker, write is not applied to filter until sync
+        UserRepository(mock_db).create(
+            UserCreate(username="newcomer", email="newcomer@gov.ru")
+        )
+        assert client.get("/api/users/availability?username=newcomer").json[
+            "username"
+        ]["available"]
+
+        response = client.post(
+            "/api/users/", json={"username": "NEWCOMER", "email": "x@gov.ru"}
+        )
+        assert response.status_code == 409
+        assert "username" in response.json["error"]
+        # savepoint was rolled back, session is usable
+        response = client.post(
+            "/api/users/", json={"username": "another", "email": "y@gov.ru"}
+        )
+        assert response.status_code == 201
+        response = client.patch(
+            f"/api/users/{response.json['id']}/",
+            json={"email": "Newcomer@gov.ru"},
+        )
+        assert response.status_code == 409
+        assert "email" in response.json["error"]
+
+    def test_availability(
+        self,
+        filter_app: Flask,
+        mock_db: SQLAlchemy,
+    ) -> None:
+        """Test availability is answered from filter, hits by query."""
+        client = filter_app.test_client()
+        response = client.get(
+            "/api/users/availability?username=JohnDoe&email=free@gov.ru"
+        )
+        assert response.status_code == 200
+        assert response.json == {
+            "username": {"value": "JohnDoe", "available": False},
+            "email": {"value": "free@gov.ru", "available": True},
+        }
+
+        response, statements = self._statements(
+            mock_db,
+            client,
+            "get",
+            "/api/users/availability?username=free_name",
+        )
+        assert response.json["username"]["available"]
+        assert statements == []
+
+    @pytest.mark.parametrize(
+        "query_string",
+        ("", "?username=ab", "?email=not-email", "?user=johndoe"),
+    )
+    def test_availability_invalid(
+        self,
+        client: FlaskClient,
+        query_string: str,
+    ) -> None:
+        """Test invalid availability queries are rejected."""
+        response = client.get(f"/api/users/availability{query_string}")
+        assert response.status_code == 400
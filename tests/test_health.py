@@ -0,0 +1,107 @@
+from pathlib import Path
+from typing import Any
+
+import pytest
+from flask import Flask
+from flask.testing import FlaskClient
+from sqlalchemy import event
+
+from app.main import create_app
+from app.src.core import db
+from app.src.services import AppWarmup
+from tests.conftest import MockSettings
+
+
+@pytest.mark.usefixtures("app")
+class TestHealth:
+    """Class for testing warm-up and health check endpoints."""
+
+    @staticmethod
+    def _make_app(app_settings: MockSettings, **overrides: str) -> Flask:
+        settings = app_settings.model_copy(
+            update={"WARMUP_ENABLED": True, **overrides}
+        )
+        return create_app(settings)
+
+    def test_without_warmup(self, client: FlaskClient) -> None:
+        """Test probes of application without warm-up."""
+        response = client.get("/healthz")
+        assert response.status_code == 200
+        assert response.json == {"status": "ok"}
+        response = client.get("/readyz")
+        assert response.status_code == 200
+        assert response.json == {"status": "ready"}
+
+    def test_warmup(self, app_settings: MockSettings) -> None:
+        """Test warm-up in create_app opens pool and makes process ready."""
+        _app = self._make_app(app_settings)
+        warmup: AppWarmup = _app.extensions["warmup"]
+        assert warmup.ready
+        assert _app.test_client().get("/readyz").status_code == 200
+
+        stats = _app.test_client().get("/api/metrics/").json["warmup"]
+        assert stats["runs_total"] == 1
+        assert stats["failures_total"] == 0
+        assert stats["duration_seconds"] > 0
+        with _app.app_context():
+            pool = db.engine.pool
+            assert pool.checkedin() == pool.size()
+            engine = db.engine
+
+        # statements of first write are taken from compiled cache
+        cache_hits: dict[str, bool] = {}
+
+        def record_cache_hit(*args: Any) -> None:
+            context = args[4]
+            statement = " ".join(context.statement.split()[:3])
+            cache_hits[statement] = (
+                context.cache_hit == context.dialect.CACHE_HIT
+            )
+
+        event.listen(engine, "after_cursor_execute", record_cache_hit)
+        try:
+            client = _app.test_client()
+            created = client.post(
+                "/api/users/",
+                json={"username": "warm_user", "email": "warm@google.com"},
+            )
+            assert created.status_code == 201
+            response = client.patch(
+                f"/api/users/{created.json['id']}/",
+                json={"username": "warmer_user"},
+            )
+            assert response.status_code == 200
+            response = client.delete(f"/api/users/{created.json['id']}/")
+            assert response.status_code == 200
+        finally:
+            event.remove(engine, "after_cursor_execute", record_cache_hit)
+        assert cache_hits["INSERT INTO users"]
+        assert cache_hits["UPDATE users SET"]
+        assert cache_hits["DELETE FROM users"]
+
+    def test_failed_warmup(
+        self,
+        app_settings: MockSettings,
+        tmp_path: Path,
+    ) -> None:
+        """Test process is not ready until retried warm-up succeeds."""
+        _app = self._make_app(
+            app_settings, DB_URL=f"sqlite:///{tmp_path / 'empty.db'}"
+        )
+        warmup: AppWarmup = _app.extensions["warmup"]
+        client = _app.test_client()
+        assert not warmup.ready
+        assert warmup.last_error is not None
+        assert client.get("/healthz").status_code == 200
+        response = client.get("/readyz")
+        assert response.status_code == 503
+        assert response.json["status"] == "not ready"
+
+        with _app.app_context():
+            db.create_all()
+        assert client.get("/readyz").status_code == 200
+        assert warmup.ready
+        assert warmup.stats()["failures_total"] == 2
+        assert warmup.stats()["last_error"] is None
+        with _app.app_context():
+            db.engine.dispose()
@@ -0,0 +1,119 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import pytest
+from flask import Flask
+from flask.testing import FlaskClient
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import delete, func, select
+
+from app.src.exceptions import (
+    IdempotencyKeyReusedException,
+    IdempotencyKeyInProgressException,
+)
+from app.src.models import IdempotencyKey, User
+from app.src.repositories import (
+    StoredResponse,
+    IdempotencyStore,
+    MemoryIdempotencyStore,
+    DatabaseIdempotencyStore,
+)
+
+
+@pytest.mark.usefixtures("client", "mock_db")
+class TestIdempotency:
+    """Class for testing Idempotency-Key support of write endpoints."""
+
+    @pytest.fixture(autouse=True, scope='function')
+    def _setup(self, mock_db: SQLAlchemy) -> None:
+        """Setup fixture."""
+        yield
+        mock_db.session.execute(delete(User))
+        mock_db.session.execute(delete(IdempotencyKey))
+        mock_db.session.commit()
+
+    @pytest.fixture(params=["memory", "database"])
+    def store(
+        self,
+        request: pytest.FixtureRequest,
+        mock_db: SQLAlchemy,
+    ) -> IdempotencyStore:
+        kwargs: dict[str, Any] = dict(ttl=60, lock_ttl=60, wait_timeout=1)
+        if request.param == "memory":
+            return MemoryIdempotencyStore(**kwargs)
+        return DatabaseIdempotencyStore(db=mock_db, **kwargs)
+
+    def test_retry_replays_response(
+        self,
+        client: FlaskClient,
+        mock_db: SQLAlchemy,
+    ) -> None:
+        """Test retry with the same key replays stored response."""
+        body = {"username": "testuser1", "email": "testuser1@gmail.com"}
+        headers = {"Idempotency-Key": "create-testuser1"}
+
+        first = client.post("/api/users/", json=body, headers=headers)
+        retry = client.post("/api/users/", json=body, headers=headers)
+
+        assert first.status_code == retry.status_code == 201
+        assert retry.json == first.json
+        assert retry.headers["Idempotent-Replayed"] == "true"
+        assert mock_db.session.scalar(select(func.count(User.id))) == 1
+
+    def test_key_reused_with_different_request(
+        self,
+        client: FlaskClient,
+    ) -> None:
+        """Test key reused with different body is rejected."""
+        headers = {"Idempotency-Key": "create-user"}
+        client.post(
+            "/api/users/",
+            json={"username": "testuser1", "email": "testuser1@gmail.com"},
+            headers=headers,
+        )
+        response = client.post(
+            "/api/users/",
+            json={"username": "testuser2", "email": "testuser2@gmail.com"},
+            headers=headers,
+        )
+        assert response.status_code == 422
+
+    def test_concurrent_duplicate_waits(
+        self,
+        app: Flask,
+        store: IdempotencyStore,
+    ) -> None:
+        """Test concurrent duplicate waits for response of first request."""
+        response = StoredResponse(201, "application/json", b"{}")
+
+        def duplicate() -> StoredResponse | None:
+            with app.app_context():
+                return store.begin("key", "fingerprint")
+
+        with app.app_context():
+            assert store.begin("key", "fingerprint") is None
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                future = pool.submit(duplicate)
+                time.sleep(0.1)
+                assert not future.done()
+                store.complete("key", response)
+                assert future.result() == response
+
+            with pytest.raises(IdempotencyKeyReusedException):
+                store.begin("key", "other")
+
+    def test_released_key_can_be_retried(
+        self,
+        app: Flask,
+        store: IdempotencyStore,
+    ) -> None:
+        """Test key of failed request is released for retry."""
+        with app.app_context():
+            assert store.begin("key", "fingerprint") is None
+            store._wait_timeout = 0.05
+            with pytest.raises(IdempotencyKeyInProgressException):
+                store.begin("key", "fingerprint")
+            store.release("key")
+            assert store.begin("key", "fingerprint") is None
+            store.release("key")
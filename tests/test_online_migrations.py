@@ -0,0 +1,199 @@
+from typing import Any, Generator
+
+import pytest
+import sqlalchemy as sa
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy.engine import Connection, Engine
+
+from migrations.online import (
+    CHECKPOINTS_TABLE,
+    backfill,
+    create_index_online,
+    drop_index_online,
+    reset_checkpoint,
+)
+
+ROWS = 25
+
+
+class TestOnlineMigrations:
+    """Class for testing helpers of online migrations."""
+
+    @pytest.fixture
+    def engine(self) -> Generator[Engine, None, None]:
+        engine = sa.create_engine("sqlite://", poolclass=sa.StaticPool)
+        with engine.begin() as conn:
+            conn.execute(
+                sa.text(
+                    "CREATE TABLE users (id INTEGER PRIMARY KEY, "
+                    "email VARCHAR(64) NOT NULL, email_domain VARCHAR(64))"
+                )
+            )
+            conn.execute(
+                sa.text("INSERT INTO users (id, email) VALUES (:id, :email)"),
+                [
+                    {"id": i, "email": f"user{i}@Domain{i % 3}.com"}
+                    for i in range(1, ROWS + 1)
+                ],
+            )
+        yield engine
+        engine.dispose()
+
+    @pytest.fixture
+    def connection(self, engine: Engine) -> Generator[Connection, None, None]:
+        with engine.connect() as conn:
+            yield conn.execution_options(isolation_level="AUTOCOMMIT")
+
+    @staticmethod
+    def _domain_values() -> dict[str, Any]:
+        email = sa.column("email")
+        return {
+            "email_domain": sa.func.lower(
+                sa.func.substr(email, sa.func.instr(email, "@") + 1)
+            )
+        }
+
+    @staticmethod
+    def _filled(connection: Connection) -> int:
+        return connection.scalar(  # type: ignore[no-any-return]
+            sa.text(
+                "SELECT count(*) FROM users WHERE email_domain IS NOT NULL"
+            )
+        )
+
+    def test_backfill(self, connection: Connection) -> None:
+        """Test all rows are updated in batches and run is completed."""
+        processed = backfill(
+            "users_email_domain",
+            table="users",
+            values=self._domain_values(),
+            batch_size=10,
+            throttle=0,
+            connection=connection,
+        )
+
+        assert processed == ROWS
+        assert self._filled(connection) == ROWS
+        assert connection.scalar(
+            sa.text("SELECT email_domain FROM users WHERE id = 4")
+        ) == ("domain1.com")
+        checkpoint = connection.execute(
+            sa.text(f"SELECT * FROM {CHECKPOINTS_TABLE}")
+        ).one()
+        assert checkpoint.completed
+        assert checkpoint.rows_done == ROWS
+
+        # completed backfill is not run again
+        assert (
+            backfill(
+                "users_email_domain",
+                table="users",
+                values=self._domain_values(),
+                connection=connection,
+            )
+            == 0
+        )
+
+    def test_backfill_resumes_after_interruption(
+        self,
+        connection: Connection,
+    ) -> None:
+        """Test interrupted run resumes after the last committed batch."""
+        batches: list[tuple[Any, Any]] = []
+        interrupt_after = [2]
+
+        def apply(conn: Connection, lower: Any, upper: Any) -> None:
+            if len(batches) == interrupt_after[0]:
+                raise RuntimeError("interrupted")
+            batches.append((lower, upper))
+            conn.execute(
+                sa.text(
+                    "UPDATE users SET email_domain = 'x' "
+                    "WHERE id > :lower AND id <= :upper"
+                ),
+                {"lower": lower or 0, "upper": upper},
+            )
+
+        with pytest.raises(RuntimeError):
+            backfill(
+                "users_email_domain",
+                table="users",
+                apply=apply,
+                batch_size=5,
+                throttle=0,
+                connection=connection,
+            )
+        assert batches == [(None, 5), (5, 10)]
+        assert self._filled(connection) == 10
+
+        batches.clear()
+        interrupt_after[0] = -1
+        processed = backfill(
+            "users_email_domain",
+            table="users",
+            apply=apply,
+            batch_size=5,
+            throttle=0,
+            connection=connection,
+        )
+
+        assert processed == ROWS - 10
+        assert batches == [(10, 15), (15, 20), (20, 25)]
+        assert self._filled(connection) == ROWS
+
+    def test_backfill_where(self, connection: Connection) -> None:
+        """Test only rows matching condition are processed."""
+        connection.execute(
+            sa.text("UPDATE users SET email_domain = 'set' WHERE id <= 20")
+        )
+
+        processed = backfill(
+            "users_email_domain",
+            table="users",
+            values=self._domain_values(),
+            where=sa.column("email_domain").is_(None),
+            batch_size=2,
+            throttle=0,
+            connection=connection,
+        )
+
+        assert processed == 5
+        assert self._filled(connection) == ROWS
+
+    def test_reset_checkpoint(self, connection: Connection) -> None:
+        """Test backfill runs again after its checkpoint is reset."""
+        kwargs: dict[str, Any] = dict(
+            table="users",
+            values=self._domain_values(),
+            throttle=0,
+            connection=connection,
+        )
+        backfill("users_email_domain", **kwargs)
+
+        reset_checkpoint("users_email_domain", connection=connection)
+
+        assert backfill("users_email_domain", **kwargs) == ROWS
+
+    def test_in_migration_context(self, engine: Engine) -> None:
+        """Test helpers called from revision with operations proxy."""
+        with engine.connect() as conn:
+            context = MigrationContext.configure(conn)
+            with Operations.context(context), context.begin_transaction():
+                processed = backfill(
+                    "users_email_domain",
+                    table="users",
+                    values=self._domain_values(),
+                    batch_size=7,
+                    throttle=0,
+                )
+                create_index_online(
+                    "ix_users_email_domain", "users", ["email_domain"]
+                )
+            indexes = sa.inspect(conn).get_indexes("users")
+            assert processed == ROWS
+            assert [ix["name"] for ix in indexes] == ["ix_users_email_domain"]
+
+            with Operations.context(context), context.begin_transaction():
+                drop_index_online("ix_users_email_domain", "users")
+            assert sa.inspect(conn).get_indexes("users") == []
@@ -0,0 +1,125 @@
+import os
+import time
+from pathlib import Path
+
+import pytest
+from flask import Flask
+
+from app.main import create_app
+from app.src.core import sign_profile_token
+from tests.conftest import MockSettings
+
+SECRET = "test-secret"
+
+
+@pytest.mark.usefixtures("app")
+class TestRequestProfiler:
+    """Class for testing opt-in profiling of requests."""
+
+    @staticmethod
+    def _make_app(
+        app_settings: MockSettings,
+        tmp_path: Path,
+        sample_rate: float = 0.0,
+    ) -> Flask:
+        settings = app_settings.model_copy(
+            update={
+                "PROFILING_ENABLED": True,
+                "PROFILING_SECRET": SECRET,
+                "PROFILING_SAMPLE_RATE": sample_rate,
+                "PROFILING_DIR": str(tmp_path),
+            }
+        )
+        return create_app(settings)
+
+    def test_signed_header(
+        self,
+        app_settings: MockSettings,
+        tmp_path: Path,
+    ) -> None:
+        """Test only requests with valid token are profiled."""
+        client = self._make_app(app_settings, tmp_path).test_client()
+        token = sign_profile_token(
+            SECRET, "/api/users/", int(time.time()) + 60
+        )
+
+        response = client.get("/api/users/")
+        assert "X-Profile-File" not in response.headers
+        assert os.listdir(tmp_path) == []
+
+        response = client.get("/api/users/", headers={"X-Profile": token})
+        filename = response.headers["X-Profile-File"]
+        assert os.listdir(tmp_path) == [filename]
+        assert "-users_router.get_all_users-" in filename
+        assert filename.endswith(f"ms-{os.getpid()}-0.prof")
+
+    @pytest.mark.parametrize(
+        "token",
+        [
+            # other path
+            sign_profile_token(SECRET, "/api/users/1/", 2**40),
+            # other secret
+            sign_profile_token("other", "/api/users/", 2**40),
+            # expired
+            sign_profile_token(SECRET, "/api/users/", 1),
+            "malformed",
+        ],
+    )
+    def test_invalid_token(
+        self,
+        app_settings: MockSettings,
+        tmp_path: Path,
+        token: str,
+    ) -> None:
+        """Test requests with invalid tokens are not profiled."""
+        app = self._make_app(app_settings, tmp_path)
+        response = app.test_client().get(
+            "/api/users/", headers={"X-Profile": token}
+        )
+
+        assert response.status_code == 200
+        assert "X-Profile-File" not in response.headers
+        assert app.extensions["profiler"].stats()["rejected_tokens_total"] == 1
+
+    def test_sampling_and_report(
+        self,
+        app_settings: MockSettings,
+        tmp_path: Path,
+    ) -> None:
+        """Test sampled profiles are aggregated by report command."""
+        app = self._make_app(app_settings, tmp_path, sample_rate=1.0)
+        client = app.test_client()
+        for _ in range(3):
+            client.get("/api/users/")
+        client.get("/api/users/stats/from_last_week")
+        # only users API is profiled
+        client.get("/api/metrics/")
+
+        assert len(os.listdir(tmp_path)) == 4
+
+        with app.app_context():
+            result = app.test_cli_runner().invoke(
+                args=["profile-report", "--top", "5", "--endpoint", "get_all"]
+            )
+        assert result.exit_code == 0
+        assert "users_router.get_all_users" in result.output
+        assert "from_last_week" not in result.output
+        assert "function calls" in result.output
+
+    def test_token_command(
+        self,
+        app_settings: MockSettings,
+        tmp_path: Path,
+    ) -> None:
+        """Test token printed by command enables profiling."""
+        app = self._make_app(app_settings, tmp_path)
+        with app.app_context():
+            result = app.test_cli_runner().invoke(
+                args=["profile-token", "/api/users/", "--ttl", "60"]
+            )
+        assert result.exit_code == 0
+
+        response = app.test_client().get(
+            "/api/users/", headers={"X-Profile": result.output.strip()}
+        )
+        assert "X-Profile-File" in response.headers
@@ -0,0 +1,94 @@
+import os
+import signal
+import time
+import urllib.request
+from typing import Generator
+
+import pytest
+
+from app.main import create_app
+from app.src.core import PreforkServer
+from tests.conftest import MockSettings
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork()")
+class TestPreforkServer:
+    """Class for testing pre-fork multi-worker server."""
+
+    @pytest.fixture
+    def server(
+        self,
+        app_settings: MockSettings,
+    ) -> Generator[tuple[PreforkServer, int], None, None]:
+        server = PreforkServer(
+            app=create_app(app_settings),
+            host="127.0.0.1",
+            port=0,
+            workers=2,
+            threads=2,
+            max_requests=2,
+            graceful_timeout=5.0,
+        )
+        server.bind()
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                server.run()
+            except BaseException:
+                code = 1
+            finally:
+                os._exit(code)
+        assert server.socket is not None
+        server.socket.close()
+        yield server, pid
+        try:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        except (ProcessLookupError, ChildProcessError):
+            pass
+
+    @staticmethod
+    def _get(port: int) -> int:
+        url = f"http://127.0.0.1:{port}/api/metrics/"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return int(response.status)
+
+    @staticmethod
+    def _wait_exit(pid: int, timeout: float) -> int | None:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            done, status = os.waitpid(pid, os.WNOHANG)
+            if done:
+                return os.waitstatus_to_exitcode(status)
+            time.sleep(0.05)
+        return None
+
+    def test_recycles_workers_and_stops(
+        self,
+        server: tuple[PreforkServer, int],
+    ) -> None:
+        """Test workers are replaced after max requests
+        and SIGTERM stops the server."""
+        prefork, pid = server
+        # every worker is recycled several times
+        statuses = [self._get(prefork.port) for _ in range(12)]
+        assert statuses == [200] * 12
+
+        os.kill(pid, signal.SIGTERM)
+        assert self._wait_exit(pid, timeout=10) == 0
+
+    def test_graceful_restart(
+        self,
+        server: tuple[PreforkServer, int],
+    ) -> None:
+        """Test SIGHUP restarts workers without failed requests."""
+        prefork, pid = server
+        assert self._get(prefork.port) == 200
+
+        os.kill(pid, signal.SIGHUP)
+        statuses = [self._get(prefork.port) for _ in range(6)]
+        assert statuses == [200] * 6
+
+        os.kill(pid, signal.SIGTERM)
+        assert self._wait_exit(pid, timeout=10) == 0
@@ -1,6 +1,8 @@
+from typing import Any
+
 import pytest
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import delete
+from sqlalchemy import delete, event
 
 from app.src.models import User
 from app.src.schemas.entities import UserFromDB
@@ -79,3 +81,82 @@ class TestUserService:
         )
 
         assert calculated_proportion == expected_proportion
+
+    def test_get_email_domains_distribution(
+        self,
+        user_service: UserService,
+    ) -> None:
+        """Test method getting distribution of users by email domain."""
+        distribution = user_service.get_email_domains_distribution(100)
+        counts = {
+            item["domain"]: item["count"] for item in distribution["domains"]
+        }
+        expected_counts: dict[str, int] = {}
+        for item in users_data:
+            domain = item["email"].split("@")[1]
+            expected_counts[domain] = expected_counts.get(domain, 0) + 1
+
+        assert distribution["total"] == len(users_data)
+        assert counts == expected_counts
+        assert list(counts.values()) == sorted(counts.values(), reverse=True)
+
+        with pytest.raises(ValueError):
+            user_service.get_email_domains_distribution(5, ("mail",))
+
+    @pytest.mark.parametrize(
+        "include",
+        (
+            ("total", "last_days", "top_longest_username", "domains"),
+            ("total", "domains"),
+            ("top_longest_username",),
+        ),
+    )
+    def test_summary(
+        self,
+        user_service: UserService,
+        mock_db: SQLAlchemy,
+        include: tuple[str, ...],
+    ) -> None:
+        """Test method getting stats summary in one query."""
+        statements = []
+
+        def count_statement(*args: Any) -> None:
+            statements.append(args[2])
+
+        event.listen(mock_db.engine, "before_cursor_execute", count_statement)
+        try:
+            summary = user_service.summary(include, 7, 5, ("mtuci.ru",))
+        finally:
+            event.remove(
+                mock_db.engine, "before_cursor_execute", count_statement
+            )
+
+        assert len(statements) == 1
+        assert set(summary) == set(include)
+        if "total" in include:
+            assert summary["total"] == len(users_data)
+        if "last_days" in include:
+            assert summary["last_days"] == {
+                "days": 7,
+                "count": len(users_data),
+            }
+        if "top_longest_username" in include:
+            usernames = [
+                usr["username"] for usr in summary["top_longest_username"]
+            ]
+            expected = sorted(
+                (item["username"] for item in users_data),
+                key=len,
+                reverse=True,
+            )[:5]
+            assert [len(name) for name in usernames] == [
+                len(name) for name in expected
+            ]
+        if "domains" in include:
+            assert summary["domains"] == [
+                {
+                    "domain": "mtuci.ru",
+                    "count": 2,
+                    "proportion": round(2 / len(users_data), 2),
+                }
+            ]
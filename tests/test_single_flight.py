@@ -0,0 +1,95 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from app.src.utils import SingleFlight
+
+
+class TestSingleFlight:
+    """Class for testing single flight coalescing."""
+
+    def test_concurrent_calls_share_result(self) -> None:
+        """Test concurrent identical calls run computation once."""
+        flight = SingleFlight()
+        calls = []
+        started = threading.Event()
+
+        def compute() -> int:
+            calls.append(1)
+            started.set()
+            time.sleep(0.1)
+            return 42
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            leader = pool.submit(flight.do, "compute", (), compute)
+            started.wait()
+            followers = [
+                pool.submit(flight.do, "compute", (), compute)
+                for _ in range(7)
+            ]
+            results = [f.result() for f in [leader, *followers]]
+
+        assert results == [42] * 8
+        assert len(calls) == 1
+
+    def test_different_args_not_coalesced(self) -> None:
+        """Test calls with different args are computed separately."""
+        flight = SingleFlight()
+        assert flight.do("compute", ("a",), lambda: "a") == "a"
+        assert flight.do("compute", ("b",), lambda: "b") == "b"
+
+    def test_error_propagated_to_waiters(self) -> None:
+        """Test exception of leader is raised for all waiting callers."""
+        flight = SingleFlight()
+        started = threading.Event()
+
+        def compute() -> int:
+            started.set()
+            time.sleep(0.1)
+            raise ValueError("failed")
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            leader = pool.submit(flight.do, "compute", (), compute)
+            started.wait()
+            follower = pool.submit(flight.do, "compute", (), lambda: 1)
+            for future in (leader, follower):
+                with pytest.raises(ValueError):
+                    future.result()
+
+    def test_waiter_timeout_computes_own_result(self) -> None:
+        """Test caller stops waiting after timeout of call name."""
+        flight = SingleFlight(default_timeout=10, timeouts={"slow": 0.01})
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow() -> str:
+            started.set()
+            release.wait()
+            return "leader"
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            leader = pool.submit(flight.do, "slow", (), slow)
+            started.wait()
+            assert flight.do("slow", (), lambda: "own") == "own"
+            release.set()
+            assert leader.result() == "leader"
+
+    def test_shared_result_between_groups(self, tmp_path: Path) -> None:
+        """Test result is reused by group of another process."""
+        first = SingleFlight(lock_dir=str(tmp_path), result_ttl=60)
+        second = SingleFlight(lock_dir=str(tmp_path), result_ttl=60)
+
+        assert first.do("compute", (1,), lambda: [1, 2]) == [1, 2]
+        assert second.do("compute", (1,), lambda: [3, 4]) == [1, 2]
+        assert second.do("compute", (2,), lambda: [3, 4]) == [3, 4]
+
+    def test_lock_files_bounded(self, tmp_path: Path) -> None:
+        """Test number of files does not grow with number of keys."""
+        group = SingleFlight(lock_dir=str(tmp_path), result_ttl=60)
+        stripes = SingleFlight.LOCK_STRIPES
+        for domain in range(stripes * 4):
+            assert group.do("domain", (str(domain),), lambda: 1) == 1
+        assert len(list(tmp_path.iterdir())) <= 2 * stripes
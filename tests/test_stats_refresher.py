@@ -0,0 +1,107 @@
+from typing import Generator
+
+import pytest
+from flask import Flask
+from flask.testing import FlaskClient
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import delete
+
+from app.main import create_app
+from app.src.models import User
+from app.src.services import StatsRefresher
+from tests.conftest import MockSettings, users_data
+
+
+@pytest.mark.usefixtures("app", "mock_db")
+class TestStatsRefresher:
+    """Class for testing stats served from background snapshots."""
+
+    @pytest.fixture(autouse=True, scope='function')
+    def _setup(self, mock_db: SQLAlchemy) -> None:
+        """Setup fixture."""
+        users = [User(**user) for user in users_data]
+        mock_db.session.add_all(users)
+        mock_db.session.commit()
+        yield
+        stmt = delete(User)
+        mock_db.session.execute(stmt)
+        mock_db.session.commit()
+
+    @pytest.fixture
+    def refresher_app(
+        self,
+        app_settings: MockSettings,
+    ) -> Generator[Flask, None, None]:
+        settings = app_settings.model_copy(
+            update={
+                "STATS_REFRESH_ENABLED": True,
+                "STATS_REFRESH_INTERVAL": 3600,
+                "STATS_TRACKED_DOMAINS": ["mtuci.ru"],
+            }
+        )
+        _app = create_app(settings)
+        yield _app
+        _app.extensions["stats_refresher"].stop()
+
+    @pytest.fixture
+    def refresher(self, refresher_app: Flask) -> StatsRefresher:
+        refresher: StatsRefresher = refresher_app.extensions["stats_refresher"]
+        refresher.refresh()
+        return refresher
+
+    @pytest.fixture
+    def refresher_client(self, refresher_app: Flask) -> FlaskClient:
+        return refresher_app.test_client()
+
+    def test_serve_snapshots(
+        self,
+        refresher: StatsRefresher,
+        refresher_client: FlaskClient,
+    ) -> None:
+        """Test stats endpoints serve snapshots with their age."""
+        response = refresher_client.get("/api/users/stats/from_last_week")
+        assert response.json == {"count": len(users_data)}
+        assert float(response.headers["X-Snapshot-Age"]) >= 0
+
+        response = refresher_client.get(
+            "/api/users/stats/top_longest_username"
+        )
+        assert len(response.json) == 5
+        assert "X-Snapshot-Age" in response.headers
+
+        response = refresher_client.get(
+            "/api/users/stats/with_email_domain/mtuci.ru"
+        )
+        assert response.json["proportion"] == round(2 / len(users_data), 2)
+        assert "X-Snapshot-Age" in response.headers
+
+    def test_requested_domain_tracked(
+        self,
+        refresher: StatsRefresher,
+        refresher_client: FlaskClient,
+    ) -> None:
+        """Test requested domain is computed synchronously then refreshed."""
+        url = "/api/users/stats/with_email_domain/gmail.com"
+        response = refresher_client.get(url)
+        assert response.status_code == 200
+        assert "X-Snapshot-Age" not in response.headers
+
+        refresher.refresh()
+        response = refresher_client.get(url)
+        assert response.status_code == 200
+        assert "X-Snapshot-Age" in response.headers
+
+        url = "/api/users/stats/with_email_domain/mail"
+        assert refresher_client.get(url).status_code == 400
+
+    def test_stale_snapshot_not_served(
+        self,
+        refresher: StatsRefresher,
+        refresher_client: FlaskClient,
+    ) -> None:
+        """Test stats are computed synchronously for stale snapshot."""
+        refresher._max_staleness = 0
+        response = refresher_client.get("/api/users/stats/from_last_week")
+        assert response.json == {"count": len(users_data)}
+        assert "X-Snapshot-Age" not in response.headers
+        assert refresher.stats()["fallback_total"] >= 1
@@ -0,0 +1,78 @@
+import gzip
+
+import pytest
+from flask.testing import FlaskClient
+
+from app.main import create_app
+from tests.conftest import MockSettings
+
+
+class TestOpenAPI:
+    """Class for testing OpenAPI document serving."""
+
+    url = "/docs/openapi.yaml"
+
+    def test_serve_openapi(self, client: FlaskClient) -> None:
+        """Test document is served with caching headers."""
+        response = client.get(self.url)
+        assert response.status_code == 200
+        assert response.headers["Cache-Control"].startswith("public")
+        assert response.headers["ETag"]
+        with open(self.url.lstrip("/"), "rb") as f:
+            assert response.data == f.read()
+
+    def test_serve_openapi_gzip(self, client: FlaskClient) -> None:
+        """Test pre-compressed document is served when gzip accepted."""
+        response = client.get(
+            self.url, headers={"Accept-Encoding": "gzip, deflate"}
+        )
+        assert response.status_code == 200
+        assert response.headers["Content-Encoding"] == "gzip"
+        with open(self.url.lstrip("/"), "rb") as f:
+            assert gzip.decompress(response.data) == f.read()
+        # representations have different ETags
+        assert response.headers["ETag"] != client.get(self.url).headers["ETag"]
+
+    def test_serve_openapi_gzip_not_acceptable(
+        self,
+        client: FlaskClient,
+    ) -> None:
+        """Test gzip with quality 0 is not used."""
+        response = client.get(
+            self.url, headers={"Accept-Encoding": "gzip;q=0"}
+        )
+        assert response.status_code == 200
+        assert "Content-Encoding" not in response.headers
+
+    def test_serve_openapi_not_modified(self, client: FlaskClient) -> None:
+        """Test conditional request with matching ETag."""
+        etag = client.get(self.url).headers["ETag"]
+        response = client.get(self.url, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.data == b""
+        # ETag of identity representation does not match gzip one
+        response = client.get(
+            self.url,
+            headers={"If-None-Match": etag, "Accept-Encoding": "gzip"},
+        )
+        assert response.status_code == 200
+
+    @pytest.mark.parametrize(
+        ("profile", "expected_docs_status"),
+        (
+            ("development", 200),
+            ("production", 404),
+        ),
+    )
+    def test_swagger_ui_by_profile(
+        self,
+        app_settings: MockSettings,
+        profile: str,
+        expected_docs_status: int,
+    ) -> None:
+        """Test Swagger UI is skipped in production profile."""
+        settings = app_settings.model_copy(update={"APP_PROFILE": profile})
+        client = create_app(settings).test_client()
+        response = client.get(settings.SWAGGER_API_URL)
+        assert response.status_code == expected_docs_status
+        assert client.get(self.url).status_code == 200
@@ -0,0 +1,196 @@
+from datetime import datetime as dt, timedelta as td
+from types import SimpleNamespace
+from typing import Any, Generator
+
+import pytest
+from flask import Flask
+from flask.testing import FlaskClient
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import delete, update
+
+from app.main import create_app
+from app.src.models import User, UserChange
+from app.src.repositories import UserRepository
+from app.src.schemas.entities import UserCreate, UserUpdate
+from app.src.services import UserAnalytics, UserService
+from tests.conftest import MockSettings, users_data
+
+pytest.importorskip("numpy")
+
+
+@pytest.mark.usefixtures("app", "mock_db")
+class TestUserAnalytics:
+    """Class for testing in-process analytics snapshot of users."""
+
+    @pytest.fixture(autouse=True, scope='function')
+    def _setup(self, mock_db: SQLAlchemy) -> None:
+        """Setup fixture."""
+        users = [User(**user) for user in users_data]
+        mock_db.session.add_all(users)
+        mock_db.session.commit()
+        yield
+        mock_db.session.execute(delete(User))
+        mock_db.session.execute(delete(UserChange))
+        mock_db.session.commit()
+
+    @staticmethod
+    def _make_app(app_settings: MockSettings, **overrides: Any) -> Flask:
+        settings = app_settings.model_copy(
+            update={"ANALYTICS_ENABLED": True, **overrides}
+        )
+        return create_app(settings)
+
+    @pytest.fixture
+    def analytics_app(
+        self,
+        app_settings: MockSettings,
+    ) -> Generator[Flask, None, None]:
+        _app = self._make_app(app_settings, ANALYTICS_SYNC_INTERVAL=60.0)
+        with _app.app_context():
+            yield _app
+
+    @staticmethod
+    def _stats(client: FlaskClient) -> dict[str, Any]:
+        return {
+            "last_week": client.get("/api/users/stats/from_last_week").json,
+            "top": [
+                user["username"]
+                for user in client.get(
+                    "/api/users/stats/top_longest_username"
+                ).json
+            ],
+            "google": client.get(
+                "/api/users/stats/with_email_domain/google.com"
+            ).json,
+            "mail": client.get(
+                "/api/users/stats/with_email_domain/Mail.ru"
+            ).json,
+        }
+
+    def test_stats_match_sql(
+        self,
+        analytics_app: Flask,
+        client: FlaskClient,
+    ) -> None:
+        """Test stats from snapshot are equal to stats from SQL,
+        also after writes through the API."""
+        analytics_client = analytics_app.test_client()
+        analytics: UserAnalytics = analytics_app.extensions["analytics"]
+        assert self._stats(analytics_client) == self._stats(client)
+        assert analytics.stats()["rows"] == len(users_data)
+
+        created = analytics_client.post(
+            "/api/users/",
+            json={
+                "username": "very_long_username_1",
+                "email": "someone@GOOGLE.com",
+            },
+        ).json["id"]
+        analytics_client.patch(
+            "/api/users/1/", json={"email": "johndoe@mail.ru"}
+        )
+        analytics_client.delete(f"/api/users/{created - 1}/")
+        assert self._stats(analytics_client) == self._stats(client)
+        assert self._stats(analytics_client)["top"][0] == (
+            "very_long_username_1"
+        )
+        stats = analytics.stats()
+        assert stats["rows"] == len(users_data)
+        assert stats["loads_total"] == 1
+        assert stats["syncs_total"] >= 1
+        assert stats["fallback_total"] == 0
+        assert stats["bytes"] <= 64 * 1024 * 1024
+
+    def test_writes_of_other_workers(
+        self,
+        app_settings: MockSettings,
+        mock_db: SQLAlchemy,
+    ) -> None:
+        """Test writes without notification are applied from change log."""
+        _app = self._make_app(app_settings, ANALYTICS_SYNC_INTERVAL=0.0)
+        analytics: UserAnalytics = _app.extensions["analytics"]
+        with _app.app_context():
+            service = UserService(UserRepository(mock_db), analytics=analytics)
+            assert service.count_registered_last_week() == len(users_data)
+
+            # another worker, its repository does not mark snapshot stale
+            repo = UserRepository(mock_db)
+            repo.create(UserCreate(username="newcomer", email="n@gov.ru"))
+            repo.create(UserCreate(username="newcomer2", email="n2@mail.ru"))
+            mock_db.session.execute(
+                update(User)
+                .where(User.username == "johndoe")
+                .values(registration_date=dt.now() - td(days=30))
+            )
+            user = repo.find_record("username", "johndoe")
+            repo.update(user.id, UserUpdate(username="john_doe_the_longest"))
+
+            assert service.count_registered_last_week() == len(users_data) + 1
+            assert service.get_proportion_with_domain("gov.ru") == round(
+                1 / (len(users_data) + 2), 2
+            )
+            top = service.get_top_5_longest_username()
+            assert top[0].username == "john_doe_the_longest"
+            assert analytics.stats()["loads_total"] == 1
+
+            # log compacted past the last applied change
+            repo.delete(user.id)
+            mock_db.session.execute(delete(UserChange))
+            mock_db.session.commit()
+            repo.create(UserCreate(username="latecomer", email="l@gov.ru"))
+            assert service.get_proportion_with_domain("gov.ru") == round(
+                2 / (len(users_data) + 2), 2
+            )
+            assert analytics.stats()["loads_total"] == 2
+
+    def test_over_memory_budget(
+        self,
+        app_settings: MockSettings,
+        client: FlaskClient,
+    ) -> None:
+        """Test snapshot over memory budget falls back to SQL."""
+        _app = self._make_app(app_settings, ANALYTICS_MAX_BYTES=64)
+        analytics: UserAnalytics = _app.extensions["analytics"]
+        assert self._stats(_app.test_client()) == self._stats(client)
+        stats = analytics.stats()
+        assert stats["over_budget"] is True
+        assert stats["bytes"] == 0
+        assert stats["served_total"] == 0
+        assert stats["fallback_total"] == 4
+
+    def test_arrays(self, analytics_app: Flask) -> None:
+        """Test compact dtypes, order of ids and compaction of deleted."""
+        analytics: UserAnalytics = analytics_app.extensions["analytics"]
+        assert analytics.count_registered_since(dt.now()) == 0
+        assert str(analytics._lengths.dtype) == "int8"
+        assert str(analytics._registered.dtype) == "int64"
+        assert len(analytics._dictionary) == 7
+
+        now = dt.now()
+        ids = [int(id) for id in analytics._ids[: analytics._size]]
+        # id lower than the last one is inserted in order
+        analytics._append([(0, "a" * 32, "x@google.com", now)])
+        assert analytics._ids[0] == 0
+        assert analytics.top_longest_username_ids(2)[0] == 0
+        assert analytics.count_email_domain("google.com") == (3, 10)
+
+        analytics._apply(
+            [_deleted(seq, id) for seq, id in enumerate(ids, start=1)]
+        )
+        assert analytics.count_email_domain("google.com") == (1, 1)
+        analytics._apply([_deleted(len(ids) + 1, 0)])
+        assert analytics.stats()["rows"] == 0
+        analytics._compact()
+        assert analytics._size == 0
+        assert analytics.count_email_domain("google.com") == (0, 0)
+        assert analytics.top_longest_username_ids(5) == []
+
+
+def _deleted(seq: int, user_id: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        seq=seq,
+        user_id=user_id,
+        username=None,
+        email=None,
+        registration_date=None,
+    )
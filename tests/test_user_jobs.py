@@ -0,0 +1,235 @@
+import csv
+import io
+import json
+import time
+from datetime import datetime as dt, timedelta as td
+from pathlib import Path
+from typing import Any, Generator
+
+import pytest
+from flask import Flask
+from flask.testing import FlaskClient
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import delete, update
+
+from app.main import create_app
+from app.src.exceptions import TooManyJobsException
+from app.src.models import User, UserJob
+from app.src.repositories import UserJobRepository
+from tests.conftest import MockSettings, users_data
+
+
+@pytest.mark.usefixtures("app", "mock_db")
+class TestUserJobs:
+    """Class for testing background export and report jobs."""
+
+    @pytest.fixture(autouse=True, scope='function')
+    def _setup(self, mock_db: SQLAlchemy) -> None:
+        """Setup fixture."""
+        users = [User(**user) for user in users_data]
+        mock_db.session.add_all(users)
+        mock_db.session.commit()
+        yield
+        mock_db.session.execute(delete(User))
+        mock_db.session.execute(delete(UserJob))
+        mock_db.session.commit()
+
+    @staticmethod
+    def _make_app(
+        app_settings: MockSettings,
+        tmp_path: Path,
+        **overrides: Any,
+    ) -> Flask:
+        settings = app_settings.model_copy(
+            update={
+                "JOBS_ENABLED": True,
+                "JOBS_DIR": str(tmp_path),
+                "JOBS_BATCH_SIZE": 2,
+                "JOBS_POLL_INTERVAL": 0.05,
+                **overrides,
+            }
+        )
+        return create_app(settings)
+
+    @pytest.fixture
+    def jobs_app(
+        self,
+        app_settings: MockSettings,
+        tmp_path: Path,
+    ) -> Generator[Flask, None, None]:
+        _app = self._make_app(app_settings, tmp_path)
+        yield _app
+        _app.extensions["user_jobs"].stop()
+
+    @pytest.fixture
+    def jobs_client(self, jobs_app: Flask) -> FlaskClient:
+        return jobs_app.test_client()
+
+    @staticmethod
+    def _wait_finished(
+        client: FlaskClient,
+        job_id: str,
+        timeout: float = 10.0,
+    ) -> dict[str, Any]:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            job = client.get(f"/api/users/jobs/{job_id}").json
+            if job["status"] in ("succeeded", "failed"):
+                return job  # type: ignore[no-any-return]
+            time.sleep(0.02)
+        raise AssertionError(f"job {job_id} is not finished")
+
+    def test_export_jsonl(self, jobs_client: FlaskClient) -> None:
+        """Test export is run in background and streamed on download."""
+        response = jobs_client.post("/api/users/jobs", json={"kind": "export"})
+        assert response.status_code == 202
+        assert response.json["status"] == "queued"
+        assert response.json["format"] == "jsonl"
+        assert response.headers["Location"] == (
+            f"/api/users/jobs/{response.json['id']}"
+        )
+
+        job = self._wait_finished(jobs_client, response.json["id"])
+        assert job["status"] == "succeeded", job
+        assert job["rows_done"] == job["rows_total"] == len(users_data)
+        assert job["progress"] == 1.0
+
+        result = jobs_client.get(job["result_url"])
+        assert result.status_code == 200
+        assert result.mimetype == "application/x-ndjson"
+        assert "attachment" in result.headers["Content-Disposition"]
+        lines = result.get_data(as_text=True).splitlines()
+        assert [json.loads(line)["username"] for line in lines] == [
+            user["username"] for user in users_data
+        ]
+
+    def test_export_csv_filtered(self, jobs_client: FlaskClient) -> None:
+        """Test export of users matching filters to CSV."""
+        response = jobs_client.post(
+            "/api/users/jobs",
+            json={
+                "kind": "export",
+                "format": "csv",
+                "filters": {"email_domain": "MTUCI.ru"},
+            },
+        )
+        job = self._wait_finished(jobs_client, response.json["id"])
+        assert job["rows_done"] == job["rows_total"] == 2
+
+        result = jobs_client.get(job["result_url"])
+        assert result.mimetype == "text/csv"
+        rows = list(csv.DictReader(io.StringIO(result.get_data(as_text=True))))
+        assert [row["username"] for row in rows] == [
+            "tony_stark",
+            "marina_sm1",
+        ]
+
+    def test_report(self, jobs_client: FlaskClient) -> None:
+        """Test stats report job."""
+        response = jobs_client.post(
+            "/api/users/jobs", json={"kind": "report", "top": 3}
+        )
+        assert response.json["format"] == "json"
+        job = self._wait_finished(jobs_client, response.json["id"])
+        assert job["status"] == "succeeded", job
+
+        report = jobs_client.get(job["result_url"]).json
+        assert report["total"] == len(users_data)
+        assert len(report["top_longest_username"]) == 3
+        assert report["email_domains"][0] == {
+            "domain": "google.com",
+            "count": 2,
+            "proportion": round(2 / len(users_data), 2),
+        }
+
+    @pytest.mark.parametrize(
+        "body",
+        (
+            {"kind": "report", "format": "csv"},
+            {"kind": "export", "format": "json"},
+            {"kind": "import"},
+            {"kind": "export", "filters": {"email": "x"}},
+        ),
+    )
+    def test_invalid_job(
+        self,
+        jobs_client: FlaskClient,
+        body: dict[str, Any],
+    ) -> None:
+        """Test invalid jobs are rejected."""
+        response = jobs_client.post("/api/users/jobs", json=body)
+        assert response.status_code == 400
+        assert response.json["validation_error"]["body_params"]
+
+    def test_result_of_unfinished_job(
+        self,
+        jobs_client: FlaskClient,
+        mock_db: SQLAlchemy,
+    ) -> None:
+        """Test result is available only for succeeded job."""
+        job = UserJobRepository(mock_db).create(
+            "export", "jsonl", {"filters": {}}, max_active=10
+        )
+        response = jobs_client.get(f"/api/users/jobs/{job.id}/result")
+        assert response.status_code == 409
+        assert jobs_client.get("/api/users/jobs/unknown").status_code == 404
+
+    def test_limit_of_active_jobs(
+        self,
+        app_settings: MockSettings,
+        tmp_path: Path,
+        mock_db: SQLAlchemy,
+    ) -> None:
+        """Test jobs over limit of unfinished ones are rejected."""
+        repo = UserJobRepository(mock_db)
+        repo.create("export", "jsonl", {"filters": {}}, max_active=1)
+        with pytest.raises(TooManyJobsException):
+            repo.create("export", "jsonl", {"filters": {}}, max_active=1)
+
+        _app = self._make_app(app_settings, tmp_path, JOBS_MAX_ACTIVE=1)
+        try:
+            response = _app.test_client().post(
+                "/api/users/jobs", json={"kind": "export"}
+            )
+        finally:
+            _app.extensions["user_jobs"].stop()
+        assert response.status_code == 429
+        assert response.headers["Retry-After"]
+        assert _app.extensions["user_jobs"].stats()["rejected_total"] == 1
+
+    def test_interrupted_job_is_rerun(
+        self,
+        app_settings: MockSettings,
+        tmp_path: Path,
+        mock_db: SQLAlchemy,
+    ) -> None:
+        """Test job of crashed worker is requeued and run by another."""
+        repo = UserJobRepository(mock_db)
+        job = repo.create("export", "jsonl", {"filters": {}}, max_active=10)
+        # claimed by a worker which died without heartbeat
+        lost = repo.claim_next()
+        assert lost is not None and lost.attempts == 1
+        mock_db.session.execute(
+            update(UserJob).values(heartbeat_at=dt.now() - td(minutes=5))
+        )
+        mock_db.session.commit()
+
+        _app = self._make_app(app_settings, tmp_path, JOBS_LEASE_TIMEOUT=60)
+        client = _app.test_client()
+        try:
+            finished = self._wait_finished(client, job.id)
+        finally:
+            _app.extensions["user_jobs"].stop()
+        assert finished["status"] == "succeeded"
+        assert finished["attempts"] == 2
+        # late progress of the first run is ignored
+        assert not repo.heartbeat(job.id, lost.attempts, 1)
+
+        expired = repo.delete_finished_before(dt.now() + td(seconds=1))
+        assert expired == [f"{job.id}.jsonl"]
+        assert client.get(f"/api/users/jobs/{job.id}").status_code == 404
+
+    def test_jobs_disabled(self, client: FlaskClient) -> None:
+        """Test jobs endpoints are not available by default."""
+        response = client.post("/api/users/jobs", json={"kind": "export"})
+        assert response.status_code == 404
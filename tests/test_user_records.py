@@ -0,0 +1,67 @@
+from flask_sqlalchemy import SQLAlchemy
+import pytest
+from sqlalchemy import delete
+
+from app.src.models import User
+from app.src.repositories import UserRepository, UserRecord
+from app.src.schemas.entities import UserFromDB
+from app.src.schemas.query import UserPaginatorQueryParams
+from tests.conftest import users_data
+
+
+@pytest.mark.usefixtures("app", "mock_db")
+class TestUserRecords:
+    """Class for testing ORM-free read path of users."""
+
+    @pytest.fixture(autouse=True, scope='function')
+    def _setup(self, mock_db: SQLAlchemy) -> None:
+        """Setup fixture."""
+        mock_db.session.add_all([User(**data) for data in users_data])
+        mock_db.session.commit()
+        mock_db.session.expunge_all()
+        yield
+        mock_db.session.execute(delete(User))
+        mock_db.session.commit()
+
+    @pytest.mark.parametrize("offset, limit", [(0, 0), (2, 3), (8, 5)])
+    def test_get_all_records(
+        self,
+        mock_db: SQLAlchemy,
+        offset: int,
+        limit: int,
+    ) -> None:
+        """Test records match serialized ORM users."""
+        repo = UserRepository(mock_db)
+        params = UserPaginatorQueryParams(offset=offset, limit=limit)
+
+        records = repo.get_all_records(params)
+        expected = [
+            UserFromDB.model_validate(user).to_dict()
+            for user in repo.get_all(params)
+        ]
+        mock_db.session.expunge_all()
+
+        assert all(isinstance(rec, UserRecord) for rec in records)
+        assert [rec.to_dict() for rec in records] == expected
+
+    def test_get_all_records_not_tracked(self, mock_db: SQLAlchemy) -> None:
+        """Test records are not added to identity map of session."""
+        repo = UserRepository(mock_db)
+
+        records = repo.get_all_records(UserPaginatorQueryParams(limit=0))
+
+        assert len(records) == len(users_data)
+        assert len(mock_db.session.identity_map) == 0
+
+    @pytest.mark.parametrize("batch_size", [1, 4, 9, 100])
+    def test_iter_records(self, mock_db: SQLAlchemy, batch_size: int) -> None:
+        """Test walk of all users in batches."""
+        repo = UserRepository(mock_db)
+
+        records = list(repo.iter_records(batch_size=batch_size))
+
+        assert [rec.username for rec in records] == [
+            data["username"] for data in users_data
+        ]
+        ids = [rec.id for rec in records]
+        assert ids == sorted(ids)
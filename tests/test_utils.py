@@ -1,6 +1,6 @@
 import pytest
 
-from app.src.utils import validate_domain
+from app.src.utils import validate_domain, BloomFilter
 
 
 class TestUtils:
@@ -21,3 +21,24 @@ class TestUtils:
     ) -> None:
         """Test for domain validation."""
         assert validate_domain(domain) == expected_value
+
+    def test_bloom_filter(self) -> None:
+        """Test Bloom filter has no false negatives and about
+        the requested rate of false positives at capacity."""
+        bloom = BloomFilter(capacity=2000, error_rate=0.01)
+        for i in range(2000):
+            bloom.add(f"user_{i}")
+        assert all(f"user_{i}" in bloom for i in range(2000))
+        false_positives = sum(f"other_{i}" in bloom for i in range(10000))
+        assert false_positives < 300
+        assert bloom.count == 2000
+        # 19171 bits at 1% rounded up to power of two
+        assert bloom.nbytes == 4 * 1024
+
+    def test_bloom_filter_distinct_positions(self) -> None:
+        """Test every item sets as many distinct bits as there are
+        hashes."""
+        bloom = BloomFilter(capacity=3, error_rate=0.01)
+        for i in range(1000):
+            positions = list(bloom._positions(f"user_{i}"))
+            assert len(set(positions)) == len(positions)
@@ -0,0 +1,196 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+
+import pytest
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import delete, select
+
+from app.main import create_app
+from app.src.exceptions import (
+    UserNotFoundException,
+    UserAlreadyExistsException,
+)
+from app.src.models import User, UserChange
+from app.src.repositories import UserWritePipeline, UserRepository
+from app.src.schemas.entities import UserCreate, UserUpdate
+from tests.conftest import MockSettings
+
+
+@pytest.mark.usefixtures("app", "mock_db")
+class TestUserWritePipeline:
+    """Class for testing group commit of user writes."""
+
+    @pytest.fixture(autouse=True, scope='function')
+    def _setup(self, mock_db: SQLAlchemy) -> None:
+        """Setup fixture."""
+        yield
+        mock_db.session.execute(delete(User))
+        mock_db.session.execute(delete(UserChange))
+        mock_db.session.commit()
+
+    @pytest.fixture
+    def pipeline_app(self, app_settings: MockSettings) -> Flask:
+        settings = app_settings.model_copy(
+            update={
+                "WRITE_BATCHING_ENABLED": True,
+                "WRITE_BATCH_WINDOW": 0.05,
+                "WRITE_BATCH_MAX_SIZE": 8,
+            }
+        )
+        return create_app(settings)
+
+    @pytest.fixture
+    def pipeline(self, pipeline_app: Flask) -> UserWritePipeline:
+        return pipeline_app.extensions["write_pipeline"]
+
+    def test_concurrent_creates_batched(
+        self,
+        pipeline: UserWritePipeline,
+        mock_db: SQLAlchemy,
+    ) -> None:
+        """Test concurrent creates are applied in shared transactions."""
+        users = [
+            UserCreate(username=f"user_{i}", email=f"user_{i}@gmail.com")
+            for i in range(16)
+        ]
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            created = list(pool.map(pipeline.create, users))
+
+        assert [usr.username for usr in created] == [
+            usr.username for usr in users
+        ]
+        assert len({usr.id for usr in created}) == len(users)
+        assert pipeline.operations_total == len(users)
+        assert pipeline.batches_total < len(users)
+        assert len(mock_db.session.scalars(select(User)).all()) == len(users)
+
+    def test_conflicts_resolved_per_operation(
+        self,
+        pipeline: UserWritePipeline,
+        mock_db: SQLAlchemy,
+    ) -> None:
+        """Test conflicting operation fails without affecting batch."""
+        users = [
+            UserCreate(username="johndoe", email="johndoe@google.com"),
+            UserCreate(username="johndoe", email="johndoe2@google.com"),
+            UserCreate(username="spongebob", email="spongebob@google.com"),
+        ]
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = [pool.submit(pipeline.create, usr) for usr in users]
+            errors = [future.exception() for future in futures]
+
+        assert (
+            sum(isinstance(e, UserAlreadyExistsException) for e in errors) == 1
+        )
+        assert errors.count(None) == 2
+        assert len(mock_db.session.scalars(select(User)).all()) == 2
+
+        created = mock_db.session.scalars(
+            select(User).where(User.username == "spongebob")
+        ).one()
+        updated = pipeline.update(
+            created.id, UserUpdate(username="spongebob_sq")
+        )
+        assert updated.username == "spongebob_sq"
+        pipeline.delete(created.id)
+        with pytest.raises(UserNotFoundException):
+            pipeline.delete(created.id)
+
+    def test_unexpected_failure_replayed_per_operation(
+        self,
+        pipeline: UserWritePipeline,
+        mock_db: SQLAlchemy,
+    ) -> None:
+        """Test unexpected failure of an operation in batch fails only
+        its caller, other operations are committed with own results."""
+
+        def fail(repo: UserRepository) -> Any:
+            repo.create(UserCreate(username="failed", email="f@gmail.com"))
+            raise RuntimeError("unexpected")
+
+        operations = [
+            lambda repo: repo.create(
+                UserCreate(username="first", email="first@gmail.com")
+            ),
+            fail,
+            lambda repo: repo.create(
+                UserCreate(username="third", email="third@gmail.com")
+            ),
+        ]
+        batch: list[tuple[Any, Future[Any]]] = [
+            (operation, Future()) for operation in operations
+        ]
+        pipeline._apply(batch)
+
+        first, failed, third = (future for _, future in batch)
+        assert first.result().username == "first"
+        assert isinstance(failed.exception(), RuntimeError)
+        assert third.result().username == "third"
+        assert pipeline.fallbacks_total == 1
+        usernames = mock_db.session.scalars(select(User.username)).all()
+        assert sorted(usernames) == ["first", "third"]
+
+    def test_endpoints_use_pipeline(
+        self,
+        pipeline_app: Flask,
+        pipeline: UserWritePipeline,
+    ) -> None:
+        """Test write endpoints go through pipeline."""
+        client = pipeline_app.test_client()
+        body = {"username": "testuser1", "email": "testuser1@gmail.com"}
+        response = client.post("/api/users/", json=body)
+        assert response.status_code == 201
+        assert client.post("/api/users/", json=body).status_code == 409
+        user_id = response.json["id"]
+        response = client.patch(
+            f"/api/users/{user_id}/", json={"username": "testuser2"}
+        )
+        assert response.status_code == 200
+        assert response.json["username"] == "testuser2"
+        assert client.delete(f"/api/users/{user_id}/").status_code == 200
+        assert client.delete(f"/api/users/{user_id}/").status_code == 404
+        assert pipeline.operations_total == 5
+
+    def test_conflicts_with_existence_filter(
+        self,
+        app_settings: MockSettings,
+        mock_db: SQLAlchemy,
+    ) -> None:
+        """Test conflicts of batch are detected when conflict checks
+        are skipped by filter of taken values."""
+        settings = app_settings.model_copy(
+            update={
+                "WRITE_BATCHING_ENABLED": True,
+                "WRITE_BATCH_WINDOW": 0.05,
+                "EXISTENCE_FILTER_ENABLED": True,
+                "EXISTENCE_FILTER_SYNC_INTERVAL": 60.0,
+            }
+        )
+        _app = create_app(settings)
+        pipeline: UserWritePipeline = _app.extensions["write_pipeline"]
+        with _app.app_context():
+            _app.extensions["existence_filter"].might_exist("username", "x")
+            # another worker, write is not in filter until sync
+            UserRepository(mock_db).create(
+                UserCreate(username="taken", email="taken@google.com")
+            )
+
+        users = [
+            UserCreate(username="johndoe", email="johndoe@google.com"),
+            UserCreate(username="JohnDoe", email="johndoe2@google.com"),
+            UserCreate(username="Taken", email="other@google.com"),
+            UserCreate(username="spongebob", email="spongebob@google.com"),
+        ]
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(pipeline.create, usr) for usr in users]
+        outcomes = [future.exception() for future in futures]
+
+        assert sum(exc is None for exc in outcomes) == 2
+        assert all(
+            isinstance(exc, UserAlreadyExistsException)
+            for exc in outcomes
+            if exc is not None
+        )
+        assert isinstance(outcomes[2], UserAlreadyExistsException)
+        assert len(mock_db.session.scalars(select(User)).all()) == 3